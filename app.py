@@ -1,12 +1,25 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import warnings
 warnings.filterwarnings('ignore')
 
+from pdis import engine
+from pdis.figures import CHANGE_POINT_STYLES, DRIFT_WINDOWS, TAB_BUILDERS, add_change_points, build_climate_heatmap, build_drift_chart, build_forecast_chart, build_resampled_trends, build_risk_fan_chart, build_scenario_grid, latest_drift_table
+from pdis.changepoint import CHANGEPOINT_COLUMNS, ChangePointMonitor, monitor_path
+from pdis.climate import CRORE, HEAT_ELASTICITY, ROOM_INVENTORIES, TARGET_TEMPS, TEMPERATURE_BASES, climate_surface
+from pdis.forecast import METHOD_LABELS, forecast_series, monthly_series
+from pdis.nowcast import Nowcaster
+from pdis.ingest import AQI_CSV, FTA_CSV, PDIS_CSV, available_partitions, feather, load_optional_frame, partitions_version
+from pdis.bootstrap import CONFIDENCE, bootstrap_elasticities, coefficient_intervals, prediction_intervals
+from pdis.elasticity import ElasticityFitter, data_fingerprint, scenario_elasticities, selection_key
+from pdis.sharedcache import SharedCache, shared_dataset, shared_frame
+from pdis.simulation import fit_factor_model, simulate_revpar_risk
+from pdis.rolling import rolling_elasticities
+from pdis.timeseries import DEFAULT_GRANULARITY, GRANULARITIES, build_period_cube
+from pdis.assets import WHITE_PAPER_PATH, hero_image, read_asset_bytes
+from pdis.profiling import CACHE_TOTALS, PROFILE_LOG, RerunProfile, tracked_cache
+
 # ==================== PAGE CONFIGURATION ====================
 st.set_page_config(
     page_title="Delhi PDIS | Strategic Tourism Intelligence",
@@ -269,58 +282,202 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # ==================== DATA LOADING & CACHING ====================
-@st.cache_data
-def load_pdis_data():
-    """Load and clean PDIS dataset"""
-    df = pd.read_csv('Final Data to use.csv')
-    
-    df_clean = df[~df['Year'].isin([2020, 2021])].copy()
-    
-    if 'International_Aviation_Arrivals' in df_clean.columns:
-        df_clean['Total_Arrivals'] = df_clean['International_Aviation_Arrivals']
-    
-    if 'Estimated_Delhi_FTAs' in df_clean.columns:
-        df_clean['FTA_Foreign'] = df_clean['Estimated_Delhi_FTAs']
+@st.cache_resource
+def get_shared_cache():
+    """Result tier shared by every replica on this host, or None without pyarrow"""
+    return SharedCache() if feather is not None else None
 
-    if 'Capture_Ratio (%)' not in df_clean.columns:
-        if 'Total_Arrivals' in df_clean.columns:
-            total_arrivals = df_clean['Total_Arrivals']
-        else:
-            total_arrivals = df_clean['International_Aviation_Arrivals']
-        df_clean['Capture_Ratio (%)'] = (df_clean['Occupancy (%)'] / total_arrivals.replace(0, 1)) * 100
-    
-    if 'Market_Intensity' not in df_clean.columns:
-        if 'FTA_Foreign' in df_clean.columns:
-            fta = df_clean['FTA_Foreign']
-        else:
-            fta = df_clean['Estimated_Delhi_FTAs']
-        df_clean['Market_Intensity'] = fta / (df_clean['Avg_Temp'] + 1)
-    
-    return df_clean
+# Loaded frames are memory-mapped from the shared tier, so they are cached as
+# resources: cache_data would pickle a private copy into every process
+@tracked_cache(st.cache_resource)
+def load_pdis_data(source):
+    """Load and clean PDIS dataset, plus its (Year x Month) aggregate cube.
+
+    ``source`` is ``(store version, partitions)``: appended months invalidate
+    the cache and only the selected cities / properties are read.
+    """
+    version, partitions = source
+    cache = get_shared_cache()
+    if cache is None:
+        return engine.load_dataset(partitions=partitions)
+    return shared_dataset(cache, lambda: engine.load_dataset(partitions=partitions), partitions)
 
-@st.cache_data
+@tracked_cache(st.cache_data)
+def load_partition_names(version):
+    """Cities / properties available in the store or CSV"""
+    return available_partitions(PDIS_CSV)
+
+def load_feed(csv_path):
+    """Optional feed, through the shared tier when there is one"""
+    cache = get_shared_cache()
+    if cache is None:
+        return load_optional_frame(csv_path)
+    return shared_frame(cache, lambda: load_optional_frame(csv_path), csv_path)
+
+@tracked_cache(st.cache_resource)
 def load_aqi_data():
     """Load AQI data"""
-    try:
-        return pd.read_csv('Delhi_Monthly_AQI_Aggregated.csv')
-    except:
-        return None
+    return load_feed(AQI_CSV)
 
-@st.cache_data
+@tracked_cache(st.cache_resource)
 def load_fta_data():
     """Load FTA data"""
+    return load_feed(FTA_CSV)
+
+@st.cache_resource
+def load_white_paper():
+    """White Paper PDF bytes, read once per process"""
+    return read_asset_bytes(WHITE_PAPER_PATH)
+
+@st.cache_resource
+def get_hero_image():
+    """Hero image resolved once in the background"""
+    return hero_image()
+
+@tracked_cache(st.cache_data)
+def pdis_fingerprint(source):
+    """Content hash of the loaded PDIS dataset"""
+    return data_fingerprint(load_pdis_data(source).rows)
+
+@st.cache_resource
+def get_elasticity_fitter():
+    """Process-wide LRU of fitted elasticity models"""
+    return ElasticityFitter(maxsize=64)
+
+@tracked_cache(st.cache_data(max_entries=64, show_spinner="Bootstrapping elasticity intervals..."))
+def load_elasticity_bootstrap(key, source):
+    """Block-bootstrap elasticity replicates, cached per data fingerprint and selection"""
+    fingerprint, year_range, months = key
+    view = engine.apply_filters(load_pdis_data(source), year_range, list(months))
+    return bootstrap_elasticities(view.rows)
+
+@tracked_cache(st.cache_data(max_entries=256))
+def load_tab_results(tab, source, year_range, months):
+    """Figures and tables for one tab, cached per filter state"""
+    return TAB_BUILDERS[tab](engine.apply_filters(load_pdis_data(source), year_range, months))
+
+@tracked_cache(st.cache_data)
+def load_period_cube(source, granularity):
+    """(Period x Year x Month) cube, memoized per resampling granularity"""
+    return build_period_cube(load_pdis_data(source).rows, granularity)
+
+@tracked_cache(st.cache_data(max_entries=256))
+def load_resampled_chart(source, granularity, year_range, months):
+    """Resampled trend chart, cached per granularity and filter state"""
+    series = engine.resampled_trends(load_period_cube(source, granularity), year_range, months)
+    return build_resampled_trends(series, granularity)
+
+@tracked_cache(st.cache_data(show_spinner="Fitting seasonal forecasts..."))
+def load_forecasts(source, method):
+    """Monthly history plus forecast artifacts, loaded from disk when already fitted"""
+    rows = load_pdis_data(source).rows
+    return monthly_series(rows), forecast_series(rows, method=method)
+
+@tracked_cache(st.cache_data(max_entries=64))
+def load_climate_surface(source, year_range, months, basis):
+    """Month x target temperature x room inventory revenue-at-risk surface"""
+    view = engine.apply_filters(load_pdis_data(source), year_range, months)
+    return climate_surface(view.cells, basis)
+
+@tracked_cache(st.cache_data)
+def load_monthly_metrics(source):
+    """Monthly capture ratio, RevPAR and occupancy for break detection"""
+    return monthly_series(load_pdis_data(source).rows, CHANGEPOINT_COLUMNS)
+
+@st.cache_resource
+def get_change_point_monitor(partitions):
+    """Process-wide break detector for one set of cities / properties, resumed from disk"""
+    return ChangePointMonitor(path=monitor_path(partitions))
+
+def change_point_breaks(source):
+    """Structural breaks so far, after folding in any months the monitor has not seen"""
+    version, partitions = source
+    monitor = get_change_point_monitor(partitions)
+    monitor.update(load_monthly_metrics(source))
+    return monitor.breaks()
+
+@st.cache_resource
+def get_nowcaster():
+    """Process-wide month-to-date estimators over the nowcast drop directory"""
+    return Nowcaster()
+
+@st.fragment(run_every="60s")
+def render_nowcast(data):
+    """Month-to-date nowcast strip; polls the drop directory on every tick"""
+    nowcaster = get_nowcaster()
+    nowcaster.poll()
+    for name, error in sorted(nowcaster.errors.items()):
+        st.warning(f"⚠️ Nowcast file {name} could not be read and will be retried: {error}")
+    estimates = nowcaster.estimates()
+    if estimates is None:
+        return
+    
+    month_name = f"{estimates['month']:%B}"
+    history = engine.kpis(engine.apply_filters(data, months=[month_name])) \
+        if month_name in engine.month_options(data) else None
+    
+    st.markdown(f'<div class="section-title">🛰️ Nowcast - {estimates["month"]:%B %Y} (Month to Date)</div>', unsafe_allow_html=True)
+    now1, now2, now3, now4 = st.columns(4)
+    
+    def nowcast_metric(column, label, key, fmt, decimals=1):
+        metric = estimates[column]
+        if metric['mean'] is None:
+            st.metric(label, "N/A")
+        elif history is not None and history[key] is not None:
+            st.metric(label, fmt(metric['mean']), f"{metric['mean'] - history[key]:+,.{decimals}f} vs {month_name} avg")
+        else:
+            st.metric(label, fmt(metric['mean']))
+    
+    with now1:
+        nowcast_metric('RevPAR (INR)', "RevPAR (MTD)", 'avg_revpar', lambda v: f"₹{v:,.0f}", decimals=0)
+    with now2:
+        nowcast_metric('Occupancy (%)', "Occupancy (MTD)", 'avg_occupancy', lambda v: f"{v:.1f}%")
+    with now3:
+        nowcast_metric('Capture_Ratio (%)', "Capture Ratio (MTD)", 'capture_ratio', lambda v: f"{v:.1f}%")
+    with now4:
+        st.metric("Observed Through", f"{estimates['last_date']:%d %b}",
+                  f"{estimates['last_date'].day} of {estimates['days_in_month']} days", delta_color="off")
+    
+    revpar = estimates['RevPAR (INR)']
+    if revpar['lower'] is not None:
+        st.caption(f"RevPAR 95% interval ₹{revpar['lower']:,.0f} - ₹{revpar['upper']:,.0f} "
+                   f"from {revpar['n']} observation(s); updates every minute.")
+    st.markdown("---")
+
+def open_tabs(labels, key):
+    """Tabs that track the selection so hidden tabs can skip their work"""
     try:
-        return pd.read_csv('Refined_Delhi_Monthly_FTAs_2015_2024.csv')
-    except:
-        return None
+        return st.tabs(labels, key=key, on_change="rerun")
+    except TypeError:
+        # Older Streamlit cannot track the active tab, so every tab renders
+        return st.tabs(labels)
+
+def tab_is_open(tab):
+    return getattr(tab, 'open', None) is not False
+
+@tracked_cache(st.cache_data)
+def load_rolling_elasticities(source, window):
+    """Rolling-window elasticity paths over the full history"""
+    return rolling_elasticities(load_pdis_data(source).rows, window)
+
+@tracked_cache(st.cache_data(show_spinner="Running Monte Carlo simulation..."))
+def run_risk_simulation(source, base_revpar, start_fx, n_draws, elasticities):
+    """Monte Carlo RevPAR percentile bands for the 12 months after the latest data"""
+    model = fit_factor_model(load_pdis_data(source).rows)
+    return simulate_revpar_risk(model, base_revpar, start_fx, n_draws=n_draws, start_month=model['next_month'],
+                                elasticities=np.array(elasticities))
 
 # ==================== MAIN APPLICATION ====================
+profile = RerunProfile()
+profile.lap("Data load")
+
 try:
-    df = load_pdis_data()
+    data_version = partitions_version(PDIS_CSV)
     aqi_df = load_aqi_data()
     fta_df = load_fta_data()
     
     # ==================== HEADER SECTION ====================
+    profile.lap("Header & assets")
     col1, col2 = st.columns([1, 1])
     with col1:
         st.markdown('<div class="header-title">🏨 Delhi Strategic Tourism Intelligence</div>', unsafe_allow_html=True)
@@ -329,33 +486,25 @@ try:
     with col2:
         st.write("")
         # Download Button for White Paper
-        with open('White Paper.pdf', 'rb') as pdf_file:
-            pdf_bytes = pdf_file.read()
         st.download_button(
             label="📄 Download White Paper",
-            data=pdf_bytes,
+            data=load_white_paper(),
             file_name="White Paper.pdf",
             mime="application/pdf",
             use_container_width=True
         )
     
-    # Hero Image
-    try:
-        import requests
-        from PIL import Image
-        from io import BytesIO
-        
-        img_url = "https://images.unsplash.com/photo-1631049307264-da0ec9d70304?w=1200&h=400&fit=crop&q=80"
-        response = requests.get(img_url, timeout=5)
-        if response.status_code == 200:
-            img = Image.open(BytesIO(response.content))
-            st.image(img, caption="Delhi's Premier Hospitality Landscape")
-    except:
+    # Hero Image - placeholder until the background fetch has resolved
+    hero_bytes = get_hero_image().get()
+    if hero_bytes:
+        st.image(hero_bytes, caption="Delhi's Premier Hospitality Landscape")
+    else:
         st.info("🏨 Delhi Hospitality Market Analytics Dashboard")
     
     st.markdown("---")
     
     # ==================== SIDEBAR CONTROLS ====================
+    profile.lap("Sidebar & filters")
     st.sidebar.markdown("""<div style='padding: 15px 0; border-bottom: 2px solid rgba(177, 212, 232, 0.3);'>
             <h2 style='color: #B3D4E8; font-size: 1.3em; margin: 0 0 10px 0; font-weight: 700;'>📊 ANALYSIS CONTROLS</h2>
             <p style='color: #8BA8C0; font-size: 0.85em; margin: 0;'>Customize your analysis view</p>
@@ -364,6 +513,27 @@ try:
     
     st.sidebar.write("")
     
+    partitions = load_partition_names(data_version)
+    selected_partitions = partitions
+    if len(partitions) > 1:
+        st.sidebar.markdown("<p style='color: #3D6B9B; font-weight: 600; font-size: 0.95em; margin-bottom: 12px;'>🏙️ Cities / Properties</p>", unsafe_allow_html=True)
+        selected_partitions = st.sidebar.multiselect(
+            "Select Cities",
+            partitions,
+            default=partitions[:1],
+            label_visibility="collapsed",
+            help="Only the selected partitions are loaded"
+        )
+        if not selected_partitions:
+            st.sidebar.warning("Select at least one city or property")
+            st.stop()
+        st.sidebar.caption(f"✓ {len(selected_partitions)} of {len(partitions)} selected")
+        st.sidebar.write("")
+    
+    data_source = (data_version, tuple(selected_partitions))
+    data = load_pdis_data(data_source)
+    df = data.rows
+    
     st.sidebar.markdown("<p style='color: #3D6B9B; font-weight: 600; font-size: 0.95em; margin-bottom: 8px;'>📅 Year Range</p>", unsafe_allow_html=True)
     year_range = st.sidebar.slider(
         "Select Year Range",
@@ -373,14 +543,14 @@ try:
         label_visibility="collapsed"
     )
     
-    df_filtered = df[(df['Year'] >= year_range[0]) & (df['Year'] <= year_range[1])].copy()
     st.sidebar.caption(f"📌 {year_range[0]} → {year_range[1]}")
     
     st.sidebar.write("")
     
-    if 'Month' in df_filtered.columns:
+    selected_months = []
+    if 'Month' in df.columns:
         st.sidebar.markdown("<p style='color: #3D6B9B; font-weight: 600; font-size: 0.95em; margin-bottom: 12px;'>🗓️ Months (Select Multiple)</p>", unsafe_allow_html=True)
-        months = sorted(df_filtered['Month'].unique())
+        months = engine.month_options(data, year_range)
         selected_months = st.sidebar.multiselect(
             "Select Months",
             months,
@@ -388,10 +558,26 @@ try:
             label_visibility="collapsed",
             help="Click to toggle months"
         )
-        if selected_months:
-            df_filtered = df_filtered[df_filtered['Month'].isin(selected_months)]
         st.sidebar.caption(f"✓ {len(selected_months)} month(s) selected")
     
+    st.sidebar.write("")
+    
+    st.sidebar.markdown("<p style='color: #3D6B9B; font-weight: 600; font-size: 0.95em; margin-bottom: 8px;'>⏱️ Time Granularity</p>", unsafe_allow_html=True)
+    granularity = st.sidebar.selectbox(
+        "Time Granularity",
+        list(GRANULARITIES),
+        index=list(GRANULARITIES).index(DEFAULT_GRANULARITY),
+        label_visibility="collapsed",
+        help="Resampling used by the time-series charts"
+    )
+    
+    view = engine.apply_filters(data, year_range, selected_months)
+    kpis = engine.kpis(view)
+    
+    # Refit the elasticity model for this filter in the background while the tabs render
+    fit_key = selection_key(pdis_fingerprint(data_source), year_range, selected_months)
+    elasticity_future = get_elasticity_fitter().submit(fit_key, view.rows)
+    
     st.sidebar.markdown("")
     st.sidebar.markdown("""
         <div style='padding: 12px; background-color: rgba(61, 107, 155, 0.15); border-left: 4px solid #3D6B9B; border-radius: 4px; margin: 15px 0;'>
@@ -429,78 +615,65 @@ try:
     st.sidebar.caption(f"{sim_temp:.1f}°C")
     
     # ==================== EXECUTIVE SUMMARY KPIs ====================
+    profile.lap("KPI block")
     st.markdown('<div class="section-title">📈 Executive Summary - Key Performance Indicators</div>', unsafe_allow_html=True)
     
     kpi1, kpi2, kpi3, kpi4 = st.columns(4)
     
     with kpi1:
-        avg_revpar = df_filtered['RevPAR (INR)'].mean()
-        delta_revpar = ((df_filtered[df_filtered['Year'] == df_filtered['Year'].max()]['RevPAR (INR)'].mean() - 
-                        df_filtered[df_filtered['Year'] == df_filtered['Year'].min()]['RevPAR (INR)'].mean()) / 
-                       df_filtered[df_filtered['Year'] == df_filtered['Year'].min()]['RevPAR (INR)'].mean() * 100)
         st.metric(
             "Average RevPAR",
-            f"₹{avg_revpar:,.0f}",
-            f"{delta_revpar:+.1f}%",
+            f"₹{kpis['avg_revpar']:,.0f}",
+            f"{kpis['revpar_delta_pct']:+.1f}%",
             delta_color="normal"
         )
     
     with kpi2:
-        avg_occupancy = df_filtered['Occupancy (%)'].mean()
         st.metric(
             "Average Occupancy",
-            f"{avg_occupancy:.1f}%",
+            f"{kpis['avg_occupancy']:.1f}%",
             "All Properties"
         )
     
     with kpi3:
-        if 'Total_Arrivals' in df_filtered.columns:
-            total_arr = df_filtered['Total_Arrivals'].sum()
-        else:
-            total_arr = df_filtered['International_Aviation_Arrivals'].sum()
         st.metric(
             "Total Arrivals",
-            f"{total_arr:,.0f}",
+            f"{kpis['total_arrivals']:,.0f}",
             "Period Total"
         )
     
     with kpi4:
-        if 'FTA_Foreign' in df_filtered.columns:
-            fta_foreign = df_filtered['FTA_Foreign'].sum()
-        else:
-            fta_foreign = df_filtered['Estimated_Delhi_FTAs'].sum()
         st.metric(
             "Foreign Tourist Arrivals",
-            f"{fta_foreign:,.0f}",
+            f"{kpis['fta_foreign']:,.0f}",
             "FTA (Tourism)"
         )
     
     st.markdown("---")
     
     # ==================== ADVANCED METRICS ====================
+    profile.lap("Advanced metrics")
     st.markdown('<div class="section-title">🎯 Advanced Market Metrics</div>', unsafe_allow_html=True)
     
     adv1, adv2, adv3, adv4 = st.columns(4)
     
     with adv1:
-        capture_ratio = df_filtered['Capture_Ratio (%)'].mean()
         st.metric(
             "Market Capture Ratio",
-            f"{capture_ratio:.1f}%",
+            f"{kpis['capture_ratio']:.1f}%",
             "International Share"
         )
     
     with adv2:
-        avg_temp = df_filtered['Avg_Temp'].mean()
         st.metric(
             "Avg Temperature",
-            f"{avg_temp:.1f}°C",
+            f"{kpis['avg_temp']:.1f}°C",
             "Climate Factor"
         )
     
     with adv3:
         try:
-            aqi_val = df_filtered['AQI'].mean() if 'AQI' in df_filtered.columns else "N/A"
+            aqi_val = kpis['aqi'] if kpis['aqi'] is not None else "N/A"
             if isinstance(aqi_val, (int, float)):
                 st.metric("Air Quality Index", f"{aqi_val:.0f}", "Quarterly Avg")
             else:
@@ -509,463 +682,288 @@ try:
             st.metric("Air Quality Index", "N/A")
     
     with adv4:
-        if 'Market_Intensity' in df_filtered.columns:
-            market_intensity = df_filtered['Market_Intensity'].mean()
-            st.metric("Market Intensity", f"{market_intensity:.2f}", "Derived Index")
+        if kpis['market_intensity'] is not None:
+            st.metric("Market Intensity", f"{kpis['market_intensity']:.2f}", "Derived Index")
     
     st.markdown("---")
     
+    # ==================== NOWCAST ====================
+    profile.lap("Nowcast")
+    render_nowcast(data)
+    
     # ==================== MAIN ANALYSIS TABS ====================
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    profile.lap("Tab layout")
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = open_tabs([
         "📊 Revenue Analysis",
         "👥 Visitor Metrics",
         "🌡️ Environmental Impact",
         "📈 Trend Analysis",
         "🧬 Correlation Matrix",
-        "🤖 Predictive Model"
-    ])
+        "🤖 Predictive Model",
+        "📉 Elasticity Drift"
+    ], key="active_tab")
+    tab_filter = (data_source, tuple(year_range), tuple(selected_months))
     
     # ==================== TAB 1: REVENUE ANALYSIS ====================
-    with tab1:
-        st.markdown('<div class="subsection-title">Revenue Performance Dashboard</div>', unsafe_allow_html=True)
-        
-        col_rev1, col_rev2 = st.columns(2)
-        
-        with col_rev1:
-            yearly_revpar = df_filtered.groupby('Year')[['RevPAR (INR)', 'ADR (INR)']].mean().reset_index()
+    with tab1, profile.section("Tab 1 - Revenue"):
+        if tab_is_open(tab1):
+            st.markdown('<div class="subsection-title">Revenue Performance Dashboard</div>', unsafe_allow_html=True)
+            revenue = load_tab_results('revenue', *tab_filter)
             
-            fig_revpar = go.Figure()
-            fig_revpar.add_trace(go.Scatter(
-                x=yearly_revpar['Year'], y=yearly_revpar['RevPAR (INR)'],
-                mode='lines+markers', name='RevPAR',
-                line=dict(color='#1E3A5F', width=3),
-                marker=dict(size=8)
-            ))
-            fig_revpar.add_trace(go.Scatter(
-                x=yearly_revpar['Year'], y=yearly_revpar['ADR (INR)'],
-                mode='lines+markers', name='ADR',
-                line=dict(color='#6366F1', width=3),
-                marker=dict(size=8)
-            ))
-            fig_revpar.update_layout(
-                title="RevPAR & ADR Trends",
-                xaxis_title="Year",
-                yaxis_title="₹ (INR)",
-                hovermode="x unified",
-                plot_bgcolor="white",
-                height=400
-            )
-            st.plotly_chart(fig_revpar, use_container_width=True)
-        
-        with col_rev2:
-            fig_occ = px.scatter(
-                df_filtered,
-                x='Occupancy (%)',
-                y='RevPAR (INR)',
-                trendline="ols",
-                title="Occupancy vs RevPAR Correlation",
-                color='Avg_Temp',
-                color_continuous_scale='Viridis',
-                hover_data=['Year']
-            )
-            fig_occ.update_layout(plot_bgcolor="white", height=400)
-            st.plotly_chart(fig_occ, use_container_width=True)
-        
-        if 'Month' in df_filtered.columns:
-            st.markdown("#### Seasonality Pattern - Monthly Revenue")
-            monthly_data = df_filtered.groupby('Month')[['RevPAR (INR)', 'Occupancy (%)']].mean().reset_index()
+            col_rev1, col_rev2 = st.columns(2)
+            with col_rev1:
+                st.plotly_chart(revenue['revpar_adr'], use_container_width=True)
+            with col_rev2:
+                st.plotly_chart(revenue['occupancy_revpar'], use_container_width=True)
             
-            fig_monthly = make_subplots(specs=[[{"secondary_y": True}]])
-            fig_monthly.add_trace(
-                go.Bar(x=monthly_data['Month'], y=monthly_data['RevPAR (INR)'], name='RevPAR',
-                       marker_color='#1E3A5F'),
-                secondary_y=False,
-            )
-            fig_monthly.add_trace(
-                go.Scatter(x=monthly_data['Month'], y=monthly_data['Occupancy (%)'], name='Occupancy %',
-                          line=dict(color='#3D6B9B', width=3),
-                          mode='lines+markers'),
-                secondary_y=True,
-            )
-            fig_monthly.update_layout(
-                title="Monthly Seasonality Analysis",
-                xaxis_title="Month",
-                yaxis_title="RevPAR (₹)",
-                yaxis2_title="Occupancy (%)",
-                hovermode="x unified",
-                plot_bgcolor="white",
-                height=400
-            )
-            st.plotly_chart(fig_monthly, use_container_width=True)
+            if revenue['monthly'] is not None:
+                st.markdown("#### Seasonality Pattern - Monthly Revenue")
+                st.plotly_chart(revenue['monthly'], use_container_width=True)
     
     # ==================== TAB 2: VISITOR METRICS ====================
-    with tab2:
-        st.markdown('<div class="subsection-title">📌 Visitor & Arrival Analytics</div>', unsafe_allow_html=True)
-        
-        col_vis1, col_vis2 = st.columns(2)
-        
-        with col_vis1:
-            st.markdown("#### Total Arrivals Trend (All Modes)")
+    with tab2, profile.section("Tab 2 - Visitors"):
+        if tab_is_open(tab2):
+            st.markdown('<div class="subsection-title">📌 Visitor & Arrival Analytics</div>', unsafe_allow_html=True)
+            visitors = load_tab_results('visitors', *tab_filter)
             
-            if 'Total_Arrivals' in df_filtered.columns:
-                yearly_total = df_filtered.groupby('Year')['Total_Arrivals'].sum().reset_index()
-                yearly_total.rename(columns={'Total_Arrivals':'Arrivals'}, inplace=True)
-            else:
-                yearly_total = df_filtered.groupby('Year')['International_Aviation_Arrivals'].sum().reset_index()
-                yearly_total.rename(columns={'International_Aviation_Arrivals':'Arrivals'}, inplace=True)
+            col_vis1, col_vis2 = st.columns(2)
+            with col_vis1:
+                st.markdown("#### Total Arrivals Trend (All Modes)")
+                st.plotly_chart(visitors['yearly_total'], use_container_width=True)
+            with col_vis2:
+                st.markdown("#### Foreign Tourist Arrivals Trend")
+                st.plotly_chart(visitors['yearly_fta'], use_container_width=True)
             
-            fig_total = px.bar(
-                yearly_total,
-                x='Year',
-                y='Arrivals',
-                title='Total Arrivals by Year',
-                color_discrete_sequence=['#1E3A5F'],
-                labels={'Arrivals': 'Total Arrivals'}
-            )
-            fig_total.update_layout(plot_bgcolor="white", height=400)
-            st.plotly_chart(fig_total, use_container_width=True)
-        
-        with col_vis2:
-            st.markdown("#### Foreign Tourist Arrivals Trend")
-            
-            if 'FTA_Foreign' in df_filtered.columns:
-                yearly_fta = df_filtered.groupby('Year')['FTA_Foreign'].sum().reset_index()
-                yearly_fta.rename(columns={'FTA_Foreign':'FTA'}, inplace=True)
-            else:
-                yearly_fta = df_filtered.groupby('Year')['Estimated_Delhi_FTAs'].sum().reset_index()
-                yearly_fta.rename(columns={'Estimated_Delhi_FTAs':'FTA'}, inplace=True)
+            st.markdown("#### Comparative Analysis: Total vs Foreign Arrivals")
+            st.plotly_chart(visitors['comparison'], use_container_width=True)
             
-            fig_fta = px.bar(
-                yearly_fta,
-                x='Year',
-                y='FTA',
-                title='Foreign Tourist Arrivals by Year',
-                color_discrete_sequence=['#E8995A'],
-                labels={'FTA': 'Foreign Tourists'}
-            )
-            fig_fta.update_layout(plot_bgcolor="white", height=400)
-            st.plotly_chart(fig_fta, use_container_width=True)
-        
-        st.markdown("#### Comparative Analysis: Total vs Foreign Arrivals")
-        
-        if 'Total_Arrivals' in df_filtered.columns:
-            yearly_comp = df_filtered.groupby('Year').agg({
-                'Total_Arrivals': 'sum',
-                'Estimated_Delhi_FTAs' if 'FTA_Foreign' not in df_filtered.columns else 'FTA_Foreign': 'sum'
-            }).reset_index()
-            yearly_comp.rename(columns={
-                'Total_Arrivals': 'Total Arrivals',
-                'Estimated_Delhi_FTAs': 'Foreign Tourists'
-            } if 'FTA_Foreign' not in df_filtered.columns else {
-                'Total_Arrivals': 'Total Arrivals',
-                'FTA_Foreign': 'Foreign Tourists'
-            }, inplace=True)
-        else:
-            yearly_comp = df_filtered.groupby('Year').agg({
-                'International_Aviation_Arrivals': 'sum',
-                'Estimated_Delhi_FTAs': 'sum'
-            }).reset_index()
-            yearly_comp.rename(columns={
-                'International_Aviation_Arrivals': 'Total Arrivals',
-                'Estimated_Delhi_FTAs': 'Foreign Tourists'
-            }, inplace=True)
-        
-        fig_comp = go.Figure()
-        fig_comp.add_trace(go.Bar(
-            x=yearly_comp['Year'],
-            y=yearly_comp['Total Arrivals'],
-            name='Total Arrivals (All Modes)',
-            marker_color='#1E3A5F',
-            opacity=0.8
-        ))
-        fig_comp.add_trace(go.Bar(
-            x=yearly_comp['Year'],
-            y=yearly_comp['Foreign Tourists'],
-            name='Foreign Tourist Arrivals',
-            marker_color='#E8995A',
-            opacity=0.8
-        ))
-        fig_comp.update_layout(
-            title="Total Arrivals vs Foreign Tourist Arrivals",
-            xaxis_title="Year",
-            yaxis_title="Number of Arrivals",
-            barmode='group',
-            plot_bgcolor="white",
-            height=450,
-            hovermode="x unified"
-        )
-        st.plotly_chart(fig_comp, use_container_width=True)
-        
-        if 'Month' in df_filtered.columns:
-            st.markdown("#### Monthly Seasonality Pattern")
+            if visitors['monthly'] is not None:
+                st.markdown("#### Monthly Seasonality Pattern")
+                st.plotly_chart(visitors['monthly'], use_container_width=True)
+    
+    # ==================== TAB 3: ENVIRONMENTAL IMPACT ====================
+    with tab3, profile.section("Tab 3 - Environment"):
+        if tab_is_open(tab3):
+            st.markdown('<div class="subsection-title">Climate & Environmental Factors</div>', unsafe_allow_html=True)
+            environment = load_tab_results('environment', *tab_filter)
             
-            if 'Total_Arrivals' in df_filtered.columns:
-                monthly_comp = df_filtered.groupby('Month').agg({
-                    'Total_Arrivals': 'mean',
-                    'Estimated_Delhi_FTAs' if 'FTA_Foreign' not in df_filtered.columns else 'FTA_Foreign': 'mean'
-                }).reset_index()
-                if 'FTA_Foreign' not in df_filtered.columns:
-                    monthly_comp.rename(columns={'Estimated_Delhi_FTAs': 'Foreign Tourists'}, inplace=True)
+            col_env1, col_env2 = st.columns(2)
+            with col_env1:
+                st.plotly_chart(environment['temperature_revpar'], use_container_width=True)
+            with col_env2:
+                if environment['aqi_occupancy'] is not None:
+                    st.plotly_chart(environment['aqi_occupancy'], use_container_width=True)
                 else:
-                    monthly_comp.rename(columns={'FTA_Foreign': 'Foreign Tourists'}, inplace=True)
-            else:
-                monthly_comp = df_filtered.groupby('Month').agg({
-                    'International_Aviation_Arrivals': 'mean',
-                    'Estimated_Delhi_FTAs': 'mean'
-                }).reset_index()
-                monthly_comp.rename(columns={
-                    'International_Aviation_Arrivals': 'Total_Arrivals',
-                    'Estimated_Delhi_FTAs': 'Foreign Tourists'
-                }, inplace=True)
+                    st.info("AQI data not available in current dataset")
             
-            fig_monthly = go.Figure()
-            fig_monthly.add_trace(go.Scatter(
-                x=monthly_comp['Month'],
-                y=monthly_comp['Total_Arrivals'],
-                name='Total Arrivals',
-                mode='lines+markers',
-                line=dict(color='#1E3A5F', width=3),
-                marker=dict(size=8)
-            ))
-            fig_monthly.add_trace(go.Scatter(
-                x=monthly_comp['Month'],
-                y=monthly_comp['Foreign Tourists'],
-                name='Foreign Tourists',
-                mode='lines+markers',
-                line=dict(color='#E8995A', width=3),
-                marker=dict(size=8)
-            ))
-            fig_monthly.update_layout(
-                title="Monthly Average: Total vs Foreign Arrivals",
-                xaxis_title="Month",
-                yaxis_title="Average Arrivals",
-                hovermode="x unified",
-                plot_bgcolor="white",
-                height=450
-            )
-            st.plotly_chart(fig_monthly, use_container_width=True)
-    
-    # ==================== TAB 3: ENVIRONMENTAL IMPACT ====================
-    with tab3:
-        st.markdown('<div class="subsection-title">Climate & Environmental Factors</div>', unsafe_allow_html=True)
-        
-        col_env1, col_env2 = st.columns(2)
-        
-        with col_env1:
-            bubble_col = 'FTA_Foreign' if 'FTA_Foreign' in df_filtered.columns else 'Estimated_Delhi_FTAs'
+            st.markdown("#### Climate Revenue at Risk")
+            climate_col1, climate_col2, climate_col3 = st.columns(3)
+            with climate_col1:
+                climate_basis = st.radio("Temperature basis", list(TEMPERATURE_BASES), format_func=TEMPERATURE_BASES.get,
+                                         key="climate_basis")
+            with climate_col2:
+                climate_rooms = st.select_slider("Room inventory", options=ROOM_INVENTORIES.tolist(), value=15_000,
+                                                 format_func=lambda r: f"{r:,}", key="climate_rooms")
+            with climate_col3:
+                climate_target = st.select_slider("Target temperature (°C)", options=TARGET_TEMPS.tolist(), value=30.0,
+                                                  key="climate_target")
             
-            fig_temp = px.scatter(
-                df_filtered,
-                x='Avg_Temp',
-                y='RevPAR (INR)',
-                color='Occupancy (%)',
-                size=bubble_col,
-                title="Temperature vs RevPAR (Bubble = Foreign Arrivals)",
-                color_continuous_scale='Viridis',
-                hover_data=['Year']
-            )
-            fig_temp.update_layout(plot_bgcolor="white", height=450)
-            st.plotly_chart(fig_temp, use_container_width=True)
-        
-        with col_env2:
-            if 'AQI' in df_filtered.columns:
-                fig_aqi = px.scatter(
-                    df_filtered,
-                    x='AQI',
-                    y='Occupancy (%)',
-                    trendline="ols",
-                    title="Air Quality Index vs Occupancy Rate",
-                    color_discrete_sequence=['#E8995A']
-                )
-                fig_aqi.update_layout(plot_bgcolor="white", height=450)
-                st.plotly_chart(fig_aqi, use_container_width=True)
-            else:
-                st.info("AQI data not available in current dataset")
-        
-        st.markdown("#### Environmental Metrics Summary")
-        env_summary = df_filtered[['Year', 'Avg_Temp']].groupby('Year').agg({
-            'Avg_Temp': ['min', 'mean', 'max']
-        }).round(1)
-        env_summary.columns = ['Min Temp (°C)', 'Avg Temp (°C)', 'Max Temp (°C)']
-        env_summary.index = env_summary.index.astype(int)
-        st.dataframe(env_summary, use_container_width=True)
+            surface = load_climate_surface(data_source, tuple(year_range), tuple(selected_months), climate_basis)
+            if len(surface.months):
+                at_target = surface.values[:, list(surface.targets).index(climate_target),
+                                           list(surface.rooms).index(climate_rooms)]
+                risk1, risk2, risk3 = st.columns(3)
+                with risk1:
+                    st.metric("Revenue at Risk (Selection)", f"₹{at_target.sum() / CRORE:,.2f} Cr",
+                              f"{len(surface.months)} months")
+                with risk2:
+                    st.metric("Average per Month", f"₹{at_target.mean() / CRORE:,.2f} Cr", f"cooling to {climate_target:.1f}°C")
+                with risk3:
+                    worst = int(at_target.argmax())
+                    st.metric("Highest-Risk Month", f"{surface.months['Date'].iloc[worst]:%b %Y}",
+                              f"₹{at_target[worst] / CRORE:,.2f} Cr", delta_color="off")
+                st.plotly_chart(build_climate_heatmap(surface, climate_rooms, climate_basis), use_container_width=True)
+                st.caption(f"Heat elasticity {HEAT_ELASTICITY} applied to each month's actual RevPAR and temperature; "
+                           "targets warmer than a month carry no risk.")
+            
+            st.markdown("#### Environmental Metrics Summary")
+            st.dataframe(environment['env_summary'], use_container_width=True)
     
     # ==================== TAB 4: TREND ANALYSIS ====================
-    with tab4:
-        st.markdown('<div class="subsection-title">Long-term Trend Analysis</div>', unsafe_allow_html=True)
-        
-        yearly_trends = df_filtered.groupby('Year').agg({
-            'RevPAR (INR)': 'mean',
-            'Occupancy (%)': 'mean',
-            'ADR (INR)': 'mean',
-            'Total_Arrivals': 'sum'
-        }).reset_index()
-        
-        yearly_trends_norm = yearly_trends.copy()
-        for col in yearly_trends_norm.columns[1:]:
-            yearly_trends_norm[col] = (yearly_trends_norm[col] - yearly_trends_norm[col].min()) / (yearly_trends_norm[col].max() - yearly_trends_norm[col].min())
-        
-        fig_trends = go.Figure()
-        fig_trends.add_trace(go.Scatter(
-            x=yearly_trends_norm['Year'], y=yearly_trends_norm['RevPAR (INR)'],
-            mode='lines+markers', name='RevPAR (Normalized)',
-            line=dict(width=2.5, color='#1E3A5F')
-        ))
-        fig_trends.add_trace(go.Scatter(
-            x=yearly_trends_norm['Year'], y=yearly_trends_norm['Occupancy (%)'],
-            mode='lines+markers', name='Occupancy (Normalized)',
-            line=dict(width=2.5, color='#06B6D4')
-        ))
-        fig_trends.add_trace(go.Scatter(
-            x=yearly_trends_norm['Year'], y=yearly_trends_norm['Total_Arrivals'],
-            mode='lines+markers', name='Total Arrivals (Normalized)',
-            line=dict(width=2.5, color='#E8995A')
-        ))
-        fig_trends.update_layout(
-            title="Normalized Multi-Metric Trends",
-            xaxis_title="Year",
-            yaxis_title="Index (0-1 Scale)",
-            hovermode="x unified",
-            plot_bgcolor="white",
-            height=450
-        )
-        st.plotly_chart(fig_trends, use_container_width=True)
-        
-        st.markdown("#### Year-on-Year Growth Analysis")
-        yoy_growth = yearly_trends.copy()
-        for col in yoy_growth.columns[1:]:
-            yoy_growth[f'{col}_YoY'] = yoy_growth[col].pct_change() * 100
-        
-        yoy_display = yoy_growth[['Year', 'RevPAR (INR)_YoY', 'Occupancy (%)_YoY', 'Total_Arrivals_YoY']].round(2)
-        yoy_display.columns = ['Year', 'RevPAR YoY %', 'Occupancy YoY %', 'Total Arrivals YoY %']
-        st.dataframe(yoy_display, use_container_width=True)
+    with tab4, profile.section("Tab 4 - Trends"):
+        if tab_is_open(tab4):
+            st.markdown('<div class="subsection-title">Long-term Trend Analysis</div>', unsafe_allow_html=True)
+            trends = load_tab_results('trends', *tab_filter)
+            breaks = change_point_breaks(data_source)
+            breaks = breaks[breaks['Date'].dt.year.between(*year_range)]
+            
+            st.plotly_chart(add_change_points(trends['trends'], breaks, yearly=True), use_container_width=True)
+            
+            st.markdown(f"#### {granularity}ly Performance")
+            st.plotly_chart(add_change_points(load_resampled_chart(data_source, granularity, tuple(year_range), tuple(selected_months)), breaks),
+                            use_container_width=True)
+            if not breaks.empty:
+                shifts = ", ".join(f"{CHANGE_POINT_STYLES[m][0]} {d:%b %Y}" for m, d in breaks[['Metric', 'Date']].itertuples(index=False))
+                st.caption(f"Dashed lines mark regime shifts flagged by online Bayesian change-point detection: {shifts}")
+            
+            st.markdown("#### Year-on-Year Growth Analysis")
+            st.dataframe(trends['yoy'], use_container_width=True)
     
     # ==================== TAB 5: CORRELATION MATRIX ====================
-    with tab5:
-        st.markdown('<div class="subsection-title">Multivariate Correlation Analysis</div>', unsafe_allow_html=True)
-        
-        numeric_cols = df_filtered.select_dtypes(include=[np.number]).columns
-        correlation_cols = ['RevPAR (INR)', 'Occupancy (%)', 'ADR (INR)', 
-                           'Total_Arrivals', 'Avg_Temp', 'Capture_Ratio (%)']
-        correlation_cols = [col for col in correlation_cols if col in df_filtered.columns]
-        
-        corr_matrix = df_filtered[correlation_cols].corr()
-        
-        fig_corr = go.Figure(data=go.Heatmap(
-            z=corr_matrix.values,
-            x=corr_matrix.columns,
-            y=corr_matrix.columns,
-            colorscale='Blues',
-            zmid=0,
-            text=np.round(corr_matrix.values, 2),
-            texttemplate='%{text}',
-            textfont={"size": 10},
-            colorbar=dict(title="Correlation")
-        ))
-        fig_corr.update_layout(
-            title="Variable Correlation Matrix",
-            height=600,
-            width=800
-        )
-        st.plotly_chart(fig_corr, use_container_width=True)
-        
-        st.markdown("#### Key Correlations")
-        corr_insights = []
-        for i in range(len(corr_matrix.columns)):
-            for j in range(i+1, len(corr_matrix.columns)):
-                corr_val = corr_matrix.iloc[i, j]
-                if abs(corr_val) > 0.5:
-                    corr_insights.append({
-                        'Variable 1': corr_matrix.columns[i],
-                        'Variable 2': corr_matrix.columns[j],
-                        'Correlation': f"{corr_val:.3f}"
-                    })
-        
-        if corr_insights:
-            st.dataframe(pd.DataFrame(corr_insights), use_container_width=True)
+    with tab5, profile.section("Tab 5 - Correlation"):
+        if tab_is_open(tab5):
+            st.markdown('<div class="subsection-title">Multivariate Correlation Analysis</div>', unsafe_allow_html=True)
+            correlation = load_tab_results('correlation', *tab_filter)
+            
+            st.plotly_chart(correlation['heatmap'], use_container_width=True)
+            
+            st.markdown("#### Key Correlations")
+            if correlation['insights'] is not None:
+                st.dataframe(correlation['insights'], use_container_width=True)
     
     # ==================== TAB 6: PREDICTIVE MODEL ====================
-    with tab6:
-        st.markdown('<div class="subsection-title">Scenario Forecasting & Predictive Analytics</div>', unsafe_allow_html=True)
-        
-        col_pred1, col_pred2 = st.columns(2)
-        
-        with col_pred1:
-            st.markdown("#### Current Scenario Parameters")
-            st.info(f"""
-            **AQI Level:** {sim_aqi}
-            **Exchange Rate:** ₹{sim_fx:.2f} per USD
-            **Temperature:** {sim_temp:.1f}°C
-            """)
-        
-        with col_pred2:
-            st.markdown("#### Market Elasticity Coefficients")
-            st.info("""
-            **FX Impact:** +1.32
-            **Temperature Impact:** -0.70
-            **AQI Impact:** -0.08
-            """)
-        
-        base_revpar = df_filtered['RevPAR (INR)'].mean()
-        fx_variance = ((sim_fx - 83.0) / 83.0) * 1.32
-        temp_variance = ((sim_temp - 30.0) / 30.0) * -0.70
-        aqi_variance = ((sim_aqi - 200.0) / 200.0) * -0.08
-        
-        total_variance = fx_variance + temp_variance + aqi_variance
-        predicted_revpar = base_revpar * (1 + total_variance)
-        
-        st.markdown("---")
-        st.markdown("#### Scenario Forecasting Results")
-        
-        pred_col1, pred_col2, pred_col3 = st.columns(3)
-        
-        with pred_col1:
-            st.metric("Base RevPAR", f"₹{base_revpar:,.0f}", "Historical Average")
-        
-        with pred_col2:
-            st.metric("Predicted RevPAR", f"₹{predicted_revpar:,.0f}", 
-                     f"{total_variance*100:+.1f}%")
-        
-        with pred_col3:
-            change = predicted_revpar - base_revpar
-            st.metric("Impact Delta", f"₹{change:+,.0f}", "Absolute Change")
-        
-        st.markdown("#### Sensitivity Analysis")
-        
-        sensitivity_data = {
-            'Factor': ['FX Exchange Rate', 'Temperature', 'Air Quality Index'],
-            'Current Value': [f"₹{sim_fx:.2f}", f"{sim_temp:.1f}°C", sim_aqi],
-            'Impact on RevPAR': [f"{fx_variance*100:+.1f}%", f"{temp_variance*100:+.1f}%", f"{aqi_variance*100:+.1f}%"],
-            'Elasticity': ['+1.32', '-0.70', '-0.08']
-        }
-        
-        st.dataframe(pd.DataFrame(sensitivity_data), use_container_width=True)
-        
-        st.markdown("#### Scenario Comparison")
-        
-        scenarios = {
-            'Scenario': ['Best Case', 'Base Case', 'Worst Case', 'Current'],
-            'AQI': [100, 200, 350, sim_aqi],
-            'Exchange Rate': [95.0, 83.0, 70.0, sim_fx],
-            'Temperature': [25.0, 30.0, 40.0, sim_temp]
-        }
-        
-        scenarios_df = pd.DataFrame(scenarios)
-        predicted_revpars = []
-        
-        for idx, row in scenarios_df.iterrows():
-            fx_var = ((row['Exchange Rate'] - 83.0) / 83.0) * 1.32
-            temp_var = ((row['Temperature'] - 30.0) / 30.0) * -0.70
-            aqi_var = ((row['AQI'] - 200.0) / 200.0) * -0.08
-            pred = base_revpar * (1 + fx_var + temp_var + aqi_var)
-            predicted_revpars.append(f"₹{pred:,.0f}")
-        
-        scenarios_df['Predicted RevPAR'] = predicted_revpars
-        st.dataframe(scenarios_df, use_container_width=True)
+    with tab6, profile.section("Tab 6 - Predictive"):
+        if tab_is_open(tab6):
+            st.markdown('<div class="subsection-title">Scenario Forecasting & Predictive Analytics</div>', unsafe_allow_html=True)
+            
+            col_pred1, col_pred2 = st.columns(2)
+            
+            with col_pred1:
+                st.markdown("#### Current Scenario Parameters")
+                st.info(f"""
+                **AQI Level:** {sim_aqi}
+                **Exchange Rate:** ₹{sim_fx:.2f} per USD
+                **Temperature:** {sim_temp:.1f}°C
+                """)
+            
+            with col_pred2:
+                st.markdown("#### Market Elasticity Coefficients")
+                with profile.section("Tab 6 / Elasticity fit wait"):
+                    elasticity_fit = elasticity_future.result()
+                elasticities = scenario_elasticities(elasticity_fit)
+                aqi_elasticity, fx_elasticity, temp_elasticity = elasticities
+                st.info(f"""
+                **FX Impact:** {fx_elasticity:+.2f}
+                **Temperature Impact:** {temp_elasticity:+.2f}
+                **AQI Impact:** {aqi_elasticity:+.2f}
+                """)
+                if elasticity_fit is not None:
+                    st.caption(f"Log-log OLS (Newey-West HAC) fitted on {elasticity_fit['nobs']} months of the current selection · R² = {elasticity_fit['rsquared']:.2f}")
+                    with profile.section("Tab 6 / Elasticity bootstrap"):
+                        bootstrap = load_elasticity_bootstrap(fit_key, data_source)
+                else:
+                    bootstrap = None
+                    st.caption("Too few complete months in the current selection to refit; showing published coefficients")
+            
+            base_revpar = kpis['avg_revpar']
+            forecast = engine.scenario_forecast(base_revpar, [sim_aqi, sim_fx, sim_temp], elasticities)
+            total_variance = forecast['total_impact']
+            predicted_revpar = forecast['predicted_revpar']
+            
+            st.markdown("---")
+            st.markdown("#### Scenario Forecasting Results")
+            
+            pred_col1, pred_col2, pred_col3 = st.columns(3)
+            
+            with pred_col1:
+                st.metric("Base RevPAR", f"₹{base_revpar:,.0f}", "Historical Average")
+            
+            with pred_col2:
+                st.metric("Predicted RevPAR", f"₹{predicted_revpar:,.0f}", 
+                         f"{total_variance*100:+.1f}%")
+            
+            with pred_col3:
+                change = predicted_revpar - base_revpar
+                st.metric("Impact Delta", f"₹{change:+,.0f}", "Absolute Change")
+            
+            st.markdown("#### Sensitivity Analysis")
+            
+            sensitivity = engine.sensitivity_table((sim_aqi, sim_fx, sim_temp), elasticities)
+            fx_value, temp_value, aqi_value = sensitivity['Current Value']
+            sensitivity_data = {
+                'Factor': sensitivity['Factor'],
+                'Current Value': [f"₹{fx_value:.2f}", f"{temp_value:.1f}°C", f"{aqi_value:.0f}"],
+                'Impact on RevPAR': [f"{impact:+.1f}%" for impact in sensitivity['Impact on RevPAR (%)']],
+                'Elasticity': [f"{elasticity:+.2f}" for elasticity in sensitivity['Elasticity']]
+            }
+            ci_label = f"{CONFIDENCE:.0%} CI"
+            if bootstrap is not None:
+                intervals = coefficient_intervals(bootstrap).loc[['log_FX', 'log_Temp', 'log_AQI']]
+                sensitivity_data[ci_label] = [f"[{lo:+.2f}, {hi:+.2f}]" for lo, hi in zip(intervals['Lower'], intervals['Upper'])]
+            
+            st.dataframe(pd.DataFrame(sensitivity_data), use_container_width=True)
+            
+            st.markdown("#### Scenario Comparison")
+            
+            scenarios_df = engine.scenario_table(base_revpar, (sim_aqi, sim_fx, sim_temp), elasticities)
+            if bootstrap is not None:
+                lower, upper = prediction_intervals(bootstrap, base_revpar, scenarios_df[['AQI', 'Exchange Rate', 'Temperature']].to_numpy())
+                scenarios_df[ci_label] = [f"₹{lo:,.0f} - ₹{hi:,.0f}" for lo, hi in zip(lower, upper)]
+            scenarios_df['Predicted RevPAR'] = [f"₹{pred:,.0f}" for pred in scenarios_df['Predicted RevPAR']]
+            st.dataframe(scenarios_df, use_container_width=True)
+            if bootstrap is not None:
+                st.caption(f"Intervals from {len(bootstrap.replicates):,} moving-block bootstrap refits "
+                           f"({bootstrap.block_length}-month blocks over {bootstrap.nobs} months)")
+            
+            st.markdown("#### Scenario Grid - FX × Temperature")
+            fig_grid = build_scenario_grid(base_revpar, sim_aqi, elasticities)
+            st.plotly_chart(fig_grid, use_container_width=True)
+            
+            st.markdown("#### Seasonal Forecast - Next 12 Months")
+            
+            fc_col1, fc_col2 = st.columns(2)
+            with fc_col1:
+                forecast_method = st.radio("Forecast model", list(METHOD_LABELS), format_func=METHOD_LABELS.get,
+                                           horizontal=True, key="forecast_method")
+            forecast_history, forecasts = load_forecasts(data_source, forecast_method)
+            with fc_col2:
+                forecast_metric = st.selectbox("Series", list(forecasts), key="forecast_metric")
+            
+            seasonal_forecast = forecasts[forecast_metric]
+            st.plotly_chart(build_forecast_chart(forecast_history, seasonal_forecast), use_container_width=True)
+            gap_note = ("the excluded 2020-2021 months are treated as missing" if forecast_method == 'sarima'
+                        else "only months after the excluded 2020-2021 gap are used")
+            st.caption(f"Fitted on {seasonal_forecast['observations']} months (AIC {seasonal_forecast['aic']:,.1f}); {gap_note}.")
+            
+            st.markdown("#### Monte Carlo Risk Simulation")
+            
+            mc_col1, mc_col2 = st.columns(2)
+            with mc_col1:
+                run_mc = st.toggle("Enable simulation mode", help="Simulate correlated FX / temperature / AQI paths drawn from the historical data")
+            with mc_col2:
+                mc_draws = st.select_slider("Simulated paths", options=[10_000, 100_000, 1_000_000], value=100_000)
+            
+            if run_mc:
+                risk_bands = run_risk_simulation(data_source, float(base_revpar), float(sim_fx), mc_draws, tuple(elasticities))
+                horizon_bands = risk_bands.loc['Horizon Average']
+                
+                risk_col1, risk_col2, risk_col3 = st.columns(3)
+                with risk_col1:
+                    st.metric("RevPAR-at-Risk (P5)", f"₹{horizon_bands['P5']:,.0f}", f"{horizon_bands['P5'] - base_revpar:+,.0f} vs base")
+                with risk_col2:
+                    st.metric("Median RevPAR (P50)", f"₹{horizon_bands['P50']:,.0f}", "12-Month Average")
+                with risk_col3:
+                    st.metric("Upside RevPAR (P95)", f"₹{horizon_bands['P95']:,.0f}", f"{horizon_bands['P95'] - base_revpar:+,.0f} vs base")
+                
+                st.plotly_chart(build_risk_fan_chart(risk_bands, mc_draws), use_container_width=True)
+                st.dataframe(risk_bands.round(0), use_container_width=True)
+    
+    # ==================== TAB 7: ELASTICITY DRIFT ====================
+    with tab7, profile.section("Tab 7 - Elasticity Drift"):
+        if tab_is_open(tab7):
+            st.markdown('<div class="subsection-title">Rolling-Window Elasticity Drift</div>', unsafe_allow_html=True)
+            st.caption("Log-log OLS re-estimated over trailing windows of complete months, updated one observation at a time")
+            
+            drift_paths = {window: load_rolling_elasticities(data_source, window) for window in DRIFT_WINDOWS}
+            st.plotly_chart(build_drift_chart(drift_paths), use_container_width=True)
+            
+            st.markdown("#### Latest Window Estimates")
+            st.dataframe(latest_drift_table(drift_paths), use_container_width=True)
     
     st.markdown("---")
     
     # ==================== STRATEGIC INSIGHTS ====================
+    profile.lap("Insights & footer")
     st.markdown('<div class="section-title">💡 Strategic Insights & Recommendations</div>', unsafe_allow_html=True)
     
     with st.expander("📌 Market Analysis & Recommendations", expanded=True):
@@ -1021,6 +1019,33 @@ try:
                 <p style='color: #94A3B8; font-size: 0.75em; margin-top: 10px;'>Last Updated: {pd.Timestamp.now().strftime("%Y-%m-%d %H:%M")} | Data Integrity: Verified</p>
             </div>
         """, unsafe_allow_html=True)
+    
+    # ==================== DIAGNOSTICS ====================
+    rerun_profile = profile.finish(year_range=list(year_range), months=len(selected_months))
+    
+    st.sidebar.markdown("---")
+    if st.sidebar.toggle("🩺 Diagnostics", key="diagnostics", help="Per-section rerun timings and cache statistics"):
+        st.sidebar.metric("Rerun Time", f"{rerun_profile['total_ms']:,.0f} ms")
+        
+        section_times = pd.Series(rerun_profile['sections_ms'], name='ms').sort_values(ascending=False)
+        st.sidebar.dataframe(section_times.round(1), use_container_width=True)
+        if rerun_profile['detail_ms']:
+            detail_times = pd.Series(rerun_profile['detail_ms'], name='ms').sort_values(ascending=False)
+            st.sidebar.caption("Within sections (already counted above)")
+            st.sidebar.dataframe(detail_times.round(1), use_container_width=True)
+        
+        cache_rows = []
+        for name, process_stats in sorted(CACHE_TOTALS.items()):
+            rerun_stats = rerun_profile['cache'].get(name, {'hits': 0, 'misses': 0})
+            cache_rows.append({
+                'Cache': name,
+                'Rerun Hits': rerun_stats['hits'],
+                'Rerun Misses': rerun_stats['misses'],
+                'Total Hits': process_stats['calls'] - process_stats['misses'],
+                'Total Misses': process_stats['misses'],
+            })
+        st.sidebar.dataframe(pd.DataFrame(cache_rows).set_index('Cache'), use_container_width=True)
+        st.sidebar.caption(f"Each rerun is appended to {PROFILE_LOG}")
 
 except FileNotFoundError as e:
     st.error(f"❌ Data file not found: {e}")
@@ -0,0 +1,203 @@
+"""Headless benchmarks for the PDIS data pipeline and figure builders.
+
+Generates synthetic datasets at the requested scales, times each pipeline
+stage without a browser and writes the results as JSON. Pass ``--baseline``
+to compare against an earlier run and flag regressions.
+
+    python -m benchmarks.bench_pipeline --scales 1 100 --output bench.json
+    python -m benchmarks.bench_pipeline --scales 1 100 --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from pdis import engine
+from pdis.append import append_batch, load_aggregates
+from pdis.bootstrap import bootstrap_elasticities
+from pdis.changepoint import detect_change_points
+from pdis.climate import climate_surface
+from pdis.correlation import CellCorrelations
+from pdis.cube import build_aggregate_cube
+from pdis.elasticity import fit_elasticity_model, scenario_elasticities
+from pdis.figures import TAB_BUILDERS
+from pdis.forecast import forecast_series
+from pdis.ingest import PDIS_CSV, list_partitions, load_pdis_frame, read_pdis_csv, write_partitions, write_store
+from pdis.rolling import rolling_elasticities
+from pdis.scenarios import predict_revpar, scenario_grid
+from pdis.sharedcache import SharedCache, shared_dataset
+from pdis.synthetic import SCALES, generate_pdis_dataset, generate_scaled_dataset
+from pdis.timeseries import build_period_cube
+
+# A representative sidebar state: most of the history, a handful of months
+FILTER_MONTHS = ['January', 'May', 'June', 'November', 'December']
+
+
+def _timed(func, repeat):
+    """Run ``func`` ``repeat`` times; return its last result and the timings in ms"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+    }
+
+
+def bench_scale(scale, repeat=3, workdir=None):
+    """Time every pipeline stage on one synthetic dataset"""
+    timings = {}
+    raw = generate_scaled_dataset(scale)
+    generator = SCALES[scale]
+    next_year = generate_pdis_dataset(generator['cities'], 1, generator['freq'],
+                                      start_year=int(raw['Year'].max()) + 1, seed=1)
+    next_month = next_year[next_year['Month'] == 'January']
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        csv_path = os.path.join(tmp, PDIS_CSV)
+        store_dir = os.path.join(tmp, 'store')
+        raw.to_csv(csv_path, index=False)
+
+        df, timings['load_csv'] = _timed(lambda: read_pdis_csv(csv_path), repeat)
+        _, timings['ingest_store'] = _timed(lambda: write_store(df, csv_path, store_dir), 1)
+        df, timings['load_store'] = _timed(lambda: load_pdis_frame(csv_path, store_dir), repeat)
+        load_aggregates(df, csv_path, store_dir)
+        batch_path = os.path.join(tmp, 'next_month.csv')
+        next_month.to_csv(batch_path, index=False)
+        _, timings['append_month'] = _timed(
+            lambda: append_batch(pd.read_csv(batch_path), csv_path, store_dir), 1)
+
+        partition_store = os.path.join(tmp, 'partitioned')
+        _, timings['ingest_partitions'] = _timed(lambda: write_partitions(df, csv_path, partition_store), 1)
+        # First load builds every partition's aggregates on the process pool
+        _, timings['aggregate_partitions'] = _timed(lambda: engine.load_dataset(csv_path, partition_store), 1)
+        first = list_partitions(partition_store)[:1]
+        _, timings['load_one_partition'] = _timed(
+            lambda: engine.load_dataset(csv_path, partition_store, partitions=first), repeat)
+
+        # One replica publishes the dataset, the others attach to the mapped entry
+        shared = SharedCache(os.path.join(tmp, 'shared'))
+        names = list_partitions(partition_store)
+        load_all = lambda: engine.load_dataset(csv_path, partition_store, partitions=names)
+        _, timings['shared_cache_publish'] = _timed(
+            lambda: shared_dataset(shared, load_all, names, csv_path, partition_store), 1)
+        _, timings['shared_cache_attach'] = _timed(
+            lambda: shared_dataset(shared, load_all, names, csv_path, partition_store), repeat)
+
+        forecast_store = os.path.join(tmp, 'forecasts')
+        _, timings['forecast_fit'] = _timed(lambda: forecast_series(df, store_dir=forecast_store), 1)
+        _, timings['forecast_load'] = _timed(lambda: forecast_series(df, store_dir=forecast_store), repeat)
+
+    cube, timings['build_cube'] = _timed(lambda: build_aggregate_cube(df), repeat)
+    correlations, timings['build_correlation_cells'] = _timed(lambda: CellCorrelations.from_frame(df), repeat)
+
+    years = sorted(df['Year'].unique())
+    year_range = (int(years[min(1, len(years) - 1)]), int(years[-1]))
+
+    data = engine.Dataset(df, cube, correlations)
+
+    def apply_filter():
+        view = engine.apply_filters(data, year_range, FILTER_MONTHS)
+        return view, engine.kpis(view)
+
+    (view, kpis), timings['filter_and_kpis'] = _timed(apply_filter, repeat)
+
+    for tab, builder in TAB_BUILDERS.items():
+        _, timings[f'tab_{tab}'] = _timed(lambda: builder(view), repeat)
+    period_cube, timings['build_period_cube_week'] = _timed(lambda: build_period_cube(df, 'Week'), repeat)
+    _, timings['resample_week'] = _timed(
+        lambda: engine.resampled_trends(period_cube, year_range, FILTER_MONTHS), repeat)
+    _, timings['change_points'] = _timed(lambda: detect_change_points(df), repeat)
+    _, timings['correlation_all_measures'] = _timed(
+        lambda: engine.strong_correlations(engine.correlation_matrix(view, None)), repeat)
+
+    _, timings['climate_surface'] = _timed(lambda: climate_surface(view.cells), repeat)
+    fit, timings['elasticity_fit'] = _timed(lambda: fit_elasticity_model(view.rows), repeat)
+    _, timings['elasticity_bootstrap_10k'] = _timed(lambda: bootstrap_elasticities(view.rows), repeat)
+    elasticities = scenario_elasticities(fit)
+    base_revpar = kpis['avg_revpar']
+    grid = scenario_grid(np.linspace(50, 500, 40), np.linspace(70, 95, 40), np.linspace(10, 45, 40))
+    _, timings['scenario_table'] = _timed(
+        lambda: engine.scenario_table(base_revpar, (200, 83.0, 30.0), elasticities), repeat)
+    _, timings['scenario_grid_64k'] = _timed(lambda: predict_revpar(base_revpar, grid, elasticities), repeat)
+    _, timings['rolling_elasticities_24m'] = _timed(lambda: rolling_elasticities(df, 24), repeat)
+
+    return {'rows': int(len(raw)), 'generator': SCALES[scale], 'timings': timings}
+
+
+def compare(results, baseline, threshold):
+    """Median-time ratios against a baseline run, with regressions flagged"""
+    report = {}
+    for scale, result in results['results'].items():
+        base = baseline.get('results', {}).get(scale)
+        if base is None:
+            continue
+        for step, timing in result['timings'].items():
+            base_timing = base['timings'].get(step)
+            if not base_timing or not base_timing['median_ms']:
+                continue
+            ratio = timing['median_ms'] / base_timing['median_ms']
+            report[f'{scale}x/{step}'] = {
+                'baseline_ms': base_timing['median_ms'],
+                'current_ms': timing['median_ms'],
+                'ratio': round(ratio, 3),
+                'regression': ratio > threshold,
+            }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 100], choices=sorted(SCALES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="Write results JSON here (default: stdout)")
+    parser.add_argument('--baseline', help="Compare against a previous results JSON")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Median-time ratio above which a step counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+        },
+        'results': {},
+    }
+    for scale in args.scales:
+        print(f"Benchmarking {scale}x ...", file=sys.stderr)
+        results['results'][str(scale)] = bench_scale(scale, args.repeat)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            results['comparison'] = compare(results, json.load(f), args.threshold)
+        regressions = [k for k, v in results['comparison'].items() if v['regression']]
+        for key in regressions:
+            print(f"REGRESSION {key}: {results['comparison'][key]['ratio']}x baseline", file=sys.stderr)
+        exit_code = 1 if regressions else 0
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + '\n')
+    else:
+        print(payload)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
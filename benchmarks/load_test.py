@@ -0,0 +1,356 @@
+"""Concurrent-session load test for the dashboard.
+
+Drives ``app.py`` headlessly through Streamlit's ``AppTest``. Each
+simulated analyst is a thread with its own session and runs a random but
+seeded interaction trace: dragging the scenario sliders, narrowing the
+year range or months, switching tabs and changing the granularity, with
+think time between actions. The sessions share one process, as they would
+in a single Streamlit server, so they compete for the same caches and the
+same GIL.
+
+The report gives these measures, as JSON:
+
+- rerun latency percentiles (p50 / p95 / p99) overall and per action;
+- the rate of reruns;
+- CPU time and average busy cores;
+- baseline and peak resident memory.
+
+Pass ``--baseline`` to flag regressions in p95 latency or peak memory.
+
+    python -m benchmarks.load_test --sessions 50 --actions 20 --output load.json
+    python -m benchmarks.load_test --sessions 50 --actions 20 --baseline load.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from importlib import metadata
+
+import numpy as np
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+QUANTILES = (50, 95, 99)
+
+# Relative frequency of each interaction in a trace; slider drags dominate
+ACTION_WEIGHTS = {
+    'scenario': 0.40,
+    'tab': 0.25,
+    'year_range': 0.15,
+    'months': 0.15,
+    'granularity': 0.05,
+}
+SCENARIO_SLIDERS = ['AQI Level', 'USD/INR Exchange Rate', 'Avg Temperature (°C)']
+
+
+# ==================== MEMORY & CPU ====================
+def current_rss():
+    """Resident set size of this process in bytes (0 where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm', encoding='ascii') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss():
+    """High-water resident set size of this process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssSampler(threading.Thread):
+    """Samples RSS in the background so the peak during the run is known"""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return max(self.peak, current_rss())
+
+
+# ==================== SESSIONS ====================
+@contextmanager
+def shared_test_runtime():
+    """Let concurrent ``AppTest`` sessions outlive each other's runs, while active.
+
+    Each ``AppTest.run`` installs a stand-in runtime and switches on test mode
+    for its duration, then undoes both, which would pull them out from under
+    sessions still running. Test mode is left on for the whole load test, and
+    while no runtime is installed the most recent one is handed out instead.
+
+    Every run also compiles the script afresh, and CPython 3.11 can corrupt
+    concurrent AST compiles, so compiling is serialized as it effectively is
+    behind a server's single script cache.
+
+    These patch Streamlit internals, so they are undone on exit and the
+    report records the Streamlit version they ran against.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    saved = {
+        'app_test': config.get_option('global.appTest'),
+        'instance': Runtime.__dict__['instance'],
+        'exists': Runtime.__dict__['exists'],
+        'get_bytecode': ScriptCache.__dict__['get_bytecode'],
+    }
+    last = {}
+    compile_lock = threading.Lock()
+
+    def instance(cls):
+        if cls._instance is not None:
+            last['runtime'] = cls._instance
+            return cls._instance
+        if 'runtime' in last:
+            return last['runtime']
+        raise RuntimeError("Runtime hasn't been created!")
+
+    def exists(cls):
+        return cls._instance is not None or 'runtime' in last
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            return saved['get_bytecode'](self, script_path)
+
+    config.set_option('global.appTest', True)
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    ScriptCache.get_bytecode = get_bytecode
+    try:
+        yield
+    finally:
+        ScriptCache.get_bytecode = saved['get_bytecode']
+        Runtime.exists = saved['exists']
+        Runtime.instance = saved['instance']
+        config.set_option('global.appTest', saved['app_test'])
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def make_trace(rng, n_actions):
+    """Action names for one session, drawn by ``ACTION_WEIGHTS``"""
+    names = list(ACTION_WEIGHTS)
+    weights = np.array(list(ACTION_WEIGHTS.values()))
+    return list(rng.choice(names, size=n_actions, p=weights / weights.sum()))
+
+
+def apply_action(at, action, rng, tabs, state):
+    """Change one widget the way an analyst would before the next rerun"""
+    if action == 'scenario':
+        slider = _widget(at.sidebar.slider, SCENARIO_SLIDERS[rng.integers(len(SCENARIO_SLIDERS))])
+        steps = int(round((slider.max - slider.min) / slider.step))
+        value = slider.min + slider.step * int(rng.integers(steps + 1))
+        slider.set_value(type(slider.value)(value))
+    elif action == 'year_range':
+        slider = _widget(at.sidebar.slider, 'Select Year Range')
+        lo, hi = sorted(int(v) for v in rng.integers(slider.min, slider.max + 1, size=2))
+        slider.set_value((lo, hi))
+    elif action == 'months':
+        widget = _widget(at.sidebar.multiselect, 'Select Months')
+        options = list(widget.options)
+        size = int(rng.integers(1, len(options) + 1))
+        widget.set_value([options[i] for i in sorted(rng.choice(len(options), size=size, replace=False))])
+    elif action == 'granularity':
+        widget = _widget(at.sidebar.selectbox, 'Time Granularity')
+        widget.set_value(widget.options[rng.integers(len(widget.options))])
+    elif action == 'tab':
+        state['tab'] = tabs[rng.integers(len(tabs))]
+    # Keep the session on its current tab across the rerun
+    at.session_state['active_tab'] = state['tab']
+
+
+def run_session(index, args, tabs, start_at, records, errors):
+    """One simulated analyst: open the app, then replay a trace with think time"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = np.random.default_rng([args.seed, index])
+    trace = make_trace(rng, args.actions)
+    time.sleep(max(0.0, start_at - time.perf_counter()))
+
+    at = AppTest.from_file(args.app, default_timeout=args.timeout)
+    state = {'tab': tabs[0]}
+    for step, action in enumerate(['open'] + trace):
+        try:
+            if action != 'open':
+                apply_action(at, action, rng, tabs, state)
+            started = time.perf_counter()
+            at.run()
+            latency = time.perf_counter() - started
+        except Exception as exc:  # a crashed rerun is a result, not a harness failure
+            errors.append({'session': index, 'step': step, 'action': action, 'error': repr(exc)})
+            continue
+        records.append((action, latency))
+        # app.py catches its own failures and shows them with st.error, so both count
+        failures = [e.value for e in at.exception] + [e.value for e in at.error]
+        if failures:
+            errors.append({'session': index, 'step': step, 'action': action, 'error': failures[0]})
+        if args.think_time:
+            time.sleep(rng.exponential(args.think_time))
+
+
+# ==================== REPORT ====================
+def latency_summary(latencies):
+    values = np.asarray(latencies) * 1000
+    summary = {'count': int(len(values))}
+    if len(values):
+        summary.update({f'p{q}_ms': round(float(np.percentile(values, q)), 3) for q in QUANTILES})
+        summary['mean_ms'] = round(float(values.mean()), 3)
+        summary['max_ms'] = round(float(values.max()), 3)
+    return summary
+
+
+def run_load_test(args):
+    """Warm the app up once, then run every session concurrently and summarise"""
+    logging.disable(logging.CRITICAL)
+    with shared_test_runtime():
+        return _run_sessions(args)
+
+
+def _run_sessions(args):
+    from streamlit.testing.v1 import AppTest
+
+    baseline_rss = current_rss()
+    started = time.perf_counter()
+    warm = AppTest.from_file(args.app, default_timeout=args.timeout).run()
+    cold_start = time.perf_counter() - started
+    tabs = [tab.label for tab in warm.tabs]
+    if not tabs:
+        raise RuntimeError("The app rendered no tabs; check that it runs headlessly")
+
+    records, errors = [], []
+    sampler = RssSampler()
+    sampler.start()
+    cpu_before, wall_before = os.times(), time.perf_counter()
+    threads = [
+        threading.Thread(target=run_session, name=f'session-{i}',
+                         args=(i, args, tabs, wall_before + args.ramp_up * i / args.sessions, records, errors))
+        for i in range(args.sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_before
+    cpu_after = os.times()
+    peak_during = sampler.stop()
+
+    cpu = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    by_action = {}
+    for action, latency in records:
+        by_action.setdefault(action, []).append(latency)
+    return {
+        'cold_start_ms': round(cold_start * 1000, 3),
+        'wall_s': round(wall, 3),
+        'reruns_per_s': round(len(records) / wall, 3) if wall else None,
+        'latency': latency_summary([latency for _, latency in records]),
+        'latency_by_action': {action: latency_summary(values) for action, values in sorted(by_action.items())},
+        'cpu': {
+            'seconds': round(cpu, 3),
+            'avg_busy_cores': round(cpu / wall, 3) if wall else None,
+        },
+        'memory': {
+            'baseline_rss_mb': round(baseline_rss / 2 ** 20, 1),
+            'peak_rss_mb': round(max(peak_during, peak_rss()) / 2 ** 20, 1),
+        },
+        'errors': errors,
+    }
+
+
+def compare(result, baseline, threshold):
+    """p95 latency and peak memory against a baseline run, with regressions flagged"""
+    checks = {
+        'p95_ms': (result['latency'].get('p95_ms'), baseline.get('result', {}).get('latency', {}).get('p95_ms')),
+        'peak_rss_mb': (result['memory']['peak_rss_mb'], baseline.get('result', {}).get('memory', {}).get('peak_rss_mb')),
+    }
+    report = {}
+    for name, (current, base) in checks.items():
+        if not current or not base:
+            continue
+        ratio = current / base
+        report[name] = {
+            'baseline': base,
+            'current': current,
+            'ratio': round(ratio, 3),
+            'regression': ratio > threshold,
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', default=APP_PATH, help="Streamlit script to drive")
+    parser.add_argument('--sessions', type=int, default=50, help="Concurrent simulated analysts")
+    parser.add_argument('--actions', type=int, default=20, help="Interactions per session after opening the app")
+    parser.add_argument('--think-time', type=float, default=0.5,
+                        help="Mean pause between a session's actions, in seconds (0 for a stress run)")
+    parser.add_argument('--ramp-up', type=float, default=5.0, help="Seconds over which sessions join")
+    parser.add_argument('--timeout', type=float, default=600.0, help="Per-rerun timeout in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results JSON here (default: stdout)")
+    parser.add_argument('--baseline', help="Compare against a previous results JSON")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Ratio to the baseline above which p95 latency or peak RSS counts as a regression")
+    args = parser.parse_args(argv)
+
+    print(f"Running {args.sessions} session(s) x {args.actions} action(s) ...", file=sys.stderr)
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'streamlit': metadata.version('streamlit'),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'sessions': args.sessions,
+            'actions': args.actions,
+            'think_time': args.think_time,
+            'ramp_up': args.ramp_up,
+            'seed': args.seed,
+        },
+        'result': run_load_test(args),
+    }
+
+    exit_code = 1 if results['result']['errors'] else 0
+    for error in results['result']['errors'][:5]:
+        print(f"ERROR session {error['session']} step {error['step']} ({error['action']}): {error['error']}",
+              file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            results['comparison'] = compare(results['result'], json.load(f), args.threshold)
+        regressions = [k for k, v in results['comparison'].items() if v['regression']]
+        for key in regressions:
+            print(f"REGRESSION {key}: {results['comparison'][key]['ratio']}x baseline", file=sys.stderr)
+        exit_code = exit_code or (1 if regressions else 0)
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + '\n')
+    else:
+        print(payload)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
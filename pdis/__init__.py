@@ -0,0 +1,6 @@
+"""PDIS analytics engine - Streamlit-free building blocks for the dashboard.
+
+``pdis.engine`` is the headless entry point (load, filter, KPIs, tables,
+scenarios). ``pdis.figures`` adds the plotly layer on top of it; nothing in
+the package imports Streamlit.
+"""
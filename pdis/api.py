@@ -0,0 +1,280 @@
+"""JSON query API over the PDIS engine.
+
+A small Starlette (ASGI) app exposing the dashboard's numbers to other
+systems. Every endpoint takes the sidebar filters as query parameters::
+
+    GET /kpis?start=2017&end=2024&months=May,June
+    GET /trends    GET /yoy    GET /correlations
+    GET /scenario?aqi=320&fx=90.5&temp=37
+
+Serialized responses are kept in a TTL + LRU cache keyed by the path and
+the normalized parameters, and concurrent misses for the same key share a
+single computation. Engine work runs in the threadpool so the event loop
+stays free. When the store changes (e.g. new months were appended), the
+dataset is reloaded and the response cache dropped. Serve with::
+
+    python -m pdis.api --host 0.0.0.0 --port 8000
+"""
+import argparse
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from pdis import engine
+from pdis.elasticity import ElasticityFitter, data_fingerprint, scenario_elasticities, selection_key
+from pdis.ingest import MONTH_ORDER, PDIS_CSV, STORE_DIR, partitions_version
+
+DEFAULT_TTL = 300
+DEFAULT_MAXSIZE = 1024
+
+
+class TTLCache:
+    """LRU mapping whose entries also expire ``ttl`` seconds after insertion"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# ==================== PARAMETERS ====================
+def _records(df):
+    """DataFrame rows as JSON-safe dicts (NaN becomes null)"""
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+
+def json_safe(value):
+    """``value`` with NaN and infinities replaced by None, recursively"""
+    if isinstance(value, dict):
+        return {k: json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    if isinstance(value, (bool, int, str)) or value is None:
+        return value
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return value
+    return value if math.isfinite(value) else None
+
+
+def serialize(result):
+    """Strict JSON bytes; non-finite numbers go out as null"""
+    return json.dumps(json_safe(result), allow_nan=False).encode()
+
+
+def parse_filters(params, data):
+    """``(year_range, months)`` from query parameters, in canonical form"""
+    lo, hi = engine.year_bounds(data)
+    try:
+        year_range = (int(params.get('start', lo)), int(params.get('end', hi)))
+    except ValueError:
+        raise ValueError("start and end must be integers")
+    if year_range[0] > year_range[1]:
+        raise ValueError("start must not be after end")
+
+    months = [m.strip() for m in params.get('months', '').split(',') if m.strip()]
+    unknown = [m for m in months if m not in MONTH_ORDER]
+    if unknown:
+        raise ValueError(f"unknown months: {', '.join(unknown)}")
+    return year_range, tuple(sorted(set(months), key=MONTH_ORDER.index))
+
+
+def parse_scenario(params):
+    defaults = engine.SCENARIO_PRESETS['Base Case']
+    try:
+        return tuple(float(params.get(name, default)) for name, default in zip(('aqi', 'fx', 'temp'), defaults))
+    except ValueError:
+        raise ValueError("aqi, fx and temp must be numbers")
+
+
+# ==================== QUERIES ====================
+def query_kpis(view):
+    return engine.kpis(view)
+
+
+def query_trends(view):
+    return _records(engine.yearly_trends(view))
+
+
+def query_yoy(view):
+    return _records(engine.yoy_growth(engine.yearly_trends(view)))
+
+
+def query_correlations(view):
+    corr = engine.correlation_matrix(view)
+    insights = engine.strong_correlations(corr)
+    return {
+        'matrix': {col: {k: float(v) for k, v in row.items()} for col, row in corr.to_dict().items()},
+        'strong_pairs': [] if insights is None else _records(insights),
+    }
+
+
+def query_scenario(view, scenario, elasticities):
+    base_revpar = engine.kpis(view)['avg_revpar']
+    return {
+        'elasticities': dict(zip(('AQI', 'FX', 'Temp'), map(float, elasticities))),
+        'forecast': engine.scenario_forecast(base_revpar, scenario, elasticities),
+        'scenarios': _records(engine.scenario_table(base_revpar, scenario, elasticities)),
+    }
+
+
+QUERIES = {
+    '/kpis': query_kpis,
+    '/trends': query_trends,
+    '/yoy': query_yoy,
+    '/correlations': query_correlations,
+}
+
+
+# ==================== APPLICATION ====================
+def create_app(data=None, ttl=DEFAULT_TTL, maxsize=DEFAULT_MAXSIZE, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """ASGI app over ``data``, or over the PDIS store reloaded whenever it changes"""
+    state = {'data': data, 'version': None, 'fingerprint': None}
+    cache = TTLCache(maxsize, ttl)
+    inflight = {}
+    fitter = ElasticityFitter(maxsize=64)
+    reload_lock = threading.Lock()
+
+    def dataset():
+        """``(data, version)``, reloading the store first if it changed"""
+        if data is not None:
+            return data, None
+        with reload_lock:
+            version = partitions_version(csv_path, store_dir)
+            if state['data'] is None or version != state['version']:
+                state['data'] = engine.load_dataset(csv_path, store_dir)
+                state['version'] = version
+                state['fingerprint'] = None
+                cache.clear()
+            return state['data'], state['version']
+
+    def fingerprint(data):
+        with reload_lock:
+            if state['fingerprint'] is None or state['fingerprint'][0] is not data:
+                state['fingerprint'] = (data, data_fingerprint(data.rows))
+            return state['fingerprint'][1]
+
+    async def cached(key, compute):
+        body = cache.get(key)
+        if body is not None:
+            return Response(body, media_type='application/json', headers={'X-Cache': 'HIT'})
+
+        # Concurrent misses for one key wait on the first computation
+        pending = inflight.get(key)
+        if pending is None:
+            pending = inflight[key] = asyncio.ensure_future(run_in_threadpool(compute))
+            try:
+                body = await pending
+                cache.set(key, body)
+            finally:
+                inflight.pop(key, None)
+        else:
+            body = await pending
+        return Response(body, media_type='application/json', headers={'X-Cache': 'MISS'})
+
+    def selection(data, year_range, months):
+        view = engine.apply_filters(data, year_range, months)
+        if view.cells.empty:
+            raise LookupError("no data for the selected years and months")
+        return view
+
+    def endpoint(path, func):
+        async def handler(request):
+            data, version = await run_in_threadpool(dataset)
+            try:
+                year_range, months = parse_filters(request.query_params, data)
+                return await cached((version, path, year_range, months),
+                                    lambda: serialize(func(selection(data, year_range, months))))
+            except ValueError as e:
+                return JSONResponse({'error': str(e)}, status_code=400)
+            except LookupError as e:
+                return JSONResponse({'error': str(e)}, status_code=404)
+        return handler
+
+    async def scenario(request):
+        data, version = await run_in_threadpool(dataset)
+        try:
+            year_range, months = parse_filters(request.query_params, data)
+            scenario = parse_scenario(request.query_params)
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+
+        def compute():
+            view = selection(data, year_range, months)
+            fit = fitter.submit(selection_key(fingerprint(data), year_range, months), view.rows).result()
+            return serialize(query_scenario(view, scenario, scenario_elasticities(fit)))
+
+        try:
+            return await cached((version, '/scenario', year_range, months, scenario), compute)
+        except LookupError as e:
+            return JSONResponse({'error': str(e)}, status_code=404)
+
+    async def health(request):
+        return JSONResponse({
+            'status': 'ok',
+            'rows': int(len((await run_in_threadpool(dataset))[0].rows)),
+            'cache': {'entries': len(cache), 'hits': cache.hits, 'misses': cache.misses},
+        })
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await run_in_threadpool(dataset)
+        yield
+
+    routes = [Route(path, endpoint(path, func)) for path, func in QUERIES.items()]
+    routes += [Route('/scenario', scenario), Route('/health', health)]
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.cache = cache
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the PDIS query API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help='response cache TTL in seconds')
+    parser.add_argument('--maxsize', type=int, default=DEFAULT_MAXSIZE, help='response cache entries')
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    uvicorn.run(create_app(ttl=args.ttl, maxsize=args.maxsize), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
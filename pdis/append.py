@@ -0,0 +1,239 @@
+"""Append-only ingestion of new PDIS months.
+
+``append_batch`` validates a batch of new rows, derives its metrics and
+writes it as a new segment next to the base store file, without rewriting
+or rereading the history. The (Year x Month) aggregate cube and the
+per-cell correlation statistics are persisted alongside the store and
+updated by merging in the batch's own aggregates, so an append costs time
+proportional to the new rows.
+
+    python -m pdis.append new_months.csv
+
+Batches are split by city / property and each part is appended to its own
+partition; rows for a partition the store does not have yet start a new one.
+Persisted aggregates record which store files they cover. When they are
+missing or stale (e.g. after ``python -m pdis.ingest``), ``load_aggregates``
+rebuilds them once from the rows.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from pdis.correlation import CellCorrelations
+from pdis.cube import CUBE_KEYS, build_aggregate_cube, merge_cubes
+from pdis.ingest import (PDIS_CSV, STORE_DIR, derive_columns, feather, list_partitions, month_categories, pa,
+                         partition_dir, read_store, split_partitions, store_is_fresh, store_path, store_segments,
+                         validate_schema, write_partitions)
+
+_STAT_SEP = '::'
+
+
+# ==================== PERSISTED AGGREGATES ====================
+def _aggregate_paths(csv_path, store_dir):
+    stem = os.path.splitext(store_path(csv_path, store_dir))[0]
+    return stem + '.cube.arrow', stem + '.correlations.npz', stem + '.aggregates.json'
+
+
+def _covered_files(csv_path, store_dir):
+    """Store files (with mtimes) that a set of aggregates is valid for"""
+    paths = [store_path(csv_path, store_dir)] + store_segments(csv_path, store_dir)
+    return [[os.path.basename(p), os.path.getmtime(p)] for p in paths]
+
+
+def _cube_to_frame(cube):
+    frame = cube.copy()
+    frame.columns = [f"{measure}{_STAT_SEP}{stat}" for measure, stat in frame.columns]
+    frame = frame.reset_index()
+    frame['Month'] = frame['Month'].astype(str)
+    return frame
+
+
+def _frame_to_cube(frame):
+    frame['Month'] = pd.Categorical(frame['Month'], categories=month_categories(frame['Month'].unique()))
+    cube = frame.set_index(CUBE_KEYS)
+    cube.columns = pd.MultiIndex.from_tuples(
+        [tuple(col.split(_STAT_SEP)) for col in cube.columns], names=['measure', 'stat']
+    )
+    return cube
+
+
+def _write_correlations(cells, path):
+    with open(path, 'wb') as f:
+        np.savez(
+            f,
+            years=cells.index.get_level_values('Year').to_numpy(),
+            months=cells.index.get_level_values('Month').astype(str).to_numpy(dtype=str),
+            columns=np.array(cells.columns),
+            n=cells.n, mean=cells.mean, m2=cells.m2, comoment=cells.comoment,
+        )
+
+
+def _read_correlations(path):
+    with np.load(path) as f:
+        months = pd.Categorical(f['months'], categories=month_categories(f['months']))
+        index = pd.MultiIndex.from_arrays([f['years'], months], names=CUBE_KEYS)
+        return CellCorrelations(index, f['columns'].tolist(), f['n'], f['mean'], f['m2'], f['comoment'])
+
+
+def write_aggregates(cube, correlations, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Persist the cube and correlation cells for the current store files"""
+    cube_path, corr_path, meta_path = _aggregate_paths(csv_path, store_dir)
+    feather.write_feather(_cube_to_frame(cube), cube_path + '.tmp', compression='uncompressed')
+    os.replace(cube_path + '.tmp', cube_path)
+    _write_correlations(correlations, corr_path + '.tmp')
+    os.replace(corr_path + '.tmp', corr_path)
+
+    meta = {'covers': _covered_files(csv_path, store_dir)}
+    with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+def read_aggregates(csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """``(cube, correlations)`` if persisted aggregates match the store, else None"""
+    cube_path, corr_path, meta_path = _aggregate_paths(csv_path, store_dir)
+    if feather is None or not all(os.path.exists(p) for p in (cube_path, corr_path, meta_path)):
+        return None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta['covers'] != _covered_files(csv_path, store_dir):
+        return None
+    cube = _frame_to_cube(feather.read_table(cube_path).to_pandas())
+    return cube, _read_correlations(corr_path)
+
+
+def build_aggregates(rows):
+    return build_aggregate_cube(rows), CellCorrelations.from_frame(rows)
+
+
+def load_aggregates(rows, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Persisted aggregates for ``rows``, rebuilding and saving them if stale"""
+    if not store_is_fresh(csv_path, store_dir):
+        return build_aggregates(rows)
+    aggregates = read_aggregates(csv_path, store_dir)
+    if aggregates is None:
+        aggregates = build_aggregates(rows)
+        try:
+            write_aggregates(*aggregates, csv_path, store_dir)
+        except OSError:
+            pass
+    return aggregates
+
+
+def refresh_partition_aggregates(name, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Aggregates for one stored partition, rebuilt from its rows if stale"""
+    part_dir = partition_dir(name, store_dir)
+    return load_aggregates(read_store(csv_path, part_dir), csv_path, part_dir)
+
+
+# ==================== APPEND PATH ====================
+def prepare_batch(batch, schema):
+    """Validate and derive a raw batch, then conform it to the store schema"""
+    rows = derive_columns(validate_schema(batch))
+    missing = [col for col in schema.names if col not in rows.columns]
+    extra = [col for col in rows.columns if col not in schema.names]
+    if missing or extra:
+        raise ValueError(f"Batch columns do not match the store (missing: {missing}, unexpected: {extra})")
+    try:
+        table = pa.Table.from_pandas(rows[schema.names], schema=schema, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"Batch does not match the store schema: {e}") from e
+    # Round-trip so the batch has exactly the store's column order and dtypes
+    return table.to_pandas(), table
+
+
+def plan_append(batch, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Validate a batch against the store without writing anything.
+
+    Raises for a batch that ``append_batch`` would reject; otherwise returns
+    what ``commit_append`` needs to write it.
+    """
+    if feather is None:
+        raise ImportError("pyarrow is required to append to the columnar store")
+    if not store_is_fresh(csv_path, store_dir):
+        raise FileNotFoundError(f"No up-to-date store for {csv_path!r}; run python -m pdis.ingest first")
+
+    aggregates = read_aggregates(csv_path, store_dir)
+    if aggregates is None:
+        aggregates = build_aggregates(read_store(csv_path, store_dir))
+    cube, correlations = aggregates
+
+    schema = feather.read_table(store_path(csv_path, store_dir), memory_map=True).schema
+    rows, table = prepare_batch(batch, schema)
+    if rows.empty:
+        raise ValueError("Batch has no rows outside the excluded years")
+
+    existing = set(cube.index.map(lambda key: (int(key[0]), str(key[1]))))
+    clashes = sorted({(int(y), str(m)) for y, m in zip(rows['Year'], rows['Month'])} & existing)
+    if clashes:
+        raise ValueError(f"Store already has rows for {clashes}; appends cannot overwrite months")
+    return rows, table, cube, correlations
+
+
+def commit_append(plan, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Write a batch checked by ``plan_append`` as a new segment; returns its path"""
+    rows, table, cube, correlations = plan
+    base = os.path.splitext(store_path(csv_path, store_dir))[0]
+    segment = f"{base}.append-{len(store_segments(csv_path, store_dir)) + 1:06d}.arrow"
+    feather.write_feather(table, segment + '.tmp', compression='uncompressed')
+    os.replace(segment + '.tmp', segment)
+
+    batch_cube, batch_correlations = build_aggregates(rows)
+    write_aggregates(merge_cubes(cube, batch_cube), correlations.merge(batch_correlations), csv_path, store_dir)
+    return segment
+
+
+def append_batch(batch, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Append new rows to the store and fold them into the persisted aggregates.
+
+    Rows for (Year, Month) cells already in the store are rejected; the store
+    is append-only. Returns the path of the new segment.
+    """
+    return commit_append(plan_append(batch, csv_path, store_dir), csv_path, store_dir)
+
+
+def append_partitions(batch, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Append a batch partition by partition; returns the files written.
+
+    Every partition's rows are validated before any is written, so a
+    rejected partition leaves the whole store and manifest untouched.
+    """
+    existing = set(list_partitions(store_dir))
+    if not existing:
+        raise FileNotFoundError(f"No partitioned store in {store_dir!r}; run python -m pdis.ingest first")
+    plans, new_parts = {}, []
+    for name, rows in split_partitions(batch).items():
+        if name in existing:
+            plans[name] = plan_append(rows, csv_path, partition_dir(name, store_dir))
+        else:
+            new_parts.append(derive_columns(validate_schema(rows)))
+
+    written = [commit_append(plan, csv_path, partition_dir(name, store_dir)) for name, plan in plans.items()]
+    if new_parts:
+        # Adds the new partitions to the manifest last
+        written += write_partitions(pd.concat(new_parts, ignore_index=True), csv_path, store_dir, replace=False)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append new PDIS months to the columnar store")
+    parser.add_argument('batches', nargs='+', help='CSV files with new rows, in the PDIS schema')
+    parser.add_argument('--store', default=STORE_DIR, help='columnar store directory')
+    args = parser.parse_args(argv)
+
+    for path in args.batches:
+        try:
+            written = append_partitions(pd.read_csv(path), store_dir=args.store)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 1
+        print(f"Appended {path} -> {', '.join(written)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
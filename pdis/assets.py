@@ -0,0 +1,71 @@
+"""Static assets loaded once per process, never on the render path."""
+import os
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+WHITE_PAPER_PATH = 'White Paper.pdf'
+
+HERO_IMAGE_URL = "https://images.unsplash.com/photo-1631049307264-da0ec9d70304?w=1200&h=400&fit=crop&q=80"
+# A bundled copy wins; otherwise the first successful download is kept in the store
+HERO_IMAGE_BUNDLED = os.path.join('assets', 'hero.jpg')
+HERO_IMAGE_CACHED = os.path.join('store', 'hero.jpg')
+
+
+def read_asset_bytes(path):
+    """Read a static file in one go"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class BackgroundAsset:
+    """Resolve an asset on a background thread; ``get`` never blocks.
+
+    Local copies are used when present. Otherwise the URL is fetched once and
+    written to ``cache_path``. A failed fetch is remembered, so an offline
+    server pays for the timeout once per process rather than once per rerun.
+    """
+
+    _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pdis-asset')
+
+    def __init__(self, url, local_paths, cache_path, timeout=5):
+        self.url = url
+        self.local_paths = list(local_paths)
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._future = None
+
+    def _load(self):
+        for path in self.local_paths + [self.cache_path]:
+            if os.path.exists(path):
+                return read_asset_bytes(path)
+
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            data = response.read()
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+        return data
+
+    def start(self):
+        with self._lock:
+            if self._future is None:
+                self._future = self._executor.submit(self._load)
+        return self
+
+    def get(self):
+        """Asset bytes if already resolved, otherwise None"""
+        future = self.start()._future
+        if not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+
+def hero_image():
+    return BackgroundAsset(HERO_IMAGE_URL, [HERO_IMAGE_BUNDLED], HERO_IMAGE_CACHED).start()
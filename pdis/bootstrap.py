@@ -0,0 +1,144 @@
+"""Moving-block bootstrap intervals for the elasticity model.
+
+The log-log regression from ``code.ipynb`` is refit on resampled months.
+Months are drawn in overlapping blocks of consecutive observations rather
+than one at a time, which keeps the serial correlation that the HAC errors
+account for in the point fit.
+
+Every replicate is a weighted least-squares problem on the same design
+matrix, so a batch is solved at once from stacked ``X'X`` and ``X'y``.
+Batches are spread over a process pool, each with its own random stream.
+The replicate coefficients then give percentile intervals for every term
+and for the RevPAR predicted under each scenario.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pdis.elasticity import FACTOR_TERMS, FORMULA, MIN_OBSERVATIONS, monthly_model_frame
+from pdis.scenarios import predict_revpar
+
+DEFAULT_REPLICATES = 10_000
+CONFIDENCE = 0.95
+# Observation counts held per batch (replicates x rows), bounding memory on long histories
+BATCH_CELLS = 2_000_000
+
+RESPONSE = FORMULA.split('~')[0].strip()
+TERMS = ['Intercept'] + [term.strip() for term in FORMULA.split('~')[1].split('+')]
+
+BootstrapResult = namedtuple('BootstrapResult', ['terms', 'params', 'replicates', 'block_length', 'nobs'])
+
+
+# ==================== RESAMPLING ====================
+def default_block_length(n):
+    """Block length growing like n^(1/3), the usual rate for moving blocks"""
+    return max(2, int(round(n ** (1 / 3))))
+
+
+def block_counts(rng, n, block_length, size):
+    """``(size, n)`` counts of how often each observation appears in a replicate.
+
+    Each replicate joins ``ceil(n / block_length)`` blocks with random starts
+    and is cut back to ``n`` observations.
+    """
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n - block_length + 1, size=(size, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_length)).reshape(size, -1)[:, :n]
+    flat = (np.arange(size)[:, None] * n + idx).ravel()
+    return np.bincount(flat, minlength=size * n).reshape(size, n).astype(float)
+
+
+def solve_replicates(X, y, counts):
+    """OLS coefficients for every row of observation counts, solved as one batch.
+
+    Each replicate's ``X'X`` and ``X'y`` are count-weighted sums of per-row
+    outer products, so the whole batch is two matrix products.
+    """
+    k = X.shape[1]
+    xtx = (counts @ (X[:, :, None] * X[:, None, :]).reshape(len(X), k * k)).reshape(-1, k, k)
+    xty = counts @ (X * y[:, None])
+    try:
+        return np.linalg.solve(xtx, xty[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        # A replicate that misses too many distinct months is rank deficient
+        return np.einsum('bkl,bl->bk', np.linalg.pinv(xtx), xty)
+
+
+def _run_batches(seed, batch_sizes, X, y, block_length):
+    rng = np.random.default_rng(seed)
+    return np.concatenate([
+        solve_replicates(X, y, block_counts(rng, len(y), block_length, size)) for size in batch_sizes
+    ])
+
+
+# ==================== BOOTSTRAP ====================
+def model_matrix(df):
+    """Design matrix and response over the monthly means, one row per complete month in time order"""
+    data = monthly_model_frame(df)
+    X = np.column_stack([np.ones(len(data))] + [data[term].to_numpy() for term in TERMS[1:]])
+    return X, data[RESPONSE].to_numpy()
+
+
+def bootstrap_elasticities(df, n_replicates=DEFAULT_REPLICATES, block_length=None,
+                           batch_size=None, workers=None, seed=0):
+    """Point fit plus ``n_replicates`` block-bootstrap coefficient vectors.
+
+    Returns None when the selection has too few complete observations.
+    """
+    X, y = model_matrix(df)
+    n = len(y)
+    if n < MIN_OBSERVATIONS:
+        return None
+    block_length = min(block_length or default_block_length(n), n)
+    batch_size = batch_size or max(1, min(n_replicates, BATCH_CELLS // n))
+
+    batches = [batch_size] * (n_replicates // batch_size)
+    if n_replicates % batch_size:
+        batches.append(n_replicates % batch_size)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(batches)))
+    tasks = [batches[i::workers] for i in range(workers)]
+    task_seeds = np.random.SeedSequence(seed).spawn(workers)
+    args = (X, y, block_length)
+
+    if workers == 1:
+        parts = [_run_batches(task_seeds[0], tasks[0], *args)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_batches, s, t, *args) for s, t in zip(task_seeds, tasks)]
+            parts = [f.result() for f in futures]
+
+    params = solve_replicates(X, y, np.ones((1, n)))[0]
+    return BootstrapResult(TERMS, params, np.concatenate(parts), block_length, n)
+
+
+# ==================== INTERVALS ====================
+def _bounds(level):
+    return 100 * (1 - level) / 2, 100 * (1 + level) / 2
+
+
+def coefficient_intervals(result, level=CONFIDENCE):
+    """Estimate, bootstrap standard error and percentile interval per term"""
+    lower, upper = np.percentile(result.replicates, _bounds(level), axis=0)
+    return pd.DataFrame({
+        'Estimate': result.params,
+        'Std Error': result.replicates.std(axis=0, ddof=1),
+        'Lower': lower,
+        'Upper': upper,
+    }, index=pd.Index(result.terms, name='Term'))
+
+
+def scenario_elasticity_draws(result):
+    """``(replicates, 3)`` (AQI, FX, Temp) elasticities, in scenarios.FACTORS order"""
+    return result.replicates[:, [result.terms.index(term) for term in FACTOR_TERMS]]
+
+
+def prediction_intervals(result, base_revpar, scenarios, level=CONFIDENCE):
+    """``(lower, upper)`` arrays of predicted RevPAR for each ``(n, 3)`` scenario"""
+    scenarios = np.asarray(scenarios, dtype=float)
+    draws = predict_revpar(base_revpar, scenarios[None, :, :], scenario_elasticity_draws(result)[:, None, :])
+    lower, upper = np.percentile(draws, _bounds(level), axis=0)
+    return lower, upper
@@ -0,0 +1,287 @@
+"""Online change-point detection for capture ratio, RevPAR and occupancy.
+
+Replaces the notebook's by-eye reading of the "Capture Ratio Collapse" with
+Bayesian online change-point detection (Adams & MacKay, 2007). Each series
+goes through these steps:
+
+- take logs and subtract the running mean of the same calendar month, so
+  the strong seasonality does not read as a regime change;
+- keep a posterior over the current run length with a Normal-Gamma model
+  per run, a new run starting from the latest level;
+- flag a break once the most likely run has lasted ``CONFIRM_RUN`` months
+  and started well after the previous break.
+
+Run lengths beyond ``MAX_RUN`` are folded into the longest one, so every
+new month costs constant time however long the history gets. The monitor
+state is saved under ``store/changepoints/``. A restart or an appended
+month then only processes the months it has not seen. The state also keeps
+a small anchor of the months already seen, their count and the first and
+last month's values, which is checked in constant time on every update; when
+a rebuild or correction changes it, the monitor starts over on the full
+history.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from scipy.special import gammaln
+
+from pdis.forecast import monthly_series
+from pdis.ingest import STORE_DIR
+
+CHANGEPOINT_DIR = 'changepoints'
+CHANGEPOINT_COLUMNS = ['Capture_Ratio (%)', 'RevPAR (INR)', 'Occupancy (%)']
+HAZARD = 1 / 60          # prior chance of a break in any month
+PRIOR_SCALE = 0.05       # typical month-to-month spread of the deseasonalized log series
+PRIOR_WEIGHT = 0.1       # months' worth of evidence in the prior level of a new run
+MAX_RUN = 240
+CONFIRM_RUN = 2
+CHANGE_PROBABILITY = 0.5
+MIN_SPACING = 6
+
+
+class OnlineChangePoint:
+    """Run-length posterior of one series under a Normal-Gamma model per run"""
+
+    def __init__(self, hazard=HAZARD, prior_scale=PRIOR_SCALE, max_run=MAX_RUN):
+        self.hazard = hazard
+        self.max_run = max_run
+        # Prior (mu, kappa, alpha, beta): alpha = 2 makes prior_scale**2 the expected
+        # variance, and a small kappa lets a new run's level sit well away from mu
+        self.prior = np.array([np.nan, PRIOR_WEIGHT, 2.0, prior_scale ** 2])
+        self.log_probs = np.zeros(1)
+        self.params = self.prior[:, None].copy()  # rows: mu, kappa, alpha, beta
+
+    def _predictive(self, x):
+        mu, kappa, alpha, beta = self.params
+        nu = 2 * alpha
+        var = beta * (kappa + 1) / (alpha * kappa)
+        return (gammaln((nu + 1) / 2) - gammaln(nu / 2) - 0.5 * np.log(nu * np.pi * var)
+                - (nu + 1) / 2 * np.log1p((x - mu) ** 2 / (nu * var)))
+
+    def update(self, x):
+        """Fold in one observation and return the most likely run length"""
+        if np.isnan(self.prior[0]):
+            self.prior[0] = self.params[0, 0] = x
+        joint = self.log_probs + self._predictive(x)
+        growth = joint + np.log1p(-self.hazard)
+        change = np.logaddexp.reduce(joint) + np.log(self.hazard)
+        log_probs = np.concatenate([[change], growth])
+        self.log_probs = log_probs - np.logaddexp.reduce(log_probs)
+
+        mu, kappa, alpha, beta = self.params
+        posterior = np.array([
+            (kappa * mu + x) / (kappa + 1),
+            kappa + 1,
+            alpha + 0.5,
+            beta + kappa * (x - mu) ** 2 / (2 * (kappa + 1)),
+        ])
+        # A new run starts from where the series is now
+        self.prior[0] = x
+        self.params = np.concatenate([self.prior[:, None], posterior], axis=1)
+
+        if len(self.log_probs) > self.max_run + 1:
+            # Fold the oldest run into the next one to keep the state bounded
+            self.log_probs[-2] = np.logaddexp(self.log_probs[-2], self.log_probs[-1])
+            self.log_probs = self.log_probs[:-1]
+            self.params = self.params[:, :-1]
+        return int(np.argmax(self.log_probs))
+
+    def recent_run(self, shortest, longest):
+        """Most likely run length in ``[shortest, longest]`` and the posterior mass of that range"""
+        window = self.log_probs[shortest:longest + 1]
+        if not len(window):
+            return None, 0.0
+        return shortest + int(np.argmax(window)), float(np.exp(np.logaddexp.reduce(window)))
+
+    def to_dict(self):
+        return {
+            'hazard': self.hazard,
+            'max_run': self.max_run,
+            'prior': self.prior.tolist(),
+            'log_probs': self.log_probs.tolist(),
+            'params': self.params.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        detector = cls(state['hazard'], max_run=state['max_run'])
+        detector.prior = np.array(state['prior'])
+        detector.log_probs = np.array(state['log_probs'])
+        detector.params = np.array(state['params'])
+        return detector
+
+
+class SeriesMonitor:
+    """Seasonal adjustment, detector and confirmed breaks for one metric"""
+
+    def __init__(self, hazard=HAZARD, prior_scale=PRIOR_SCALE, max_run=MAX_RUN):
+        self.detector = OnlineChangePoint(hazard, prior_scale, max_run)
+        self.month_sums = [0.0] * 12
+        self.month_counts = [0] * 12
+        self.recent = deque(maxlen=12)
+        self.n = 0
+        self.dates = deque(maxlen=max_run + 1)  # dates still reachable by a run
+        self.last_break = None
+        self.breaks = []
+
+    def update(self, date, value):
+        """Fold in one monthly value; returns the date of a newly confirmed break or None"""
+        if not value > 0:
+            return None
+        month = date.month - 1
+        log_value = np.log(value)
+        self.recent.append(log_value)
+        if len(self.recent) < self.recent.maxlen:
+            return None  # the first year only fills the trailing window
+
+        # Seasonal factor: how far this calendar month sits from its trailing 12-month mean
+        self.month_sums[month] += log_value - np.mean(self.recent)
+        self.month_counts[month] += 1
+        deviation = log_value - self.month_sums[month] / self.month_counts[month]
+        self.detector.update(deviation)
+        self.dates.append(date.strftime('%Y-%m-%d'))
+        self.n += 1
+
+        # A break is confirmed once most of the posterior sits on runs that started
+        # a few months ago, so a single outlier month does not count
+        run, mass = self.detector.recent_run(CONFIRM_RUN, 2 * CONFIRM_RUN)
+        if mass < CHANGE_PROBABILITY:
+            return None
+        start = self.n - run + 1  # position of the first month of the new run
+        if start <= 1 or (self.last_break is not None and start < self.last_break + MIN_SPACING):
+            return None
+        self.last_break = start
+        self.breaks.append(self.dates[-run])
+        return self.breaks[-1]
+
+    def to_dict(self):
+        return {
+            'detector': self.detector.to_dict(),
+            'month_sums': self.month_sums,
+            'month_counts': self.month_counts,
+            'recent': list(self.recent),
+            'n': self.n,
+            'dates': list(self.dates),
+            'last_break': self.last_break,
+            'breaks': self.breaks,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        monitor = cls()
+        monitor.detector = OnlineChangePoint.from_dict(state['detector'])
+        monitor.month_sums = state['month_sums']
+        monitor.month_counts = state['month_counts']
+        monitor.recent.extend(state['recent'])
+        monitor.n = state['n']
+        monitor.dates = deque(state['dates'], maxlen=monitor.detector.max_run + 1)
+        monitor.last_break = state['last_break']
+        monitor.breaks = state['breaks']
+        return monitor
+
+
+class ChangePointMonitor:
+    """Break detection over several monthly series, fed only the months it has not seen"""
+
+    def __init__(self, columns=CHANGEPOINT_COLUMNS, path=None):
+        self.path = path
+        self.columns = list(columns)
+        self._reset()
+        self._lock = threading.Lock()
+        self._load_state()
+
+    def _reset(self):
+        self.last_date = None
+        self.seen_anchor = None
+        self.series = {col: SeriesMonitor() for col in self.columns}
+
+    def _seen_anchor(self, series):
+        """Hash of how many months of ``series`` fall up to ``last_date`` and the first and last of them.
+
+        Only two rows are hashed, so checking it does not re-scan the history.
+        """
+        count = int(series.index.searchsorted(pd.Timestamp(self.last_date), side='right'))
+        if not count:
+            return None
+        ends = series.iloc[[0, count - 1]][[c for c in self.columns if c in series]]
+        digest = hashlib.sha1(pd.util.hash_pandas_object(ends).to_numpy().tobytes())
+        digest.update(str(count).encode())
+        return digest.hexdigest()
+
+    # ---- persistence ----
+    def _load_state(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.last_date = state['last_date']
+        self.seen_anchor = state.get('seen_anchor')
+        self.series.update({col: SeriesMonitor.from_dict(s) for col, s in state['series'].items()})
+
+    def _save_state(self):
+        if self.path is None:
+            return
+        state = {
+            'last_date': self.last_date,
+            'seen_anchor': self.seen_anchor,
+            'series': {col: monitor.to_dict() for col, monitor in self.series.items()},
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(self.path + '.tmp', self.path)
+        except OSError:
+            pass
+
+    # ---- ingestion ----
+    def update(self, series):
+        """Feed the months of a monthly ``series`` frame after the last one seen; returns how many.
+
+        If the months already seen no longer match the saved anchor, the state
+        is discarded and the whole series is fed again.
+        """
+        with self._lock:
+            full = series
+            if self.last_date is not None and self._seen_anchor(full) != self.seen_anchor:
+                self._reset()
+            if self.last_date is not None:
+                series = series[series.index > pd.Timestamp(self.last_date)]
+            series = series.dropna(how='all')
+            for date, row in series.iterrows():
+                for col, monitor in self.series.items():
+                    if col in row.index:
+                        monitor.update(date, row[col])
+            if len(series):
+                self.last_date = series.index[-1].strftime('%Y-%m-%d')
+                self.seen_anchor = self._seen_anchor(full)
+                self._save_state()
+            return len(series)
+
+    def breaks(self):
+        """``Metric, Date`` of every confirmed break, in date order"""
+        with self._lock:
+            records = [(col, pd.Timestamp(date)) for col, monitor in self.series.items() for date in monitor.breaks]
+        return pd.DataFrame(records, columns=['Metric', 'Date']).sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+def monitor_path(partitions, store_dir=STORE_DIR):
+    """State file for one selection of cities / properties"""
+    slug = re.sub(r'[^a-z0-9]+', '-', '+'.join(partitions).lower()).strip('-') or 'default'
+    return os.path.join(store_dir, CHANGEPOINT_DIR, f"{slug}.json")
+
+
+def detect_change_points(rows, columns=CHANGEPOINT_COLUMNS):
+    """One-off break detection over the full history of ``rows``"""
+    monitor = ChangePointMonitor(columns)
+    monitor.update(monthly_series(rows, columns))
+    return monitor.breaks()
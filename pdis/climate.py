@@ -0,0 +1,75 @@
+"""Climate revenue-at-risk surface.
+
+Generalizes the notebook's "Climate Opportunity Gap". The notebook ran a
+single scenario: 35 °C cooled to 30 °C, a baseline RevPAR of 4,500,
+15,000 rooms and 30 days. This module uses every month's actual RevPAR
+and temperature instead.
+
+For a month with temperature ``T`` and a target temperature ``T*``, RevPAR
+moves by ``heat_elasticity * (T* - T) / T``. The revenue at risk is that
+gain across the room inventory for the month's days. Targets warmer than
+the month carry no risk.
+
+The whole (month x target x rooms) surface is computed in one broadcast
+expression.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from pdis.ingest import MONTH_ORDER
+
+HEAT_ELASTICITY = -0.7045
+TEMPERATURE_BASES = {
+    'Avg_Temp': 'Average Temperature',
+    'Avg_Max_Temp': 'Average Maximum Temperature',
+}
+TARGET_TEMPS = np.arange(20.0, 40.5, 0.5)
+ROOM_INVENTORIES = np.array([5_000, 10_000, 15_000, 20_000, 25_000, 30_000])
+CRORE = 1e7
+
+ClimateSurface = namedtuple('ClimateSurface', ['months', 'targets', 'rooms', 'values'])
+
+
+def monthly_climate(cells, basis='Avg_Temp'):
+    """Per-(Year, Month) RevPAR, temperature and calendar days from aggregate cube cells"""
+    if basis not in TEMPERATURE_BASES:
+        raise ValueError(f"Unknown temperature basis {basis!r}; choose from {list(TEMPERATURE_BASES)}")
+
+    def mean(col):
+        return (cells[(col, 'sum')] / cells[(col, 'count')].where(cells[(col, 'count')] > 0)).to_numpy()
+
+    years = cells.index.get_level_values('Year').astype(int)
+    months = cells.index.get_level_values('Month').astype(str)
+    dates = pd.to_datetime(pd.DataFrame({
+        'year': years,
+        'month': [MONTH_ORDER.index(m) + 1 for m in months],
+        'day': 1,
+    }))
+    frame = pd.DataFrame({
+        'Date': dates,
+        'RevPAR (INR)': mean('RevPAR (INR)'),
+        'Temperature': mean(basis),
+        'Days': dates.dt.days_in_month,
+    }).dropna()
+    return frame.sort_values('Date').reset_index(drop=True)
+
+
+def revenue_at_risk(revpar, temps, days, targets=TARGET_TEMPS, rooms=ROOM_INVENTORIES,
+                    elasticity=HEAT_ELASTICITY):
+    """``(months, targets, rooms)`` array of INR revenue at risk from heat"""
+    revpar, temps, days = (np.asarray(a, dtype=float)[:, None, None] for a in (revpar, temps, days))
+    targets = np.asarray(targets, dtype=float)[None, :, None]
+    rooms = np.asarray(rooms, dtype=float)[None, None, :]
+    change = elasticity * (targets - temps) / temps
+    return np.maximum(revpar * change, 0.0) * rooms * days
+
+
+def climate_surface(cells, basis='Avg_Temp', targets=TARGET_TEMPS, rooms=ROOM_INVENTORIES,
+                    elasticity=HEAT_ELASTICITY):
+    """Revenue-at-risk surface for the months covered by ``cells``"""
+    months = monthly_climate(cells, basis)
+    values = revenue_at_risk(months['RevPAR (INR)'], months['Temperature'], months['Days'],
+                             targets, rooms, elasticity)
+    return ClimateSurface(months, np.asarray(targets, dtype=float), np.asarray(rooms), values)
@@ -0,0 +1,184 @@
+"""Mergeable sufficient statistics for Pearson correlation matrices.
+
+A ``CorrelationAccumulator`` keeps, for every pair of tracked columns, the
+number of rows where both are present, each column's mean over those rows,
+its second central moment and the pair's co-moment. That is exactly what
+``DataFrame.corr`` needs with pairwise-complete rows, so the result matches
+pandas on data with gaps.
+
+Batches are folded in with the pairwise update of Chan, Golub and LeVeque,
+which stays numerically stable where raw sums of squares would cancel, so a
+new month of data costs time proportional to its own rows.
+
+``CellCorrelations`` keeps the same statistics for every (Year x Month)
+cell of the aggregate cube, so the correlation matrix for any filter is
+assembled from the selected cells without touching raw rows.
+"""
+import numpy as np
+import pandas as pd
+
+from pdis.cube import CUBE_KEYS, cell_mask, cube_measures
+
+CORRELATION_COLUMNS = ['RevPAR (INR)', 'Occupancy (%)', 'ADR (INR)',
+                       'Total_Arrivals', 'Avg_Temp', 'Capture_Ratio (%)']
+
+
+def _pairwise_moments(values):
+    """``(n, mean, m2, comoment)`` arrays for an ``(rows, k)`` block with NaN gaps"""
+    k = values.shape[1]
+    present = ~np.isnan(values)
+    if not present.any():
+        return np.zeros((k, k)), np.zeros((k, k)), np.zeros((k, k)), np.zeros((k, k))
+
+    # Shift by the column means before forming sums to avoid cancellation
+    counts = present.sum(axis=0)
+    shift = np.divide(np.where(present, values, 0.0).sum(axis=0), counts,
+                      out=np.zeros(k), where=counts > 0)
+    centered = np.where(present, values - shift, 0.0)
+    mask = present.astype(float)
+
+    n = mask.T @ mask
+    with np.errstate(invalid='ignore', divide='ignore'):
+        offset = np.where(n > 0, (centered.T @ mask) / n, 0.0)
+    m2 = (centered ** 2).T @ mask - n * offset ** 2
+    comoment = centered.T @ centered - n * offset * offset.T
+    return n, shift[:, None] + offset, m2, comoment
+
+
+def _pool(groups, size, n, mean, m2, comoment):
+    """Pool ``(cells, k, k)`` moments into ``size`` groups.
+
+    Parallel-axis theorem: pooled moments are the cell moments plus the
+    spread of the cell means around the pooled mean.
+    """
+    def group_sum(values):
+        if size == 1:
+            return values.sum(axis=0, keepdims=True)
+        out = np.zeros((size,) + values.shape[1:])
+        np.add.at(out, groups, values)
+        return out
+
+    total = group_sum(n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pooled_mean = np.where(total > 0, group_sum(n * mean) / total, 0.0)
+    delta = np.where(n > 0, mean - pooled_mean[groups], 0.0)
+    pooled_m2 = group_sum(m2 + n * delta ** 2)
+    pooled_comoment = group_sum(comoment + n * delta * delta.transpose(0, 2, 1))
+    return total, pooled_mean, pooled_m2, pooled_comoment
+
+
+class CorrelationAccumulator:
+    """Streaming pairwise count / mean / moment state for ``columns``.
+
+    All state arrays are ``(k, k)``; entry ``[i, j]`` describes column ``i``
+    over the rows where columns ``i`` and ``j`` are both present.
+    """
+
+    def __init__(self, columns, n=None, mean=None, m2=None, comoment=None):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k)) if n is None else np.asarray(n, dtype=float)
+        self.mean = np.zeros((k, k)) if mean is None else np.asarray(mean, dtype=float)
+        self.m2 = np.zeros((k, k)) if m2 is None else np.asarray(m2, dtype=float)
+        self.comoment = np.zeros((k, k)) if comoment is None else np.asarray(comoment, dtype=float)
+
+    @classmethod
+    def from_frame(cls, df, columns):
+        return cls(columns, *_pairwise_moments(df[list(columns)].to_numpy(dtype=float)))
+
+    def merge(self, other):
+        """Fold another accumulator over the same columns into this one"""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge accumulators over different columns")
+
+        n = self.n + other.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, other.n / n, 0.0)
+            cross = np.where(n > 0, self.n * other.n / n, 0.0)
+        delta = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + delta ** 2 * cross
+        self.comoment = self.comoment + other.comoment + delta * delta.T * cross
+        self.mean = self.mean + delta * weight
+        self.n = n
+        return self
+
+    def update(self, df):
+        """Fold the rows of ``df`` into the accumulator"""
+        return self.merge(CorrelationAccumulator.from_frame(df, self.columns))
+
+    def corr(self, min_periods=1):
+        """Pearson correlation matrix, matching ``DataFrame.corr(min_periods=...)``"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr = np.clip(corr, -1.0, 1.0)
+        corr[(self.n < max(min_periods, 2)) | ~np.isfinite(corr)] = np.nan
+        np.fill_diagonal(corr, np.where(self.m2.diagonal() > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def to_dict(self):
+        return {
+            'columns': self.columns,
+            'n': self.n.tolist(),
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist(),
+            'comoment': self.comoment.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['columns'], state['n'], state['mean'], state['m2'], state['comoment'])
+
+
+class CellCorrelations:
+    """Pairwise correlation statistics per aggregate-cube cell.
+
+    Arrays are ``(cells, k, k)`` and aligned with ``index`` (the cube's
+    (Year, Month) keys). ``combine`` pools any subset of cells into one
+    ``CorrelationAccumulator`` in a single vectorized pass.
+    """
+
+    def __init__(self, index, columns, n, mean, m2, comoment):
+        self.index = index
+        self.columns = list(columns)
+        self.n, self.mean, self.m2, self.comoment = (np.asarray(a, dtype=float) for a in (n, mean, m2, comoment))
+
+    @classmethod
+    def from_frame(cls, df, keys=CUBE_KEYS, columns=None):
+        """Per-cell statistics over ``columns`` (default: every cube measure)"""
+        columns = cube_measures(df, keys) if columns is None else list(columns)
+        values = df[columns].to_numpy(dtype=float)
+        groups = df.groupby(keys, observed=True, sort=True).indices
+        index = pd.MultiIndex.from_tuples(list(groups), names=keys)
+        moments = [_pairwise_moments(values[rows]) for rows in groups.values()]
+        return cls(index, columns, *(np.stack(arrays) for arrays in zip(*moments)))
+
+    def __len__(self):
+        return len(self.index)
+
+    def _arrays(self):
+        return self.n, self.mean, self.m2, self.comoment
+
+    def slice(self, year_range=None, months=None):
+        """Cells covered by a year range and month subset, like ``slice_cube``"""
+        mask = cell_mask(self.index, year_range, months)
+        return CellCorrelations(self.index[mask], self.columns, *(a[mask] for a in self._arrays()))
+
+    def combine(self, columns=None):
+        """Pool the cells into one accumulator, optionally over a column subset"""
+        arrays = self._arrays()
+        if columns is not None:
+            pos = [self.columns.index(col) for col in columns]
+            arrays = [a[:, pos][:, :, pos] for a in arrays]
+        pooled = _pool(np.zeros(len(self), dtype=int), 1, *arrays)
+        return CorrelationAccumulator(columns or self.columns, *(a[0] for a in pooled))
+
+    def merge(self, *others):
+        """Cells of every set, sorted by key; cells present in several are pooled"""
+        if any(other.columns != self.columns for other in others):
+            raise ValueError("Cannot merge cell statistics over different columns")
+        index = self.index.append([other.index for other in others])
+        arrays = [np.concatenate(group) for group in zip(self._arrays(), *(other._arrays() for other in others))]
+
+        keys = index.unique().sort_values()
+        groups = keys.get_indexer(index)
+        return CellCorrelations(keys, self.columns, *_pool(groups, len(keys), *arrays))
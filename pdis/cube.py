@@ -0,0 +1,120 @@
+"""(Year x Month) aggregate cube for fast filter rollups."""
+import numpy as np
+import pandas as pd
+
+CUBE_KEYS = ['Year', 'Month']
+CUBE_STATS = ['count', 'sum', 'min', 'max']
+
+
+def cube_measures(df, keys=CUBE_KEYS):
+    """Numeric columns aggregated into the cube"""
+    return [c for c in df.select_dtypes(include=[np.number]).columns if c not in keys]
+
+
+def build_aggregate_cube(df, keys=CUBE_KEYS):
+    """Aggregate every numeric measure into rollup-able per-cell statistics.
+
+    The result is indexed by ``keys`` with ``(measure, stat)`` columns, where
+    ``stat`` is one of ``CUBE_STATS``. Means are not stored per cell; they are
+    recovered as ``sum / count`` at rollup time so that they stay exact.
+    """
+    measures = cube_measures(df, keys)
+    cube = df.groupby(keys, observed=True)[measures].agg(CUBE_STATS)
+    cube.columns.names = ['measure', 'stat']
+    return cube
+
+
+def filter_rows(df, year_range=None, months=None):
+    """Raw rows covered by a year range and month subset"""
+    mask = np.ones(len(df), dtype=bool)
+    if year_range is not None:
+        mask &= (df['Year'] >= year_range[0]).to_numpy() & (df['Year'] <= year_range[1]).to_numpy()
+    if months:
+        mask &= df['Month'].isin(months).to_numpy()
+    return df[mask]
+
+
+def cell_mask(index, year_range=None, months=None):
+    """Boolean mask over (Year, Month) cell keys for a year range and month subset"""
+    mask = np.ones(len(index), dtype=bool)
+    if year_range is not None:
+        years = index.get_level_values('Year')
+        mask &= (years >= year_range[0]) & (years <= year_range[1])
+    if months:
+        mask &= index.get_level_values('Month').isin(months)
+    return mask
+
+
+def slice_cube(cube, year_range=None, months=None):
+    """Select the cube cells covered by a year range and month subset."""
+    return cube[cell_mask(cube.index, year_range, months)]
+
+
+def rollup_cube(cube, by=None):
+    """Roll cube cells up to one index level, or to a grand total when ``by`` is None.
+
+    Returns ``(measure, stat)`` columns with ``mean`` added alongside the
+    stored statistics. The grand total of an empty cube is a single all-NaN row.
+    """
+    if by is None:
+        grouped = cube.groupby(lambda _: 0)
+    else:
+        grouped = cube.groupby(level=by)
+
+    stat = cube.columns.get_level_values('stat')
+    rolled = pd.concat([
+        grouped[cube.columns[stat == 'count']].sum(),
+        grouped[cube.columns[stat == 'sum']].sum(),
+        grouped[cube.columns[stat == 'min']].min(),
+        grouped[cube.columns[stat == 'max']].max(),
+    ], axis=1)
+
+    counts = rolled.xs('count', axis=1, level='stat')
+    sums = rolled.xs('sum', axis=1, level='stat')
+    means = sums / counts.where(counts > 0)
+    means.columns = pd.MultiIndex.from_product([means.columns, ['mean']], names=rolled.columns.names)
+
+    rolled = pd.concat([rolled, means], axis=1).sort_index(axis=1)
+    if by is None:
+        rolled = rolled.reindex([0])
+        rolled.index = ['All']
+    return rolled
+
+
+def rollup_frame(cube, by, spec):
+    """Groupby-style view of a rollup: ``spec`` maps measure -> stat.
+
+    Mirrors ``df.groupby(by).agg(spec).reset_index()`` but is answered from
+    the cube instead of the raw rows.
+    """
+    rolled = rollup_cube(cube, by)
+    frame = pd.DataFrame({col: rolled[(col, stat)] for col, stat in spec.items()})
+    frame.index.name = by
+    return frame.reset_index()
+
+
+def rollup_totals(cube):
+    """Grand-total rollup as a ``(measure, stat) -> value`` Series."""
+    return rollup_cube(cube).iloc[0]
+
+
+def merge_cubes(*cubes):
+    """Combine cubes built over the same measures.
+
+    Cells present in more than one input are merged statistic by statistic,
+    so ``merge_cubes(build_aggregate_cube(a), build_aggregate_cube(b))``
+    equals the cube of the concatenated rows.
+    """
+    combined = pd.concat(cubes)
+    if not combined.index.has_duplicates:
+        return combined.sort_index()
+
+    grouped = combined.groupby(level=list(combined.index.names), observed=True, sort=True)
+    stat = combined.columns.get_level_values('stat')
+    merged = pd.concat([
+        grouped[combined.columns[stat == 'count']].sum(),
+        grouped[combined.columns[stat == 'sum']].sum(),
+        grouped[combined.columns[stat == 'min']].min(),
+        grouped[combined.columns[stat == 'max']].max(),
+    ], axis=1)
+    return merged[combined.columns]
@@ -0,0 +1,132 @@
+"""Log-log elasticity model from ``code.ipynb``, refit on demand.
+
+Fits are memoized in a bounded LRU keyed by a fingerprint of the dataset
+plus the year/month selection, and cold fits run on a background thread so
+the caller can keep rendering while the model is estimated.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pdis.forecast import monthly_series
+from pdis.scenarios import ELASTICITIES
+
+FORMULA = 'log_RevPAR ~ log_Aviation + log_FX + log_AQI + log_Temp'
+LOG_COLUMNS = {
+    'log_RevPAR': 'RevPAR (INR)',
+    'log_Aviation': 'International_Aviation_Arrivals',
+    'log_FX': 'USD_INR_Rate',
+    'log_AQI': 'Monthly_Mean_AQI',
+    'log_Temp': 'Avg_Temp',
+}
+HAC_MAXLAGS = 1
+MIN_OBSERVATIONS = 12
+
+# Regressor for each scenario factor, in scenarios.FACTORS order
+FACTOR_TERMS = ['log_AQI', 'log_FX', 'log_Temp']
+
+
+def add_log_columns(df):
+    """Model frame with the notebook's log(x + 1) transforms, complete rows only"""
+    logs = pd.DataFrame({name: np.log(df[col].astype(float) + 1) for name, col in LOG_COLUMNS.items()})
+    return logs.dropna()
+
+
+def monthly_model_frame(df):
+    """``add_log_columns`` on the monthly means, one row per complete month in time order"""
+    return add_log_columns(monthly_series(df, list(LOG_COLUMNS.values())))
+
+
+def fit_elasticity_model(df):
+    """Fit the HAC log-log OLS on monthly means and return a small, picklable summary.
+
+    Rows are averaged per calendar month first, so ``nobs`` counts months and
+    the HAC lag is one month whatever the feed's frequency or city count.
+    Returns None when the selection has too few complete months.
+    """
+    import statsmodels.formula.api as smf
+
+    data = monthly_model_frame(df)
+    if len(data) < MIN_OBSERVATIONS:
+        return None
+
+    model = smf.ols(FORMULA, data=data).fit(cov_type='HAC', cov_kwds={'maxlags': HAC_MAXLAGS})
+    return {
+        'params': model.params,
+        'bse': model.bse,
+        'pvalues': model.pvalues,
+        'rsquared': float(model.rsquared),
+        'nobs': int(model.nobs),
+    }
+
+
+def scenario_elasticities(fit):
+    """(AQI, FX, Temp) elasticities from a fit, or the published defaults"""
+    if fit is None:
+        return ELASTICITIES
+    return fit['params'][FACTOR_TERMS].to_numpy()
+
+
+def data_fingerprint(df):
+    """Stable content hash of a DataFrame"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(','.join(map(str, df.columns)).encode())
+    return digest.hexdigest()
+
+
+def selection_key(fingerprint, year_range, months):
+    """Cache key for one dataset + filter state"""
+    return (fingerprint, tuple(int(y) for y in year_range), tuple(sorted(months or ())))
+
+
+class ElasticityFitter:
+    """Bounded LRU of fitted models with background fitting of cold keys.
+
+    ``submit`` returns a Future immediately; cached keys resolve at once and
+    concurrent requests for the same cold key share one fit.
+    """
+
+    def __init__(self, maxsize=64, workers=1):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdis-fit')
+
+    def submit(self, key, df):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                future = Future()
+                future.set_result(self._cache[key])
+                return future
+            if key in self._pending:
+                self.hits += 1
+                return self._pending[key]
+
+            self.misses += 1
+            future = self._executor.submit(fit_elasticity_model, df)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._store(key, f))
+        return future
+
+    def _store(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.exception() is not None:
+                return
+            self._cache[key] = future.result()
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,316 @@
+"""Headless PDIS analytics engine.
+
+Pure functions over the loaded dataset and its aggregate cube, with no
+Streamlit or plotly imports, so batch jobs, services and benchmarks can
+reuse the dashboard's numbers without paying for the front end.
+
+Typical use::
+
+    from pdis import engine
+    data = engine.load_dataset()                     # every city / property
+    data = engine.load_dataset(partitions=['Delhi'])  # only the partitions needed
+    view = engine.apply_filters(data, (2017, 2024), ['May', 'June'])
+    engine.kpis(view)
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pdis.append import build_aggregates, read_aggregates, refresh_partition_aggregates
+from pdis.correlation import CORRELATION_COLUMNS
+from pdis.cube import cube_measures, filter_rows, merge_cubes, rollup_cube, rollup_frame, rollup_totals, slice_cube
+from pdis.ingest import (PDIS_CSV, STORE_DIR, list_partitions, month_categories, partition_dir, partitions_fresh,
+                         read_pdis_csv, read_store, split_partitions)
+from pdis.scenarios import ELASTICITIES, factor_impacts, predict_revpar, scenario_grid
+from pdis.timeseries import resample
+
+Dataset = namedtuple('Dataset', ['rows', 'cube', 'correlations'], defaults=[None])
+View = namedtuple('View', ['rows', 'cells', 'year_range', 'months', 'correlations'], defaults=[None])
+
+STRONG_CORRELATION = 0.5
+
+# FX x temperature grid behind the scenario heatmap
+GRID_FX = np.linspace(70.0, 95.0, 51)
+GRID_TEMP = np.linspace(10.0, 45.0, 71)
+
+SCENARIO_PRESETS = {
+    'Best Case': (100, 95.0, 25.0),
+    'Base Case': (200, 83.0, 30.0),
+    'Worst Case': (350, 70.0, 40.0),
+}
+
+
+# ==================== LOADING & FILTERING ====================
+def _map_partitions(func, args, workers=None):
+    """``func(*a)`` for each partition's arguments, on a process pool when there are several"""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(args)))
+    if workers == 1:
+        return [func(*a) for a in args]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, *zip(*args)))
+
+
+def _pool_partitions(frames, aggregates):
+    """One dataset from per-partition rows and aggregates"""
+    if len(frames) == 1:
+        return Dataset(frames[0], *aggregates[0])
+    rows = pd.concat(frames, ignore_index=True)
+    if 'Month' in rows.columns:
+        months = rows['Month'].astype(str)
+        rows['Month'] = pd.Categorical(months, categories=month_categories(months.unique()))
+    cubes, correlations = zip(*aggregates)
+    return Dataset(rows, merge_cubes(*cubes), correlations[0].merge(*correlations[1:]))
+
+
+def load_dataset(csv_path=PDIS_CSV, store_dir=STORE_DIR, partitions=None, workers=None):
+    """Cleaned PDIS rows plus their (Year x Month) aggregate cube and correlation cells.
+
+    ``partitions`` selects cities / properties (default: all of them). Only
+    those partitions are read; aggregates missing from the store are built
+    per partition on a process pool and the partitions are then pooled.
+    """
+    if partitions is not None and not partitions:
+        raise ValueError("Select at least one partition")
+    stored = list_partitions(store_dir)
+    names = stored if partitions is None else list(partitions)
+
+    if set(names) <= set(stored) and partitions_fresh(names, csv_path, store_dir):
+        frames = [read_store(csv_path, partition_dir(name, store_dir)) for name in names]
+        aggregates = [read_aggregates(csv_path, partition_dir(name, store_dir)) for name in names]
+        stale = [i for i, found in enumerate(aggregates) if found is None]
+        rebuilt = _map_partitions(refresh_partition_aggregates, [(names[i], csv_path, store_dir) for i in stale], workers)
+        for i, found in zip(stale, rebuilt):
+            aggregates[i] = found
+        return _pool_partitions(frames, aggregates)
+
+    parts = split_partitions(read_pdis_csv(csv_path))
+    names = list(parts) if partitions is None else names
+    unknown = [name for name in names if name not in parts]
+    if unknown:
+        raise ValueError(f"Unknown partition(s): {', '.join(map(str, unknown))}")
+    frames = [parts[name] for name in names]
+    return _pool_partitions(frames, _map_partitions(build_aggregates, [(frame,) for frame in frames], workers))
+
+
+def year_bounds(data):
+    return int(data.rows['Year'].min()), int(data.rows['Year'].max())
+
+
+def month_options(data, year_range=None):
+    """Months present in the cube in calendar order, optionally within a year range"""
+    cells = slice_cube(data.cube, year_range)
+    return month_categories(cells.index.get_level_values('Month').unique())
+
+
+def apply_filters(data, year_range=None, months=None):
+    """Rows and cube cells for a sidebar selection; no months means all months"""
+    year_range = tuple(year_range) if year_range is not None else year_bounds(data)
+    months = tuple(months or ())
+    return View(
+        filter_rows(data.rows, year_range, months),
+        slice_cube(data.cube, year_range, months),
+        year_range,
+        months,
+        data.correlations.slice(year_range, months) if data.correlations is not None else None,
+    )
+
+
+def _arrivals_column(view):
+    return 'Total_Arrivals' if 'Total_Arrivals' in view.rows.columns else 'International_Aviation_Arrivals'
+
+
+def _fta_column(view):
+    return 'FTA_Foreign' if 'FTA_Foreign' in view.rows.columns else 'Estimated_Delhi_FTAs'
+
+
+# ==================== KPIs ====================
+def kpis(view):
+    """Executive-summary and advanced-metric KPIs for a view; NaN throughout when no cells match"""
+    totals = rollup_totals(view.cells)
+    yearly_revpar = rollup_frame(view.cells, 'Year', {'RevPAR (INR)': 'mean'})['RevPAR (INR)']
+
+    def mean_of(col):
+        return float(totals[(col, 'mean')]) if (col, 'mean') in totals.index else None
+
+    return {
+        'avg_revpar': mean_of('RevPAR (INR)'),
+        'revpar_delta_pct': float((yearly_revpar.iloc[-1] - yearly_revpar.iloc[0]) / yearly_revpar.iloc[0] * 100)
+        if len(yearly_revpar) else float('nan'),
+        'avg_occupancy': mean_of('Occupancy (%)'),
+        'total_arrivals': float(totals[(_arrivals_column(view), 'sum')]),
+        'fta_foreign': float(totals[(_fta_column(view), 'sum')]),
+        'capture_ratio': mean_of('Capture_Ratio (%)'),
+        'avg_temp': mean_of('Avg_Temp'),
+        'aqi': mean_of('AQI'),
+        'market_intensity': mean_of('Market_Intensity'),
+    }
+
+
+# ==================== YEARLY / MONTHLY AGGREGATES ====================
+def yearly_revenue(view):
+    return rollup_frame(view.cells, 'Year', {'RevPAR (INR)': 'mean', 'ADR (INR)': 'mean'})
+
+
+def monthly_revenue(view):
+    return rollup_frame(view.cells, 'Month', {'RevPAR (INR)': 'mean', 'Occupancy (%)': 'mean'})
+
+
+def yearly_arrivals(view):
+    """Yearly total and foreign arrivals as ``Year, Total Arrivals, Foreign Tourists``"""
+    arrivals_col, fta_col = _arrivals_column(view), _fta_column(view)
+    yearly = rollup_frame(view.cells, 'Year', {arrivals_col: 'sum', fta_col: 'sum'})
+    return yearly.rename(columns={arrivals_col: 'Total Arrivals', fta_col: 'Foreign Tourists'})
+
+
+def monthly_arrivals(view):
+    """Monthly average arrivals as ``Month, Total_Arrivals, Foreign Tourists``"""
+    arrivals_col, fta_col = _arrivals_column(view), _fta_column(view)
+    monthly = rollup_frame(view.cells, 'Month', {arrivals_col: 'mean', fta_col: 'mean'})
+    return monthly.rename(columns={arrivals_col: 'Total_Arrivals', fta_col: 'Foreign Tourists'})
+
+
+def environment_summary(view):
+    summary = rollup_cube(view.cells, 'Year')['Avg_Temp'][['min', 'mean', 'max']].round(1)
+    summary.columns = ['Min Temp (°C)', 'Avg Temp (°C)', 'Max Temp (°C)']
+    summary.index = summary.index.astype(int)
+    return summary
+
+
+def yearly_trends(view):
+    return rollup_frame(view.cells, 'Year', {
+        'RevPAR (INR)': 'mean',
+        'Occupancy (%)': 'mean',
+        'ADR (INR)': 'mean',
+        'Total_Arrivals': 'sum'
+    })
+
+
+def resampled_trends(period_cube, year_range=None, months=None):
+    """``yearly_trends`` per period of a ``timeseries.build_period_cube`` cube"""
+    arrivals_col = 'Total_Arrivals' if 'Total_Arrivals' in period_cube.columns.get_level_values('measure') \
+        else 'International_Aviation_Arrivals'
+    return resample(period_cube, year_range, months, {
+        'RevPAR (INR)': 'mean',
+        'Occupancy (%)': 'mean',
+        'ADR (INR)': 'mean',
+        arrivals_col: 'sum',
+    })
+
+
+def normalized_trends(trends):
+    """Min-max scale every metric column of ``yearly_trends`` to 0-1"""
+    norm = trends.copy()
+    for col in norm.columns[1:]:
+        norm[col] = (norm[col] - norm[col].min()) / (norm[col].max() - norm[col].min())
+    return norm
+
+
+def yoy_growth(trends):
+    """Year-on-year growth table for ``yearly_trends``"""
+    growth = trends.copy()
+    for col in growth.columns[1:]:
+        growth[f'{col}_YoY'] = growth[col].pct_change() * 100
+
+    display = growth[['Year', 'RevPAR (INR)_YoY', 'Occupancy (%)_YoY', 'Total_Arrivals_YoY']].round(2)
+    display.columns = ['Year', 'RevPAR YoY %', 'Occupancy YoY %', 'Total Arrivals YoY %']
+    return display
+
+
+# ==================== CORRELATIONS ====================
+def correlation_matrix(view, columns=CORRELATION_COLUMNS):
+    """Pearson matrix for a view, pooled from its correlation cells when available.
+
+    Pass ``columns=None`` for every numeric measure.
+    """
+    if view.correlations is not None:
+        columns = view.correlations.columns if columns is None else \
+            [col for col in columns if col in view.correlations.columns]
+        return view.correlations.combine(columns).corr()
+    columns = cube_measures(view.rows) if columns is None else [col for col in columns if col in view.rows.columns]
+    return view.rows[columns].corr()
+
+
+def linear_fit(view, x, y):
+    """OLS ``(slope, intercept)`` of ``y`` on ``x`` over rows where both are present, or None.
+
+    Read from the view's correlation cells when they cover both columns, so
+    a chart trendline does not refit over the raw rows.
+    """
+    if view.correlations is not None and {x, y} <= set(view.correlations.columns):
+        pair = view.correlations.combine([x, y])
+        n, comoment = pair.n[0, 1], pair.comoment[0, 1]
+        mean_x, mean_y, var_x = pair.mean[0, 1], pair.mean[1, 0], pair.m2[0, 1]
+    else:
+        rows = view.rows[[x, y]].dropna()
+        n = len(rows)
+        mean_x, mean_y = rows[x].mean(), rows[y].mean()
+        var_x = ((rows[x] - mean_x) ** 2).sum()
+        comoment = ((rows[x] - mean_x) * (rows[y] - mean_y)).sum()
+    if n < 2 or not var_x > 0:
+        return None
+    slope = comoment / var_x
+    return float(slope), float(mean_y - slope * mean_x)
+
+
+def strong_correlations(corr, threshold=STRONG_CORRELATION):
+    """Upper-triangle variable pairs with ``|r| > threshold``, or None"""
+    values = corr.to_numpy()
+    i, j = np.triu_indices(len(corr.columns), k=1)
+    keep = np.abs(values[i, j]) > threshold
+    if not keep.any():
+        return None
+    i, j = i[keep], j[keep]
+    return pd.DataFrame({
+        'Variable 1': corr.columns[i],
+        'Variable 2': corr.columns[j],
+        'Correlation': [f"{r:.3f}" for r in values[i, j]],
+    })
+
+
+# ==================== SCENARIOS ====================
+def scenario_forecast(base_revpar, scenario, elasticities=ELASTICITIES):
+    """Per-factor impacts and the prediction for one (AQI, FX, Temp) scenario"""
+    aqi_impact, fx_impact, temp_impact = factor_impacts(scenario, elasticities)
+    return {
+        'base_revpar': float(base_revpar),
+        'aqi_impact': float(aqi_impact),
+        'fx_impact': float(fx_impact),
+        'temp_impact': float(temp_impact),
+        'total_impact': float(aqi_impact + fx_impact + temp_impact),
+        'predicted_revpar': float(predict_revpar(base_revpar, scenario, elasticities)),
+    }
+
+
+def sensitivity_table(scenario, elasticities=ELASTICITIES):
+    """Per-factor value, RevPAR impact (%) and elasticity for one scenario"""
+    aqi, fx, temp = scenario
+    aqi_impact, fx_impact, temp_impact = factor_impacts(scenario, elasticities)
+    aqi_elasticity, fx_elasticity, temp_elasticity = elasticities
+    return pd.DataFrame({
+        'Factor': ['FX Exchange Rate', 'Temperature', 'Air Quality Index'],
+        'Current Value': [fx, temp, aqi],
+        'Impact on RevPAR (%)': [fx_impact * 100, temp_impact * 100, aqi_impact * 100],
+        'Elasticity': [fx_elasticity, temp_elasticity, aqi_elasticity],
+    })
+
+
+def scenario_table(base_revpar, current, elasticities=ELASTICITIES, presets=SCENARIO_PRESETS):
+    """Preset scenarios plus the current one with their predicted RevPAR"""
+    scenarios = pd.DataFrame(
+        list(presets.values()) + [tuple(current)],
+        columns=['AQI', 'Exchange Rate', 'Temperature'],
+    )
+    scenarios.insert(0, 'Scenario', list(presets) + ['Current'])
+    scenarios['Predicted RevPAR'] = predict_revpar(
+        base_revpar, scenarios[['AQI', 'Exchange Rate', 'Temperature']].to_numpy(), elasticities
+    )
+    return scenarios
+
+
+def scenario_surface(base_revpar, aqi, fx_values=GRID_FX, temp_values=GRID_TEMP, elasticities=ELASTICITIES):
+    """Predicted RevPAR over an FX x temperature grid at a fixed AQI"""
+    surface = predict_revpar(base_revpar, scenario_grid([aqi], fx_values, temp_values), elasticities)
+    return surface.reshape(len(fx_values), len(temp_values))
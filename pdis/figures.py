@@ -0,0 +1,585 @@
+"""Figure and table builders for the dashboard tabs.
+
+Each ``build_*_tab`` takes an ``engine.View`` (filtered rows plus the
+filtered aggregate cube) and returns a dict of plotly figures and
+DataFrames, with no Streamlit calls. The numbers come from ``pdis.engine``;
+this module only draws them. That lets the front end cache a tab's results
+per filter state and skip building tabs that are not on screen.
+
+Row-level scatters stay small at daily or multi-city scale: above
+``MAX_SCATTER_POINTS`` they plot a reproducible sample with WebGL traces,
+and trendlines come from ``engine.linear_fit`` instead of plotly's refit.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from pdis import engine
+from pdis.climate import CRORE, TEMPERATURE_BASES
+from pdis.forecast import CONFIDENCE, METHOD_LABELS, forecast_frame
+from pdis.rolling import rolling_elasticities
+from pdis.simulation import fit_factor_model, simulate_revpar_risk
+
+MAX_SCATTER_POINTS = 5000
+RISK_DRAWS = 100_000
+
+# Rolling-window regressors drawn on the drift chart, and the line style per window length
+DRIFT_FACTORS = {
+    'log_FX': ('FX Elasticity', '#2563EB'),
+    'log_Temp': ('Temperature Elasticity', '#E8995A'),
+    'log_AQI': ('AQI Elasticity', '#14B8A6'),
+}
+DRIFT_WINDOWS = {24: 'solid', 36: 'dash'}
+
+
+def scatter_rows(df, max_points=MAX_SCATTER_POINTS):
+    """``(rows, render_mode, note)`` for a row-level scatter, sampling large frames"""
+    if len(df) <= max_points:
+        return df, 'auto', ''
+    sample = df.sample(max_points, random_state=0).sort_index()
+    return sample, 'webgl', f" ({max_points:,} of {len(df):,} points)"
+
+
+def add_trendline(fig, view, x, y, color):
+    """Draw the OLS fit of ``y`` on ``x`` across the view's x range"""
+    fit = engine.linear_fit(view, x, y)
+    if fit is None:
+        return fig
+    slope, intercept = fit
+    x_range = np.array([view.rows[x].min(), view.rows[x].max()])
+    fig.add_trace(go.Scatter(
+        x=x_range, y=intercept + slope * x_range,
+        mode='lines', name='OLS trendline',
+        line=dict(color=color, width=2),
+        hovertemplate=f"{y} = {slope:.4g} × {x} + {intercept:.4g}<extra></extra>",
+        showlegend=False
+    ))
+    return fig
+
+
+# ==================== TAB 1: REVENUE ANALYSIS ====================
+def build_revenue_tab(view):
+    results = {}
+    df_filtered = view.rows
+
+    yearly_revpar = engine.yearly_revenue(view)
+
+    fig_revpar = go.Figure()
+    fig_revpar.add_trace(go.Scatter(
+        x=yearly_revpar['Year'], y=yearly_revpar['RevPAR (INR)'],
+        mode='lines+markers', name='RevPAR',
+        line=dict(color='#1E3A5F', width=3),
+        marker=dict(size=8)
+    ))
+    fig_revpar.add_trace(go.Scatter(
+        x=yearly_revpar['Year'], y=yearly_revpar['ADR (INR)'],
+        mode='lines+markers', name='ADR',
+        line=dict(color='#6366F1', width=3),
+        marker=dict(size=8)
+    ))
+    fig_revpar.update_layout(
+        title="RevPAR & ADR Trends",
+        xaxis_title="Year",
+        yaxis_title="₹ (INR)",
+        hovermode="x unified",
+        plot_bgcolor="white",
+        height=400
+    )
+    results['revpar_adr'] = fig_revpar
+
+    points, render_mode, note = scatter_rows(df_filtered)
+    fig_occ = px.scatter(
+        points,
+        x='Occupancy (%)',
+        y='RevPAR (INR)',
+        title="Occupancy vs RevPAR Correlation" + note,
+        color='Avg_Temp',
+        color_continuous_scale='Viridis',
+        hover_data=['Year'],
+        render_mode=render_mode
+    )
+    add_trendline(fig_occ, view, 'Occupancy (%)', 'RevPAR (INR)', '#1E3A5F')
+    fig_occ.update_layout(plot_bgcolor="white", height=400)
+    results['occupancy_revpar'] = fig_occ
+
+    results['monthly'] = None
+    if 'Month' in df_filtered.columns:
+        monthly_data = engine.monthly_revenue(view)
+
+        fig_monthly = make_subplots(specs=[[{"secondary_y": True}]])
+        fig_monthly.add_trace(
+            go.Bar(x=monthly_data['Month'], y=monthly_data['RevPAR (INR)'], name='RevPAR',
+                   marker_color='#1E3A5F'),
+            secondary_y=False,
+        )
+        fig_monthly.add_trace(
+            go.Scatter(x=monthly_data['Month'], y=monthly_data['Occupancy (%)'], name='Occupancy %',
+                       line=dict(color='#3D6B9B', width=3),
+                       mode='lines+markers'),
+            secondary_y=True,
+        )
+        fig_monthly.update_layout(
+            title="Monthly Seasonality Analysis",
+            xaxis_title="Month",
+            yaxis_title="RevPAR (₹)",
+            yaxis2_title="Occupancy (%)",
+            hovermode="x unified",
+            plot_bgcolor="white",
+            height=400
+        )
+        results['monthly'] = fig_monthly
+
+    return results
+
+
+# ==================== TAB 2: VISITOR METRICS ====================
+def build_visitor_tab(view):
+    results = {}
+    yearly_comp = engine.yearly_arrivals(view)
+
+    yearly_total = yearly_comp[['Year', 'Total Arrivals']].rename(columns={'Total Arrivals': 'Arrivals'})
+
+    fig_total = px.bar(
+        yearly_total,
+        x='Year',
+        y='Arrivals',
+        title='Total Arrivals by Year',
+        color_discrete_sequence=['#1E3A5F'],
+        labels={'Arrivals': 'Total Arrivals'}
+    )
+    fig_total.update_layout(plot_bgcolor="white", height=400)
+    results['yearly_total'] = fig_total
+
+    yearly_fta = yearly_comp[['Year', 'Foreign Tourists']].rename(columns={'Foreign Tourists': 'FTA'})
+
+    fig_fta = px.bar(
+        yearly_fta,
+        x='Year',
+        y='FTA',
+        title='Foreign Tourist Arrivals by Year',
+        color_discrete_sequence=['#E8995A'],
+        labels={'FTA': 'Foreign Tourists'}
+    )
+    fig_fta.update_layout(plot_bgcolor="white", height=400)
+    results['yearly_fta'] = fig_fta
+
+    fig_comp = go.Figure()
+    fig_comp.add_trace(go.Bar(
+        x=yearly_comp['Year'],
+        y=yearly_comp['Total Arrivals'],
+        name='Total Arrivals (All Modes)',
+        marker_color='#1E3A5F',
+        opacity=0.8
+    ))
+    fig_comp.add_trace(go.Bar(
+        x=yearly_comp['Year'],
+        y=yearly_comp['Foreign Tourists'],
+        name='Foreign Tourist Arrivals',
+        marker_color='#E8995A',
+        opacity=0.8
+    ))
+    fig_comp.update_layout(
+        title="Total Arrivals vs Foreign Tourist Arrivals",
+        xaxis_title="Year",
+        yaxis_title="Number of Arrivals",
+        barmode='group',
+        plot_bgcolor="white",
+        height=450,
+        hovermode="x unified"
+    )
+    results['comparison'] = fig_comp
+
+    results['monthly'] = None
+    if 'Month' in view.rows.columns:
+        monthly_comp = engine.monthly_arrivals(view)
+
+        fig_monthly = go.Figure()
+        fig_monthly.add_trace(go.Scatter(
+            x=monthly_comp['Month'],
+            y=monthly_comp['Total_Arrivals'],
+            name='Total Arrivals',
+            mode='lines+markers',
+            line=dict(color='#1E3A5F', width=3),
+            marker=dict(size=8)
+        ))
+        fig_monthly.add_trace(go.Scatter(
+            x=monthly_comp['Month'],
+            y=monthly_comp['Foreign Tourists'],
+            name='Foreign Tourists',
+            mode='lines+markers',
+            line=dict(color='#E8995A', width=3),
+            marker=dict(size=8)
+        ))
+        fig_monthly.update_layout(
+            title="Monthly Average: Total vs Foreign Arrivals",
+            xaxis_title="Month",
+            yaxis_title="Average Arrivals",
+            hovermode="x unified",
+            plot_bgcolor="white",
+            height=450
+        )
+        results['monthly'] = fig_monthly
+
+    return results
+
+
+# ==================== TAB 3: ENVIRONMENTAL IMPACT ====================
+def build_environment_tab(view):
+    results = {}
+    df_filtered = view.rows
+    bubble_col = 'FTA_Foreign' if 'FTA_Foreign' in df_filtered.columns else 'Estimated_Delhi_FTAs'
+
+    points, render_mode, note = scatter_rows(df_filtered)
+    fig_temp = px.scatter(
+        points,
+        x='Avg_Temp',
+        y='RevPAR (INR)',
+        color='Occupancy (%)',
+        size=bubble_col,
+        title="Temperature vs RevPAR (Bubble = Foreign Arrivals)" + note,
+        color_continuous_scale='Viridis',
+        hover_data=['Year'],
+        render_mode=render_mode
+    )
+    fig_temp.update_layout(plot_bgcolor="white", height=450)
+    results['temperature_revpar'] = fig_temp
+
+    results['aqi_occupancy'] = None
+    if 'AQI' in df_filtered.columns:
+        fig_aqi = px.scatter(
+            points,
+            x='AQI',
+            y='Occupancy (%)',
+            title="Air Quality Index vs Occupancy Rate" + note,
+            color_discrete_sequence=['#E8995A'],
+            render_mode=render_mode
+        )
+        add_trendline(fig_aqi, view, 'AQI', 'Occupancy (%)', '#B45309')
+        fig_aqi.update_layout(plot_bgcolor="white", height=450)
+        results['aqi_occupancy'] = fig_aqi
+
+    results['env_summary'] = engine.environment_summary(view)
+
+    return results
+
+
+def build_climate_heatmap(surface, rooms, basis='Avg_Temp'):
+    """Month x target-temperature revenue at risk (₹ crore) for one room inventory"""
+    room_idx = int(np.flatnonzero(surface.rooms == rooms)[0])
+    labels = surface.months['Date'].dt.strftime('%b %Y')
+    fig = go.Figure(data=go.Heatmap(
+        z=surface.values[:, :, room_idx] / CRORE,
+        x=surface.targets,
+        y=labels,
+        colorscale='YlOrRd',
+        colorbar=dict(title="₹ Crore"),
+        customdata=np.broadcast_to(surface.months['Temperature'].to_numpy()[:, None], surface.values.shape[:2]),
+        hovertemplate="%{y}: %{customdata:.1f}°C → %{x:.1f}°C<br>Revenue at risk ₹%{z:,.2f} Cr<extra></extra>"
+    ))
+    fig.update_layout(
+        title=f"Climate Revenue at Risk - {rooms:,} Rooms ({TEMPERATURE_BASES[basis]})",
+        xaxis_title="Target Temperature (°C)",
+        yaxis_title="Month",
+        yaxis=dict(autorange="reversed"),
+        plot_bgcolor="white",
+        height=max(450, 14 * len(labels))
+    )
+    return fig
+
+
+# ==================== TAB 4: TREND ANALYSIS ====================
+def build_trend_tab(view):
+    results = {}
+
+    yearly_trends = engine.yearly_trends(view)
+    yearly_trends_norm = engine.normalized_trends(yearly_trends)
+
+    fig_trends = go.Figure()
+    fig_trends.add_trace(go.Scatter(
+        x=yearly_trends_norm['Year'], y=yearly_trends_norm['RevPAR (INR)'],
+        mode='lines+markers', name='RevPAR (Normalized)',
+        line=dict(width=2.5, color='#1E3A5F')
+    ))
+    fig_trends.add_trace(go.Scatter(
+        x=yearly_trends_norm['Year'], y=yearly_trends_norm['Occupancy (%)'],
+        mode='lines+markers', name='Occupancy (Normalized)',
+        line=dict(width=2.5, color='#06B6D4')
+    ))
+    fig_trends.add_trace(go.Scatter(
+        x=yearly_trends_norm['Year'], y=yearly_trends_norm['Total_Arrivals'],
+        mode='lines+markers', name='Total Arrivals (Normalized)',
+        line=dict(width=2.5, color='#E8995A')
+    ))
+    fig_trends.update_layout(
+        title="Normalized Multi-Metric Trends",
+        xaxis_title="Year",
+        yaxis_title="Index (0-1 Scale)",
+        hovermode="x unified",
+        plot_bgcolor="white",
+        height=450
+    )
+    results['trends'] = fig_trends
+
+    results['yoy'] = engine.yoy_growth(yearly_trends)
+
+    return results
+
+
+def build_resampled_trends(series, granularity):
+    """RevPAR / ADR and occupancy per period from ``engine.resampled_trends``"""
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Scatter(
+        x=series['Period'], y=series['RevPAR (INR)'],
+        mode='lines', name='RevPAR',
+        line=dict(color='#1E3A5F', width=2.5)
+    ), secondary_y=False)
+    fig.add_trace(go.Scatter(
+        x=series['Period'], y=series['ADR (INR)'],
+        mode='lines', name='ADR',
+        line=dict(color='#6366F1', width=2)
+    ), secondary_y=False)
+    fig.add_trace(go.Scatter(
+        x=series['Period'], y=series['Occupancy (%)'],
+        mode='lines', name='Occupancy %',
+        line=dict(color='#06B6D4', width=2, dash='dot')
+    ), secondary_y=True)
+    fig.update_layout(
+        title=f"RevPAR, ADR & Occupancy by {granularity}",
+        xaxis_title=granularity,
+        yaxis_title="₹ (INR)",
+        yaxis2_title="Occupancy (%)",
+        hovermode="x unified",
+        plot_bgcolor="white",
+        height=400
+    )
+    return fig
+
+
+CHANGE_POINT_STYLES = {
+    'Capture_Ratio (%)': ('Capture Ratio', '#DC2626'),
+    'RevPAR (INR)': ('RevPAR', '#1E3A5F'),
+    'Occupancy (%)': ('Occupancy', '#06B6D4'),
+}
+
+
+def add_change_points(fig, breaks, yearly=False):
+    """Mark each ``changepoint`` break with a dashed line at the start of the new regime.
+
+    ``yearly`` places breaks on a numeric year axis (2019.5 is July 2019).
+    """
+    for metric, date in breaks[['Metric', 'Date']].itertuples(index=False):
+        label, color = CHANGE_POINT_STYLES.get(metric, (metric, '#6B7280'))
+        if yearly:
+            x = date.year + (date.month - 1) / 12
+        else:
+            # Epoch milliseconds: plotly cannot place annotations on Timestamp lines
+            x = date.timestamp() * 1000
+        fig.add_vline(x=x, line_dash='dash', line_width=1.5, line_color=color, opacity=0.7,
+                      annotation_text=f"{label} break", annotation_position='top left',
+                      annotation_font=dict(size=10, color=color))
+    return fig
+
+
+# ==================== TAB 5: CORRELATION MATRIX ====================
+def build_correlation_tab(view):
+    results = {}
+    corr_matrix = engine.correlation_matrix(view)
+
+    fig_corr = go.Figure(data=go.Heatmap(
+        z=corr_matrix.values,
+        x=corr_matrix.columns,
+        y=corr_matrix.columns,
+        colorscale='Blues',
+        zmid=0,
+        text=np.round(corr_matrix.values, 2),
+        texttemplate='%{text}',
+        textfont={"size": 10},
+        colorbar=dict(title="Correlation")
+    ))
+    fig_corr.update_layout(
+        title="Variable Correlation Matrix",
+        height=600,
+        width=800
+    )
+    results['heatmap'] = fig_corr
+
+    results['insights'] = engine.strong_correlations(corr_matrix)
+
+    return results
+
+
+# ==================== TAB 6: PREDICTIVE MODEL ====================
+def build_scenario_grid(base_revpar, aqi, elasticities, fx_values=engine.GRID_FX, temp_values=engine.GRID_TEMP):
+    grid_revpar = engine.scenario_surface(base_revpar, aqi, fx_values, temp_values, elasticities)
+
+    fig_grid = go.Figure(data=go.Heatmap(
+        z=grid_revpar,
+        x=temp_values,
+        y=fx_values,
+        colorscale='Blues',
+        colorbar=dict(title="RevPAR (₹)")
+    ))
+    fig_grid.update_layout(
+        title=f"Predicted RevPAR at AQI {aqi}",
+        xaxis_title="Avg Temperature (°C)",
+        yaxis_title="USD/INR Exchange Rate",
+        plot_bgcolor="white",
+        height=450
+    )
+    return fig_grid
+
+
+def build_scenario_tab(view, scenario, elasticities):
+    """Forecast, sensitivity and scenario tables plus the grid for one scenario"""
+    base_revpar = engine.kpis(view)['avg_revpar']
+    forecast = engine.scenario_forecast(base_revpar, scenario, elasticities)
+    return {
+        'forecast': pd.DataFrame([forecast]),
+        'sensitivity': engine.sensitivity_table(scenario, elasticities),
+        'scenarios': engine.scenario_table(base_revpar, scenario, elasticities),
+        'grid': build_scenario_grid(base_revpar, scenario[0], elasticities),
+    }
+
+
+# ==================== FORECASTS ====================
+def build_forecast_chart(history, artifact):
+    """Monthly history of one series with its forecast and confidence band"""
+    column = artifact['series']
+    forecast = forecast_frame(artifact)
+    observed = history[column].dropna()
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=observed.index, y=observed.values,
+        mode='lines', name='Actual',
+        line=dict(color='#1E3A5F', width=2.5)
+    ))
+    fig.add_trace(go.Scatter(
+        x=pd.concat([forecast['Date'], forecast['Date'][::-1]]),
+        y=pd.concat([forecast['Upper'], forecast['Lower'][::-1]]),
+        fill='toself', fillcolor='rgba(99, 102, 241, 0.15)',
+        line=dict(color='rgba(0,0,0,0)'), name=f'{CONFIDENCE:.0%} Interval', hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=forecast['Date'], y=forecast['Forecast'],
+        mode='lines+markers', name='Forecast',
+        line=dict(color='#6366F1', width=2.5, dash='dash')
+    ))
+    fig.update_layout(
+        title=f"{column} - {METHOD_LABELS[artifact['method']]} Forecast",
+        xaxis_title="Month",
+        yaxis_title=column,
+        hovermode="x unified",
+        plot_bgcolor="white",
+        height=420
+    )
+    return fig
+
+
+# ==================== RISK SIMULATION ====================
+def build_risk_fan_chart(risk_bands, n_draws):
+    """Fan chart of ``simulation.simulate_revpar_risk`` percentile bands per horizon month"""
+    monthly_bands = risk_bands.drop(index='Horizon Average')
+
+    fig_fan = go.Figure()
+    fig_fan.add_trace(go.Scatter(
+        x=monthly_bands.index, y=monthly_bands['P95'],
+        mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'
+    ))
+    fig_fan.add_trace(go.Scatter(
+        x=monthly_bands.index, y=monthly_bands['P5'],
+        mode='lines', line=dict(width=0), fill='tonexty',
+        fillcolor='rgba(37, 99, 235, 0.15)', name='P5 - P95'
+    ))
+    fig_fan.add_trace(go.Scatter(
+        x=monthly_bands.index, y=monthly_bands['P75'],
+        mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'
+    ))
+    fig_fan.add_trace(go.Scatter(
+        x=monthly_bands.index, y=monthly_bands['P25'],
+        mode='lines', line=dict(width=0), fill='tonexty',
+        fillcolor='rgba(37, 99, 235, 0.3)', name='P25 - P75'
+    ))
+    fig_fan.add_trace(go.Scatter(
+        x=monthly_bands.index, y=monthly_bands['P50'],
+        mode='lines+markers', name='Median',
+        line=dict(color='#1E3A5F', width=3),
+        marker=dict(size=8)
+    ))
+    fig_fan.update_layout(
+        title=f"Simulated RevPAR Fan Chart ({n_draws:,} paths)",
+        xaxis_title="Month",
+        yaxis_title="RevPAR (₹)",
+        hovermode="x unified",
+        plot_bgcolor="white",
+        height=450
+    )
+    return fig_fan
+
+
+def build_risk_tab(history, base_revpar, start_fx, elasticities, n_draws=RISK_DRAWS):
+    """Fan chart and percentile bands for the 12 months after the latest month of ``history``.
+
+    The factor model needs consecutive months, so ``history`` is the full set
+    of rows rather than a filtered view. Runs in-process, so it is safe to
+    call from a pool worker.
+    """
+    model = fit_factor_model(history)
+    risk_bands = simulate_revpar_risk(model, base_revpar, start_fx, n_draws=n_draws, start_month=model['next_month'],
+                                      elasticities=np.asarray(elasticities), workers=1)
+    return {
+        'risk_fan': build_risk_fan_chart(risk_bands, n_draws),
+        'risk_bands': risk_bands.round(0),
+    }
+
+
+# ==================== ELASTICITY DRIFT ====================
+def build_drift_chart(paths):
+    """Rolling elasticity paths; ``paths`` maps each ``DRIFT_WINDOWS`` length to its ``rolling_elasticities`` frame"""
+    fig_drift = go.Figure()
+    for window, drift in paths.items():
+        for term, (label, color) in DRIFT_FACTORS.items():
+            fig_drift.add_trace(go.Scatter(
+                x=drift.index, y=drift[term],
+                mode='lines', name=f"{label} ({window}M)",
+                line=dict(color=color, width=2.5, dash=DRIFT_WINDOWS[window])
+            ))
+    fig_drift.add_hline(y=0, line=dict(color='#94A3B8', width=1))
+    fig_drift.update_layout(
+        title="Elasticity Drift - 24-Month (solid) vs 36-Month (dashed) Windows",
+        xaxis_title="Window End",
+        yaxis_title="Elasticity",
+        hovermode="x unified",
+        plot_bgcolor="white",
+        height=500
+    )
+    return fig_drift
+
+
+def latest_drift_table(paths):
+    """Each factor's elasticity in the latest window of every length (NaN without a full window)"""
+    latest = pd.DataFrame({
+        f"{window}-Month Window": drift.iloc[-1][list(DRIFT_FACTORS)] if len(drift)
+        else pd.Series(np.nan, index=list(DRIFT_FACTORS))
+        for window, drift in paths.items()
+    })
+    latest.index = [label for label, _ in DRIFT_FACTORS.values()]
+    return latest.round(3)
+
+
+def build_drift_tab(view):
+    """Rolling elasticity drift over the months of a view"""
+    paths = {window: rolling_elasticities(view.rows, window) for window in DRIFT_WINDOWS}
+    return {'drift': build_drift_chart(paths), 'latest': latest_drift_table(paths)}
+
+
+TAB_BUILDERS = {
+    'revenue': build_revenue_tab,
+    'visitors': build_visitor_tab,
+    'environment': build_environment_tab,
+    'trends': build_trend_tab,
+    'correlation': build_correlation_tab,
+    'drift': build_drift_tab,
+}
@@ -0,0 +1,172 @@
+"""Seasonal forecasts of RevPAR, occupancy and arrivals.
+
+Each series is resampled to a monthly index that spans the full history,
+so the excluded 2020-2021 months show up as missing values rather than as
+a jump between 2019 and 2022.
+
+- ``sarima`` (the default) is a seasonal ARIMA on log values. Its state
+  space filter skips the gap.
+- ``ets`` is additive exponential smoothing on log values. It cannot
+  bridge missing months, so it is fitted on the latest contiguous run.
+
+Fitted parameters and forecasts are written to ``store/forecasts/`` as
+JSON. They are keyed by a hash of the series and the model spec, so a
+restart loads them instead of refitting. Series that need fitting are
+spread over a process pool.
+"""
+import hashlib
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pdis.ingest import STORE_DIR
+from pdis.timeseries import build_period_cube, resample
+
+FORECAST_DIR = 'forecasts'
+FORECAST_COLUMNS = ['RevPAR (INR)', 'Occupancy (%)', 'Total_Arrivals']
+DEFAULT_HORIZON = 12
+CONFIDENCE = 0.95
+
+# Bump when a model spec changes so old artifacts are not reused
+MODEL_SPECS = {
+    'sarima': {'version': 1, 'order': [1, 0, 0], 'seasonal_order': [0, 1, 1, 12], 'trend': 'c'},
+    'ets': {'version': 1, 'trend': 'add', 'damped_trend': True, 'seasonal': 'add', 'seasonal_periods': 12},
+}
+
+
+# ==================== SERIES ====================
+def monthly_series(rows, columns=FORECAST_COLUMNS):
+    """Monthly means on a gap-free month-start index (excluded months are NaN)"""
+    columns = [col for col in columns if col in rows.columns]
+    series = resample(build_period_cube(rows, 'Month'), spec={col: 'mean' for col in columns})
+    return series.set_index('Period').asfreq('MS')
+
+
+def latest_run(y):
+    """Longest tail of ``y`` without missing values"""
+    missing = np.flatnonzero(y.isna().to_numpy())
+    return y.iloc[missing[-1] + 1:] if len(missing) else y
+
+
+def series_key(y, method, horizon):
+    """Content hash of one series plus everything that shapes its forecast"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(y).to_numpy().tobytes())
+    digest.update(json.dumps([y.name, method, horizon, MODEL_SPECS[method]]).encode())
+    return digest.hexdigest()
+
+
+# ==================== MODELS ====================
+def _fit_sarima(log_y, horizon, spec):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    model = SARIMAX(log_y, order=spec['order'], seasonal_order=spec['seasonal_order'], trend=spec['trend'])
+    result = model.fit(disp=False)
+    frame = result.get_forecast(horizon).summary_frame(alpha=1 - CONFIDENCE)
+    return result, frame['mean'], frame['mean_ci_lower'], frame['mean_ci_upper']
+
+
+def _fit_ets(log_y, horizon, spec):
+    from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+
+    log_y = latest_run(log_y)
+    if len(log_y) < 2 * spec['seasonal_periods']:
+        raise ValueError(f"ETS needs two seasonal cycles without gaps; {log_y.name} has {len(log_y)} months")
+    model = ETSModel(log_y, error='add', trend=spec['trend'], damped_trend=spec['damped_trend'],
+                     seasonal=spec['seasonal'], seasonal_periods=spec['seasonal_periods'])
+    result = model.fit(disp=False)
+    frame = result.get_prediction(start=len(log_y), end=len(log_y) + horizon - 1).summary_frame(alpha=1 - CONFIDENCE)
+    return result, frame['mean'], frame['pi_lower'], frame['pi_upper']
+
+
+MODELS = {
+    'sarima': _fit_sarima,
+    'ets': _fit_ets,
+}
+METHOD_LABELS = {
+    'sarima': 'Seasonal ARIMA',
+    'ets': 'Exponential Smoothing',
+}
+
+
+def fit_forecast(y, method='sarima', horizon=DEFAULT_HORIZON):
+    """Fit one monthly series and return its JSON-ready forecast artifact"""
+    if method not in MODELS:
+        raise ValueError(f"Unknown forecast method {method!r}; choose from {list(MODELS)}")
+    with warnings.catch_warnings():
+        # Convergence chatter from statsmodels on short, gappy series
+        warnings.simplefilter('ignore')
+        result, mean, lower, upper = MODELS[method](np.log(y), horizon, MODEL_SPECS[method])
+
+    dates = pd.date_range(y.index[-1], periods=horizon + 1, freq='MS')[1:]
+    return {
+        'series': y.name,
+        'method': method,
+        'spec': MODEL_SPECS[method],
+        # String keys so a fresh artifact equals its JSON round trip (ETS params are positional)
+        'params': dict(zip(map(str, result.params.index), map(float, result.params))),
+        'aic': float(result.aic),
+        'observations': int(np.isfinite(result.model.endog).sum()),
+        'forecast': {
+            'Date': [d.strftime('%Y-%m-%d') for d in dates],
+            'Forecast': np.exp(mean.to_numpy()).tolist(),
+            'Lower': np.exp(lower.to_numpy()).tolist(),
+            'Upper': np.exp(upper.to_numpy()).tolist(),
+        },
+    }
+
+
+def forecast_frame(artifact):
+    """``Date, Forecast, Lower, Upper`` frame from an artifact"""
+    frame = pd.DataFrame(artifact['forecast'])
+    frame['Date'] = pd.to_datetime(frame['Date'])
+    return frame
+
+
+# ==================== ARTIFACTS ====================
+def _artifact_path(key, store_dir):
+    return os.path.join(store_dir, FORECAST_DIR, f"{key}.json")
+
+
+def read_artifact(key, store_dir=STORE_DIR):
+    try:
+        with open(_artifact_path(key, store_dir), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_artifact(key, artifact, store_dir=STORE_DIR):
+    path = _artifact_path(key, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(artifact, f)
+    os.replace(path + '.tmp', path)
+
+
+def forecast_series(rows, columns=FORECAST_COLUMNS, method='sarima', horizon=DEFAULT_HORIZON,
+                    store_dir=STORE_DIR, workers=None):
+    """``{column: artifact}`` for each series, loading persisted fits where possible"""
+    series = monthly_series(rows, columns)
+    keys = {col: series_key(series[col], method, horizon) for col in series.columns}
+    artifacts = {col: read_artifact(key, store_dir) for col, key in keys.items()}
+
+    todo = [col for col, artifact in artifacts.items() if artifact is None]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+    args = ([series[col] for col in todo], [method] * len(todo), [horizon] * len(todo))
+    if workers == 1:
+        fitted = list(map(fit_forecast, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fitted = list(pool.map(fit_forecast, *args))
+
+    for col, artifact in zip(todo, fitted):
+        artifacts[col] = artifact
+        try:
+            write_artifact(keys[col], artifact, store_dir)
+        except OSError:
+            pass
+    return artifacts
@@ -0,0 +1,385 @@
+"""Columnar ingestion stage for the PDIS datasets.
+
+Converts the CSV feeds into typed, uncompressed Arrow IPC files under
+``store/`` with the derived columns already computed. Arrow IPC is used
+rather than Parquet because it can be memory-mapped and read zero-copy.
+
+Run ``python -m pdis.ingest`` after replacing any of the CSVs. New months
+can instead be appended without a rebuild via ``python -m pdis.append``;
+appended batches are stored as extra segment files next to the base file
+and read back together with it. Rebuilding from the CSV discards them.
+Store files record the layout version they were written with. A store from
+an older version counts as stale, like one older than its CSV, and is read
+from the CSV until the next ``python -m pdis.ingest``.
+
+The PDIS feed is partitioned by city / property (its ``City`` column, or a
+single ``Delhi`` partition without one). Each partition is a complete store
+of its own under ``store/partitions/<name>/``, listed in a manifest, so a
+selection only ever reads the partitions it needs.
+"""
+import json
+import os
+import re
+import shutil
+import sys
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = feather = None
+
+PDIS_CSV = 'Final Data to use.csv'
+AQI_CSV = 'Delhi_Monthly_AQI_Aggregated.csv'
+FTA_CSV = 'Refined_Delhi_Monthly_FTAs_2015_2024.csv'
+
+STORE_DIR = 'store'
+STORE_FILES = {
+    PDIS_CSV: 'pdis.arrow',
+    AQI_CSV: 'aqi.arrow',
+    FTA_CSV: 'fta.arrow',
+}
+
+# Written into every store file; bump when the stored columns change (2: derived Date column)
+STORE_SCHEMA_VERSION = 2
+_VERSION_KEY = b'pdis_store_version'
+
+PARTITION_COLUMN = 'City'
+DEFAULT_PARTITION = 'Delhi'
+PARTITIONS_DIR = 'partitions'
+PARTITION_MANIFEST = 'partitions.json'
+
+EXCLUDED_YEARS = [2020, 2021]
+
+MONTH_ORDER = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+# Column -> dtype for the main PDIS feed; required columns must be present
+PDIS_SCHEMA = {
+    'Year': 'int16',
+    'Month': 'category',
+    'Estimated_Delhi_FTAs': 'int64',
+    'ADR (INR)': 'float64',
+    'RevPAR (INR)': 'float64',
+    'Occupancy (%)': 'float64',
+    'USD_INR_Rate': 'float64',
+    'ADR_USD': 'float64',
+    'Avg_Temp': 'float64',
+    'Avg_Max_Temp': 'float64',
+    'Avg_Min_Temp': 'float64',
+    'Avg_Humidity': 'float64',
+    'Total_Rainfall': 'float64',
+    'Monthly_Mean_AQI': 'float64',
+    'Severe_Day_Count': 'float64',
+    'Max_AQI': 'float64',
+    'Quarter': 'int8',
+    'International_Aviation_Arrivals': 'int64',
+    'Capture_Ratio (%)': 'float64',
+}
+PDIS_REQUIRED = [
+    'Year', 'Month', 'Estimated_Delhi_FTAs', 'ADR (INR)', 'RevPAR (INR)',
+    'Occupancy (%)', 'Avg_Temp', 'International_Aviation_Arrivals',
+]
+
+# Column -> dtype for the optional monthly feeds; none of their columns are required.
+# Counts are float64 so that a missing month stays NaN.
+AQI_SCHEMA = {
+    'Year': 'int16',
+    'Month': 'category',
+    'Monthly_Mean_AQI': 'float64',
+    'Max_AQI': 'float64',
+    'Severe_Day_Count': 'float64',
+}
+FTA_SCHEMA = {
+    'Year': 'int16',
+    'Month': 'category',
+    'Estimated_Delhi_FTAs': 'float64',
+}
+FEED_SCHEMAS = {
+    AQI_CSV: AQI_SCHEMA,
+    FTA_CSV: FTA_SCHEMA,
+}
+
+
+def month_categories(values):
+    """Month labels in calendar order, with any unrecognised labels after them"""
+    present = set(values)
+    return [m for m in MONTH_ORDER if m in present] + sorted(present - set(MONTH_ORDER))
+
+
+def calendar_months(df):
+    """Reorder a categorical ``Month`` column into calendar order, in place"""
+    if 'Month' in df.columns and isinstance(df['Month'].dtype, pd.CategoricalDtype):
+        df['Month'] = df['Month'].cat.reorder_categories(month_categories(df['Month'].cat.categories))
+    return df
+
+
+def validate_schema(df, schema=PDIS_SCHEMA, required=PDIS_REQUIRED):
+    """Check required columns and cast known columns to their schema dtypes.
+
+    Raises ValueError naming the offending column when a required column is
+    missing or a value cannot be represented in the declared dtype.
+    """
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"PDIS data is missing required column(s): {', '.join(missing)}")
+
+    df = df.copy()
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        try:
+            if dtype == 'category':
+                values = df[col].astype(str)
+                categories = month_categories(values.unique()) if col == 'Month' else sorted(values.unique())
+                df[col] = pd.Categorical(values, categories=categories)
+            elif dtype.startswith('int'):
+                if df[col].isna().any():
+                    raise ValueError('contains missing values')
+                df[col] = pd.to_numeric(df[col], errors='raise').astype(dtype)
+            else:
+                df[col] = pd.to_numeric(df[col], errors='raise').astype(dtype)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Column {col!r} does not match schema dtype {dtype}: {e}") from e
+    return df
+
+
+def derive_columns(df):
+    """Drop pandemic years and add the derived PDIS metrics"""
+    df_clean = df[~df['Year'].isin(EXCLUDED_YEARS)].copy()
+
+    # Daily feeds carry their own dates; monthly rows are dated to the 1st
+    if 'Date' in df_clean.columns:
+        df_clean['Date'] = pd.to_datetime(df_clean['Date'])
+    else:
+        df_clean['Date'] = month_start(df_clean)
+
+    if 'International_Aviation_Arrivals' in df_clean.columns:
+        df_clean['Total_Arrivals'] = df_clean['International_Aviation_Arrivals']
+
+    if 'Estimated_Delhi_FTAs' in df_clean.columns:
+        df_clean['FTA_Foreign'] = df_clean['Estimated_Delhi_FTAs']
+
+    if 'Capture_Ratio (%)' not in df_clean.columns:
+        if 'Total_Arrivals' in df_clean.columns:
+            total_arrivals = df_clean['Total_Arrivals']
+        else:
+            total_arrivals = df_clean['International_Aviation_Arrivals']
+        df_clean['Capture_Ratio (%)'] = (df_clean['Occupancy (%)'] / total_arrivals.replace(0, 1)) * 100
+
+    if 'Market_Intensity' not in df_clean.columns:
+        if 'FTA_Foreign' in df_clean.columns:
+            fta = df_clean['FTA_Foreign']
+        else:
+            fta = df_clean['Estimated_Delhi_FTAs']
+        df_clean['Market_Intensity'] = fta / (df_clean['Avg_Temp'] + 1)
+
+    return df_clean.reset_index(drop=True)
+
+
+def month_start(df):
+    """First-of-month timestamps for the Year/Month columns"""
+    month_num = df['Month'].astype(str).map({m: i + 1 for i, m in enumerate(MONTH_ORDER)})
+    return pd.to_datetime(pd.DataFrame({'year': df['Year'].astype(int), 'month': month_num, 'day': 1}))
+
+
+def store_path(csv_path, store_dir=STORE_DIR):
+    """Location of the columnar copy of a CSV feed"""
+    name = STORE_FILES.get(os.path.basename(csv_path))
+    if name is None:
+        name = os.path.splitext(os.path.basename(csv_path))[0] + '.arrow'
+    return os.path.join(store_dir, name)
+
+
+def store_segments(csv_path, store_dir=STORE_DIR):
+    """Appended segment files for a feed, oldest first"""
+    stem = os.path.splitext(os.path.basename(store_path(csv_path, store_dir)))[0]
+    prefix = f"{stem}.append-"
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(
+        os.path.join(store_dir, name) for name in os.listdir(store_dir)
+        if name.startswith(prefix) and name.endswith('.arrow')
+    )
+
+
+def store_version(csv_path, store_dir=STORE_DIR):
+    """Changes whenever a feed's store (or, without a store, its CSV) changes"""
+    paths = [store_path(csv_path, store_dir)] + store_segments(csv_path, store_dir)
+    mtimes = [os.path.getmtime(p) for p in paths if os.path.exists(p)]
+    if not mtimes and os.path.exists(csv_path):
+        mtimes = [os.path.getmtime(csv_path)]
+    return (max(mtimes, default=0.0), len(paths))
+
+
+def store_schema_version(path):
+    """``STORE_SCHEMA_VERSION`` a store file was written with (0 if unmarked or unreadable)"""
+    try:
+        with pa.memory_map(path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return 0
+    try:
+        return int(metadata.get(_VERSION_KEY, b'0'))
+    except ValueError:
+        return 0
+
+
+def store_is_fresh(csv_path, store_dir=STORE_DIR):
+    """True when a store file exists, has the current layout and is not older than its source CSV"""
+    path = store_path(csv_path, store_dir)
+    if feather is None or not os.path.exists(path):
+        return False
+    if os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(path):
+        return False
+    return store_schema_version(path) == STORE_SCHEMA_VERSION
+
+
+def read_store(csv_path, store_dir=STORE_DIR):
+    """Memory-map a store file and its appended segments into a DataFrame.
+
+    Columns are converted one block each, so numeric columns without nulls
+    stay zero-copy views of the mapped file (read-only) instead of being
+    consolidated into private pandas blocks. Segments are combined into one
+    chunk per column first, which copies them once.
+    """
+    paths = [store_path(csv_path, store_dir)] + store_segments(csv_path, store_dir)
+    tables = [feather.read_table(path, memory_map=True) for path in paths]
+    table = tables[0] if len(tables) == 1 else pa.concat_tables(tables).combine_chunks()
+    return calendar_months(table.to_pandas(split_blocks=True, self_destruct=True))
+
+
+def write_store(df, csv_path, store_dir=STORE_DIR):
+    """Write a frame as uncompressed Arrow IPC so it can be memory-mapped"""
+    os.makedirs(store_dir, exist_ok=True)
+    path = store_path(csv_path, store_dir)
+    tmp_path = path + '.tmp'
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           _VERSION_KEY: str(STORE_SCHEMA_VERSION).encode()})
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+    # A rewritten base file supersedes anything appended to the old one
+    for segment in store_segments(csv_path, store_dir):
+        os.remove(segment)
+    return path
+
+
+def read_pdis_csv(csv_path=PDIS_CSV):
+    """Parse, validate and derive the PDIS feed straight from CSV"""
+    return derive_columns(validate_schema(pd.read_csv(csv_path)))
+
+
+def read_feed_csv(csv_path):
+    """Parse an optional feed and cast its known columns to ``FEED_SCHEMAS`` dtypes"""
+    return validate_schema(pd.read_csv(csv_path), FEED_SCHEMAS.get(os.path.basename(csv_path), {}), required=[])
+
+
+def load_pdis_frame(csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Cleaned PDIS frame from the columnar store, falling back to the CSV"""
+    if store_is_fresh(csv_path, store_dir):
+        return read_store(csv_path, store_dir)
+    return read_pdis_csv(csv_path)
+
+
+# ==================== PARTITIONS ====================
+def partition_dir(name, store_dir=STORE_DIR):
+    """Store directory holding one city / property partition"""
+    slug = re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-') or 'default'
+    return os.path.join(store_dir, PARTITIONS_DIR, slug)
+
+
+def list_partitions(store_dir=STORE_DIR):
+    """Partition names recorded in the store manifest; empty without one"""
+    try:
+        with open(os.path.join(store_dir, PARTITIONS_DIR, PARTITION_MANIFEST), encoding='utf-8') as f:
+            return json.load(f)['partitions']
+    except FileNotFoundError:
+        return []
+
+
+def _write_manifest(names, store_dir):
+    os.makedirs(os.path.join(store_dir, PARTITIONS_DIR), exist_ok=True)
+    path = os.path.join(store_dir, PARTITIONS_DIR, PARTITION_MANIFEST)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'partitions': sorted(names)}, f)
+    os.replace(path + '.tmp', path)
+
+
+def split_partitions(df):
+    """``{name: rows}`` per city / property; without a partition column the frame is one partition"""
+    if PARTITION_COLUMN not in df.columns:
+        return {DEFAULT_PARTITION: df}
+    return {
+        str(name): rows.reset_index(drop=True)
+        for name, rows in df.groupby(PARTITION_COLUMN, sort=True, observed=True)
+    }
+
+
+def partitions_fresh(names, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    return bool(names) and all(store_is_fresh(csv_path, partition_dir(name, store_dir)) for name in names)
+
+
+def partitions_version(csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Like ``store_version``, across every partition in the manifest"""
+    names = list_partitions(store_dir)
+    if not names:
+        return store_version(csv_path, store_dir)
+    return tuple(store_version(csv_path, partition_dir(name, store_dir)) for name in names)
+
+
+def available_partitions(csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Partitions that can be loaded, from the manifest or else the CSV"""
+    names = list_partitions(store_dir)
+    if partitions_fresh(names, csv_path, store_dir):
+        return names
+    if PARTITION_COLUMN not in pd.read_csv(csv_path, nrows=0).columns:
+        return [DEFAULT_PARTITION]
+    return sorted(pd.read_csv(csv_path, usecols=[PARTITION_COLUMN])[PARTITION_COLUMN].astype(str).unique())
+
+
+def write_partitions(df, csv_path=PDIS_CSV, store_dir=STORE_DIR, replace=True):
+    """Write one store per partition of ``df`` and record them in the manifest.
+
+    With ``replace`` the manifest lists exactly these partitions and any
+    other partition directories are removed; otherwise they are kept.
+    """
+    parts = split_partitions(df)
+    written = [write_store(rows, csv_path, partition_dir(name, store_dir)) for name, rows in parts.items()]
+
+    previous = list_partitions(store_dir)
+    if replace:
+        for name in set(previous) - set(parts):
+            shutil.rmtree(partition_dir(name, store_dir), ignore_errors=True)
+        previous = []
+    _write_manifest(set(previous) | set(parts), store_dir)
+    return written
+
+
+def load_optional_frame(csv_path, store_dir=STORE_DIR):
+    """Typed optional feed from the store or CSV; None when neither exists or the CSV does not parse"""
+    if store_is_fresh(csv_path, store_dir):
+        return read_store(csv_path, store_dir)
+    try:
+        return read_feed_csv(csv_path)
+    except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError, ValueError):
+        return None
+
+
+def ingest(store_dir=STORE_DIR):
+    """Convert every available CSV feed into the columnar store"""
+    if feather is None:
+        raise ImportError("pyarrow is required to build the columnar store")
+
+    written = write_partitions(read_pdis_csv(PDIS_CSV), PDIS_CSV, store_dir)
+    for csv_path in (AQI_CSV, FTA_CSV):
+        if os.path.exists(csv_path):
+            written.append(write_store(read_feed_csv(csv_path), csv_path, store_dir))
+    return written
+
+
+if __name__ == '__main__':
+    for path in ingest(*sys.argv[1:2]):
+        print(f"Wrote {path}")
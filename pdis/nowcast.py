@@ -0,0 +1,294 @@
+"""Nowcasts of the current month from partial-month observation streams.
+
+Operations drop daily figures into ``store/nowcast/`` as CSV or JSON-lines
+files, one observation per row. Each observation has:
+
+- a ``Date``;
+- ``Occupancy (%)`` and ``ADR (INR)``, or ``RevPAR (INR)`` directly;
+- ``Capture_Ratio (%)``, or ``Estimated_Delhi_FTAs`` together with
+  ``International_Aviation_Arrivals``.
+
+Files may keep growing while they are read, like a queue. Each poll reads
+only the complete lines added since the last one.
+
+Every month keeps constant-size running estimators (count, mean and sum of
+squared deviations per metric). A tick therefore costs time proportional
+to the new lines and never rereads history. The estimator state and the
+read offsets are saved next to the drop files. Alongside each offset the
+file's inode and a checksum of the bytes just before it are kept, so a file
+that is replaced or rewritten in place is read again from the start.
+
+A file's offset only moves once its new lines have been parsed and folded
+in. Lines that fail to parse are reported in ``Nowcaster.errors`` and read
+again on the next poll rather than skipped.
+
+    python -m pdis.nowcast          # poll once and print the estimates
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from pdis.ingest import STORE_DIR
+
+NOWCAST_DIR = os.path.join(STORE_DIR, 'nowcast')
+STATE_FILE = 'nowcast.state.json'
+NOWCAST_METRICS = ['RevPAR (INR)', 'Occupancy (%)', 'ADR (INR)', 'Capture_Ratio (%)']
+STREAM_SUFFIXES = ('.csv', '.jsonl')
+SIGNATURE_BYTES = 4096  # bytes before the read offset that must be unchanged between polls
+Z_95 = 1.96
+
+
+class RunningMoments:
+    """Count, mean and sum of squared deviations, merged batch by batch"""
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        n, mean = len(values), values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        # Chan et al. pairwise update
+        total = self.n + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.mean += delta * n / total
+        self.n = total
+        return self
+
+    @property
+    def stderr(self):
+        if self.n < 2:
+            return float('nan')
+        return float(np.sqrt(self.m2 / (self.n - 1) / self.n))
+
+    def to_dict(self):
+        return {'n': self.n, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['n'], state['mean'], state['m2'])
+
+
+def observation_metrics(frame):
+    """``Date`` plus the nowcast metrics for raw observations; unknown metrics are NaN"""
+    if 'Date' not in frame.columns:
+        raise ValueError("Nowcast observations need a 'Date' column")
+
+    def column(name):
+        if name not in frame.columns:
+            return pd.Series(np.nan, index=frame.index)
+        return pd.to_numeric(frame[name], errors='coerce')
+
+    metrics = pd.DataFrame({'Date': pd.to_datetime(frame['Date'], errors='coerce')})
+    metrics['Occupancy (%)'] = column('Occupancy (%)')
+    metrics['ADR (INR)'] = column('ADR (INR)')
+    metrics['RevPAR (INR)'] = column('RevPAR (INR)').fillna(metrics['ADR (INR)'] * metrics['Occupancy (%)'] / 100)
+    arrivals = column('International_Aviation_Arrivals')
+    metrics['Capture_Ratio (%)'] = column('Capture_Ratio (%)').fillna(
+        column('Estimated_Delhi_FTAs') / arrivals.where(arrivals > 0) * 100)
+    return metrics.dropna(subset=['Date'])
+
+
+class Nowcaster:
+    """Running month-to-date estimates over the files in ``drop_dir``"""
+
+    def __init__(self, drop_dir=NOWCAST_DIR):
+        self.drop_dir = drop_dir
+        self._lock = threading.Lock()
+        self.offsets = {}
+        self.signatures = {}
+        self.headers = {}
+        self.months = {}
+        self.errors = {}  # file name -> why its new lines could not be read on the last poll
+        self._load_state()
+
+    # ---- persistence ----
+    def _state_path(self):
+        return os.path.join(self.drop_dir, STATE_FILE)
+
+    def _load_state(self):
+        try:
+            with open(self._state_path(), encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.offsets = state['offsets']
+        self.signatures = state.get('signatures', {})
+        self.headers = state['headers']
+        self.months = {
+            month: {
+                'last_date': entry['last_date'],
+                'metrics': {name: RunningMoments.from_dict(m) for name, m in entry['metrics'].items()},
+            }
+            for month, entry in state['months'].items()
+        }
+
+    def _save_state(self):
+        state = {
+            'offsets': self.offsets,
+            'signatures': self.signatures,
+            'headers': self.headers,
+            'months': {
+                month: {
+                    'last_date': entry['last_date'],
+                    'metrics': {name: m.to_dict() for name, m in entry['metrics'].items()},
+                }
+                for month, entry in self.months.items()
+            },
+        }
+        path = self._state_path()
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+
+    # ---- ingestion ----
+    def _stream_files(self):
+        if not os.path.isdir(self.drop_dir):
+            return []
+        return sorted(name for name in os.listdir(self.drop_dir) if name.endswith(STREAM_SUFFIXES))
+
+    @staticmethod
+    def _signature(f, offset):
+        """Inode plus a checksum of the bytes just before ``offset``"""
+        start = max(0, offset - SIGNATURE_BYTES)
+        f.seek(start)
+        return [os.fstat(f.fileno()).st_ino, zlib.crc32(f.read(offset - start))]
+
+    def _read_new(self, name):
+        """Observations from the complete lines appended to ``name`` since the last poll.
+
+        Returns None when nothing new has arrived, or ``(frame, position)``
+        where ``position`` is the ``(offset, signature, header)`` to commit
+        once the frame has been folded in.
+        """
+        path = os.path.join(self.drop_dir, name)
+        offset = self.offsets.get(name, 0)
+        with open(path, 'rb') as f:
+            if offset:
+                current = self._signature(f, offset) if os.fstat(f.fileno()).st_size >= offset else None
+                # State saved before signatures were kept trusts the offset alone
+                if current is None or current != self.signatures.get(name, current):
+                    offset = 0  # the file was replaced or rewritten; start over
+            f.seek(offset)
+            chunk = f.read()
+            chunk = chunk[:chunk.rfind(b'\n') + 1]
+            if not chunk:
+                return None
+            end = offset + len(chunk)
+            signature = self._signature(f, end)
+
+        header = self.headers.get(name)
+        if name.endswith('.jsonl'):
+            frame = pd.read_json(io.BytesIO(chunk), lines=True)
+        elif offset == 0:
+            header = chunk.partition(b'\n')[0].decode()
+            frame = pd.read_csv(io.BytesIO(chunk))
+        else:
+            frame = pd.read_csv(io.BytesIO(header.encode() + b'\n' + chunk))
+        return frame, (end, signature, header)
+
+    def update(self, frame):
+        """Fold raw observations into the per-month estimators"""
+        metrics = observation_metrics(frame)
+        for period, group in metrics.groupby(metrics['Date'].dt.to_period('M')):
+            entry = self.months.setdefault(str(period), {
+                'last_date': None,
+                'metrics': {name: RunningMoments() for name in NOWCAST_METRICS},
+            })
+            for name in NOWCAST_METRICS:
+                entry['metrics'][name].update(group[name])
+            last = group['Date'].max().strftime('%Y-%m-%d')
+            entry['last_date'] = max(filter(None, [entry['last_date'], last]))
+        return len(metrics)
+
+    def poll(self):
+        """Read new observations from the drop directory; returns how many arrived.
+
+        A file whose new lines cannot be parsed keeps its offset and is listed
+        in ``errors`` instead of failing the poll.
+        """
+        with self._lock:
+            count, moved = 0, False
+            for name in self._stream_files():
+                try:
+                    pending = self._read_new(name)
+                    if pending is None:
+                        continue
+                    frame, position = pending
+                    if not frame.empty:
+                        count += self.update(frame)
+                except (OSError, ValueError, UnicodeDecodeError) as e:
+                    self.errors[name] = f"{type(e).__name__}: {e}"
+                    continue
+                self.offsets[name], self.signatures[name], header = position
+                if header is not None:
+                    self.headers[name] = header
+                self.errors.pop(name, None)
+                moved = True
+            if moved:
+                self._save_state()
+            return count
+
+    # ---- estimates ----
+    def estimates(self, month=None):
+        """Month-to-date estimates for ``month`` ('YYYY-MM', default: the latest), or None"""
+        with self._lock:
+            if not self.months:
+                return None
+            month = month or max(self.months)
+            entry = self.months.get(month)
+            if entry is None:
+                return None
+            period = pd.Period(month, 'M')
+            result = {
+                'month': period.start_time,
+                'last_date': pd.Timestamp(entry['last_date']),
+                'days_in_month': period.days_in_month,
+            }
+            for name, moments in entry['metrics'].items():
+                half_width = Z_95 * moments.stderr
+                result[name] = {
+                    'n': moments.n,
+                    'mean': moments.mean if moments.n else None,
+                    'lower': moments.mean - half_width if moments.n > 1 else None,
+                    'upper': moments.mean + half_width if moments.n > 1 else None,
+                }
+            return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poll the nowcast drop directory and print estimates")
+    parser.add_argument('--drop-dir', default=NOWCAST_DIR, help='directory receiving observation files')
+    args = parser.parse_args(argv)
+
+    nowcaster = Nowcaster(args.drop_dir)
+    print(f"Read {nowcaster.poll()} new observation(s)")
+    for name, error in sorted(nowcaster.errors.items()):
+        print(f"  Skipped {name}: {error}", file=sys.stderr)
+    estimates = nowcaster.estimates()
+    if estimates is None:
+        print("No observations yet")
+        return 1
+    print(f"{estimates['month']:%B %Y} through {estimates['last_date']:%Y-%m-%d}")
+    for name in NOWCAST_METRICS:
+        metric = estimates[name]
+        if metric['mean'] is not None:
+            print(f"  {name}: {metric['mean']:,.2f} (n={metric['n']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
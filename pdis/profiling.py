@@ -0,0 +1,132 @@
+"""Per-rerun latency and cache instrumentation.
+
+A ``RerunProfile`` is started at the top of every script run. Sequential
+parts of the script are timed with ``lap`` and nested regions (tabs, model
+fits, heavy figures) with ``section``. A lap excludes the sections run
+inside it, so laps and top-level sections add up to the rerun; sections
+nested in another section are reported apart as ``detail_ms``. Cached loaders wrapped with
+``tracked_cache`` report calls and misses to the profile of the rerun that
+triggered them and to process-wide totals. ``finish`` appends one JSON
+line per rerun to the profile log.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+PROFILE_LOG = os.environ.get('PDIS_PROFILE_LOG', os.path.join('logs', 'rerun_profile.jsonl'))
+
+_current = threading.local()
+_totals_lock = threading.Lock()
+CACHE_TOTALS = {}
+
+
+def current_profile():
+    """Profile of the rerun running on this thread, if any"""
+    return getattr(_current, 'profile', None)
+
+
+def _record_cache(name, miss):
+    with _totals_lock:
+        stats = CACHE_TOTALS.setdefault(name, {'calls': 0, 'misses': 0})
+        stats['misses' if miss else 'calls'] += 1
+    profile = current_profile()
+    if profile is not None:
+        stats = profile.cache.setdefault(name, {'calls': 0, 'misses': 0})
+        stats['misses' if miss else 'calls'] += 1
+
+
+def tracked_cache(cache_decorator):
+    """Wrap a caching decorator so calls and cache misses are counted.
+
+    The wrapped body only runs on a miss, so hits are ``calls - misses``.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            _record_cache(func.__name__, miss=True)
+            return func(*args, **kwargs)
+
+        cached = cache_decorator(body)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            _record_cache(func.__name__, miss=False)
+            return cached(*args, **kwargs)
+
+        call.clear = cached.clear
+        return call
+    return decorator
+
+
+class RerunProfile:
+    """Wall-clock timings for one script run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sections = {}
+        self.detail = {}
+        self.cache = {}
+        self._lap_name = None
+        self._lap_start = None
+        self._depth = 0
+        _current.profile = self
+
+    def _add(self, name, seconds, target=None):
+        target = self.sections if target is None else target
+        target[name] = target.get(name, 0.0) + seconds * 1000
+
+    def lap(self, name=None):
+        """Close the running lap and, if ``name`` is given, start a new one"""
+        now = time.perf_counter()
+        if self._lap_name is not None:
+            self._add(self._lap_name, now - self._lap_start)
+        self._lap_name, self._lap_start = name, now
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            elapsed = time.perf_counter() - start
+            if self._depth:
+                self._add(name, elapsed, self.detail)
+            else:
+                self._add(name, elapsed)
+                if self._lap_start is not None:
+                    # Keep the enclosing lap from counting this time again
+                    self._lap_start += elapsed
+
+    def cache_summary(self):
+        return {
+            name: {'calls': s['calls'], 'hits': s['calls'] - s['misses'], 'misses': s['misses']}
+            for name, s in self.cache.items()
+        }
+
+    def finish(self, log_path=PROFILE_LOG, **context):
+        """Close the profile, append it to the JSON-lines log and return the record"""
+        self.lap()
+        record = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'sections_ms': {name: round(ms, 3) for name, ms in self.sections.items()},
+            'detail_ms': {name: round(ms, 3) for name, ms in self.detail.items()},
+            'cache': self.cache_summary(),
+            'context': context,
+        }
+        if log_path:
+            try:
+                os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+                with open(log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, default=str) + '\n')
+            except OSError:
+                pass
+        if current_profile() is self:
+            _current.profile = None
+        return record
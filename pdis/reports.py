@@ -0,0 +1,215 @@
+"""Batch board-pack generation for many filter specs.
+
+Renders the KPI block and the tab 1-7 tables and figures for every spec in
+a JSON file and exports them as static HTML, CSV and (with ``kaleido``
+installed) PNG. The dataset is loaded once in the parent process and handed
+to each pool worker at start-up, so no worker rereads the CSV. The HTML
+reports share one copy of plotly.js written to the output directory, so
+they open without network access.
+
+    python -m pdis.reports specs.json --output reports --formats html csv
+
+A spec file is a JSON list of objects such as::
+
+    {"name": "Winter 2022-24", "year_range": [2022, 2024],
+     "months": ["November", "December", "January"],
+     "scenario": [200, 83.0, 30.0]}
+
+Only ``name`` is required; missing fields default to the full history, all
+months and the base-case scenario.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from pdis import engine
+from pdis.elasticity import fit_elasticity_model, scenario_elasticities
+from pdis.figures import TAB_BUILDERS, build_risk_tab, build_scenario_tab
+from pdis.ingest import MONTH_ORDER, PDIS_CSV, STORE_DIR
+
+FORMATS = ('html', 'csv', 'png')
+# Written once next to the spec folders so the HTML reports open offline
+PLOTLY_JS = 'plotly.min.js'
+DEFAULT_SCENARIO = engine.SCENARIO_PRESETS['Base Case']
+
+TAB_TITLES = {
+    'revenue': 'Revenue Analysis',
+    'visitors': 'Visitor Metrics',
+    'environment': 'Environmental Impact',
+    'trends': 'Trend Analysis',
+    'correlation': 'Correlation Matrix',
+    'drift': 'Elasticity Drift',
+    'scenario': 'Predictive Model',
+}
+
+_dataset = None
+
+
+# ==================== SPECS ====================
+def slugify(name):
+    return re.sub(r'[^A-Za-z0-9]+', '-', name).strip('-').lower() or 'report'
+
+
+def parse_spec(raw, data):
+    """Validate one spec against the dataset and fill in defaults; a selection with no data is an error"""
+    if 'name' not in raw:
+        raise ValueError(f"Spec is missing a name: {raw}")
+    lo, hi = engine.year_bounds(data)
+    year_range = tuple(int(y) for y in raw.get('year_range', (lo, hi)))
+    if len(year_range) != 2 or year_range[0] > year_range[1]:
+        raise ValueError(f"{raw['name']}: year_range must be [start, end], got {raw.get('year_range')}")
+    months = list(raw.get('months', []))
+    unknown = [m for m in months if m not in MONTH_ORDER]
+    if unknown:
+        raise ValueError(f"{raw['name']}: unknown months {unknown}")
+    if engine.apply_filters(data, year_range, months).cells.empty:
+        raise ValueError(f"{raw['name']}: no data for years {year_range[0]}-{year_range[1]} "
+                         f"and months {months or 'all'}")
+    scenario = tuple(float(v) for v in raw.get('scenario', DEFAULT_SCENARIO))
+    if len(scenario) != 3:
+        raise ValueError(f"{raw['name']}: scenario must be [AQI, FX, Temp]")
+    return {'name': raw['name'], 'year_range': year_range, 'months': months, 'scenario': scenario}
+
+
+def load_specs(path, data):
+    with open(path, encoding='utf-8') as f:
+        raw_specs = json.load(f)
+    specs = [parse_spec(raw, data) for raw in raw_specs]
+    slugs = [slugify(spec['name']) for spec in specs]
+    if len(set(slugs)) != len(slugs):
+        raise ValueError("Spec names must be unique after slugifying")
+    return specs
+
+
+# ==================== RENDERING ====================
+def render_spec(data, spec):
+    """KPIs plus every tab's figures and tables for one spec"""
+    view = engine.apply_filters(data, spec['year_range'], spec['months'])
+    kpis = engine.kpis(view)
+    elasticities = scenario_elasticities(fit_elasticity_model(view.rows))
+
+    tabs = {tab: builder(view) for tab, builder in TAB_BUILDERS.items()}
+    tabs['scenario'] = build_scenario_tab(view, spec['scenario'], elasticities)
+    # The risk simulation draws factor paths from the full history, as the dashboard does
+    tabs['scenario'].update(build_risk_tab(data.rows, kpis['avg_revpar'], spec['scenario'][1], elasticities))
+    return kpis, tabs
+
+
+def _report_html(spec, kpis, tabs):
+    months = ', '.join(spec['months']) or 'All months'
+    parts = [
+        '<html><head><meta charset="utf-8">',
+        f"<title>{spec['name']}</title>",
+        f'<script src="../{PLOTLY_JS}"></script>',
+        '</head><body style="font-family: sans-serif; margin: 2em;">',
+        f"<h1>{spec['name']}</h1>",
+        f"<p>{spec['year_range'][0]} - {spec['year_range'][1]} &middot; {months}</p>",
+        '<h2>Key Performance Indicators</h2>',
+        pd.Series(kpis).to_frame('Value').to_html(float_format=lambda v: f"{v:,.2f}", na_rep='N/A'),
+    ]
+    for tab, results in tabs.items():
+        parts.append(f"<h2>{TAB_TITLES[tab]}</h2>")
+        for item in results.values():
+            if isinstance(item, pd.DataFrame):
+                parts.append(item.to_html(float_format=lambda v: f"{v:,.2f}"))
+            elif item is not None:
+                parts.append(item.to_html(full_html=False, include_plotlyjs=False))
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def export_spec(spec, kpis, tabs, output_dir, formats):
+    """Write one spec's outputs under ``output_dir/<slug>`` and list the files"""
+    spec_dir = os.path.join(output_dir, slugify(spec['name']))
+    os.makedirs(spec_dir, exist_ok=True)
+    written = []
+
+    def path(filename):
+        written.append(os.path.join(spec_dir, filename))
+        return written[-1]
+
+    if 'csv' in formats:
+        pd.Series(kpis).to_frame('Value').to_csv(path('kpis.csv'), index_label='KPI')
+    for tab, results in tabs.items():
+        for key, item in results.items():
+            if isinstance(item, pd.DataFrame):
+                if 'csv' in formats:
+                    item.to_csv(path(f"{tab}_{key}.csv"))
+            elif item is not None and 'png' in formats:
+                item.write_image(path(f"{tab}_{key}.png"), width=1200, height=item.layout.height or 500)
+    if 'html' in formats:
+        with open(path('report.html'), 'w', encoding='utf-8') as f:
+            f.write(_report_html(spec, kpis, tabs))
+    return written
+
+
+def write_plotlyjs(output_dir):
+    """Bundle plotly.js into ``output_dir`` for the reports to share"""
+    with open(os.path.join(output_dir, PLOTLY_JS), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+
+
+# ==================== WORKER POOL ====================
+def _init_worker(data):
+    global _dataset
+    _dataset = data
+
+
+def _run_spec(spec, output_dir, formats):
+    kpis, tabs = render_spec(_dataset, spec)
+    return {'name': spec['name'], 'files': export_spec(spec, kpis, tabs, output_dir, formats)}
+
+
+def generate_reports(data, specs, output_dir, formats=('html', 'csv'), workers=None):
+    """Render and export every spec over a process pool; returns the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    if 'html' in formats:
+        write_plotlyjs(output_dir)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(specs)))
+    if workers == 1:
+        _init_worker(data)
+        manifest = [_run_spec(spec, output_dir, formats) for spec in specs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+            futures = [pool.submit(_run_spec, spec, output_dir, formats) for spec in specs]
+            manifest = [f.result() for f in futures]
+
+    with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('specs', help='JSON file with a list of filter specs')
+    parser.add_argument('--output', default='reports', help='output directory')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=['html', 'csv'])
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--csv', default=PDIS_CSV, help='PDIS source CSV')
+    parser.add_argument('--store', default=STORE_DIR, help='columnar store directory')
+    args = parser.parse_args(argv)
+
+    if 'png' in args.formats and importlib.util.find_spec('kaleido') is None:
+        parser.error("PNG export needs the 'kaleido' package")
+
+    data = engine.load_dataset(args.csv, args.store)
+    try:
+        specs = load_specs(args.specs, data)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    manifest = generate_reports(data, specs, args.output, args.formats, args.workers)
+    for entry in manifest:
+        print(f"{entry['name']}: {len(entry['files'])} files")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Rolling-window elasticities via incremental least squares.
+
+Each window step adds the newest observation to the normal equations and
+drops the oldest one, so the per-window cost is a constant rank-one update
+plus a k x k solve regardless of how long the history is.
+"""
+import numpy as np
+import pandas as pd
+
+from pdis.elasticity import FORMULA, monthly_model_frame
+
+REGRESSORS = [term.strip() for term in FORMULA.split('~')[1].split('+')]
+
+
+class IncrementalLeastSquares:
+    """OLS normal equations that support adding and dropping single rows"""
+
+    def __init__(self, n_features):
+        self.xtx = np.zeros((n_features, n_features))
+        self.xty = np.zeros(n_features)
+        self.n = 0
+
+    def add(self, x, y):
+        self.xtx += np.outer(x, x)
+        self.xty += x * y
+        self.n += 1
+
+    def remove(self, x, y):
+        self.xtx -= np.outer(x, x)
+        self.xty -= x * y
+        self.n -= 1
+
+    def solve(self):
+        return np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+
+
+def rolling_elasticities(df, window):
+    """Coefficient path of the log-log model over trailing ``window``-month windows.
+
+    Rows are first averaged to one observation per calendar month, across
+    days and cities. Windows then slide over the complete months in time
+    order and are labelled by the first day of their last month.
+    """
+    data = monthly_model_frame(df)
+    dates = data.index.to_series()
+
+    # Centering the regressors keeps the normal equations well conditioned without changing the slopes
+    regressors = data[REGRESSORS].to_numpy()
+    X = np.column_stack([np.ones(len(data)), regressors - regressors.mean(axis=0)])
+    y = data['log_RevPAR'].to_numpy()
+
+    ls = IncrementalLeastSquares(X.shape[1])
+    coefs, labels = [], []
+    for i in range(len(y)):
+        ls.add(X[i], y[i])
+        if i >= window:
+            ls.remove(X[i - window], y[i - window])
+        if i >= window - 1:
+            coefs.append(ls.solve()[1:])
+            labels.append(dates.iloc[i])
+
+    return pd.DataFrame(coefs, columns=REGRESSORS, index=pd.DatetimeIndex(labels, name='Window End'))
@@ -0,0 +1,39 @@
+"""Vectorized RevPAR scenario engine for the elasticity model.
+
+A scenario is an ``(AQI, FX, Temp)`` triple. Each factor moves RevPAR by its
+elasticity times the relative change from its baseline, and the factor
+impacts are summed. All functions accept any number of scenarios as an
+``(..., 3)`` array and evaluate them in a single NumPy pass.
+"""
+import numpy as np
+
+FACTORS = ('AQI', 'FX', 'Temp')
+BASELINES = np.array([200.0, 83.0, 30.0])
+ELASTICITIES = np.array([-0.08, 1.32, -0.70])
+
+
+def factor_impacts(scenarios, elasticities=ELASTICITIES, baselines=BASELINES):
+    """Per-factor fractional RevPAR impact, same shape as ``scenarios``"""
+    scenarios = np.asarray(scenarios, dtype=float)
+    return (scenarios - baselines) / baselines * np.asarray(elasticities, dtype=float)
+
+
+def total_impact(scenarios, elasticities=ELASTICITIES, baselines=BASELINES):
+    """Combined fractional RevPAR impact of each scenario"""
+    return factor_impacts(scenarios, elasticities, baselines).sum(axis=-1)
+
+
+def predict_revpar(base_revpar, scenarios, elasticities=ELASTICITIES, baselines=BASELINES):
+    """Predicted RevPAR for every scenario around ``base_revpar``"""
+    return base_revpar * (1 + total_impact(scenarios, elasticities, baselines))
+
+
+def scenario_grid(aqi_values, fx_values, temp_values):
+    """Cartesian product of factor values as an ``(n, 3)`` scenario array"""
+    mesh = np.meshgrid(
+        np.asarray(aqi_values, dtype=float),
+        np.asarray(fx_values, dtype=float),
+        np.asarray(temp_values, dtype=float),
+        indexing='ij',
+    )
+    return np.stack(mesh, axis=-1).reshape(-1, len(FACTORS))
@@ -0,0 +1,241 @@
+"""Shared on-disk result cache for several dashboard replicas on one host.
+
+``st.cache_data`` is per process: every Streamlit replica parses the feeds
+and builds the aggregates itself, then keeps its own copy. This tier stores
+those results once, as uncompressed Arrow IPC files under
+``store/shared/``. Replicas memory-map the files, so the pages sit in the
+OS page cache once and every process that reads them shares them.
+
+- Keys are content hashes of the source files, the format version and the
+  call's arguments. Any replica that sees the same inputs finds the same
+  entry, and a changed feed simply misses.
+- Entries are written to a temporary directory and renamed into place.
+  Readers therefore never see a partial entry, and when two replicas race
+  on the same key the first one wins.
+- Total size is capped at ``max_bytes``. The least recently used entries
+  are evicted first, using the directory mtime that every hit touches.
+  Unlinking an entry does not disturb processes that still have it mapped.
+
+Set ``PDIS_SHARED_CACHE`` to put the cache elsewhere (e.g. a tmpfs mount
+shared by the replicas) and ``PDIS_SHARED_CACHE_BYTES`` to resize it.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from pdis.append import _cube_to_frame, _frame_to_cube
+from pdis.correlation import CellCorrelations
+from pdis.cube import CUBE_KEYS
+from pdis.engine import Dataset
+from pdis.ingest import (PDIS_CSV, STORE_DIR, calendar_months, feather, month_categories, pa, partition_dir,
+                         partitions_fresh, store_is_fresh, store_path, store_segments)
+
+SHARED_CACHE_DIR = os.environ.get('PDIS_SHARED_CACHE', os.path.join(STORE_DIR, 'shared'))
+MAX_BYTES = int(os.environ.get('PDIS_SHARED_CACHE_BYTES', 2 * 1024 ** 3))
+# Bump when the on-disk layout of an entry changes
+CACHE_FORMAT = 1
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+# ==================== KEYS ====================
+def file_digest(path):
+    """SHA-1 of a file's bytes, remembered until its size or mtime changes"""
+    stat = os.stat(path)
+    signature = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        if signature in _digests:
+            return _digests[signature]
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    with _digests_lock:
+        _digests[signature] = digest.hexdigest()
+    return _digests[signature]
+
+
+def content_key(paths, *args):
+    """Cache key from the contents of ``paths`` plus JSON-able arguments"""
+    digest = hashlib.sha1(json.dumps([CACHE_FORMAT, list(args)], default=str).encode())
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        digest.update(file_digest(path).encode() if os.path.exists(path) else b'missing')
+    return digest.hexdigest()
+
+
+def feed_files(csv_path, store_dir=STORE_DIR):
+    """Files a feed is loaded from: its store file and segments when fresh, else the CSV"""
+    if store_is_fresh(csv_path, store_dir):
+        return [store_path(csv_path, store_dir)] + store_segments(csv_path, store_dir)
+    return [csv_path]
+
+
+def pdis_files(partitions, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """Files the selected PDIS partitions are loaded from"""
+    if partitions_fresh(partitions, csv_path, store_dir):
+        return [path for name in partitions for path in feed_files(csv_path, partition_dir(name, store_dir))]
+    return [csv_path]
+
+
+# ==================== STORE ====================
+class SharedCache:
+    """Directory of memory-mapped Arrow entries, bounded by ``max_bytes``"""
+
+    def __init__(self, directory=SHARED_CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """``{name: pyarrow.Table}`` mapped from disk, or None on a miss"""
+        entry = self._entry(key)
+        try:
+            names = sorted(name for name in os.listdir(entry) if name.endswith('.arrow'))
+            tables = {name[:-len('.arrow')]: feather.read_table(os.path.join(entry, name), memory_map=True)
+                      for name in names}
+            os.utime(entry)
+        except FileNotFoundError:
+            # Not cached yet, or evicted by another replica mid-read
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tables
+
+    def put(self, key, frames):
+        """Publish ``{name: DataFrame or Table}`` under ``key``; False if it could not be written.
+
+        When another replica published the same key first, its entry is kept.
+        """
+        entry = self._entry(key)
+        tmp = f"{entry}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            os.makedirs(tmp, exist_ok=True)
+            for name, frame in frames.items():
+                feather.write_feather(frame, os.path.join(tmp, f"{name}.arrow"), compression='uncompressed')
+            os.rename(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(entry):
+                return False
+        self.evict(keep=key)
+        return True
+
+    def entries(self):
+        """``(last_used, bytes, key)`` for every complete entry"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for key in os.listdir(self.directory):
+            entry = self._entry(key)
+            if '.tmp-' in key or not os.path.isdir(entry):
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+                found.append((os.path.getmtime(entry), size, key))
+            except FileNotFoundError:
+                continue
+        return found
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in ``max_bytes``"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+        return total
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# ==================== CODECS ====================
+def correlations_table(cells):
+    """Per-cell statistics as one row per cell with flattened ``(k, k)`` lists"""
+    k = len(cells.columns)
+    arrays = {
+        'Year': pa.array(cells.index.get_level_values('Year').to_numpy()),
+        'Month': pa.array(cells.index.get_level_values('Month').astype(str).to_numpy(dtype=str)),
+    }
+    for name in ['n', 'mean', 'm2', 'comoment']:
+        values = getattr(cells, name)
+        flat = pa.array(np.ascontiguousarray(values, dtype=float).reshape(-1))
+        arrays[name] = pa.FixedSizeListArray.from_arrays(flat, k * k)
+    return pa.table(arrays).replace_schema_metadata({'columns': json.dumps(cells.columns)})
+
+
+def table_correlations(table):
+    """Inverse of ``correlations_table``; the statistics stay views of the mapped buffers"""
+    columns = json.loads(table.schema.metadata[b'columns'])
+    k = len(columns)
+    months = table.column('Month').to_numpy()
+    index = pd.MultiIndex.from_arrays(
+        [table.column('Year').to_numpy(), pd.Categorical(months, categories=month_categories(months))],
+        names=CUBE_KEYS,
+    )
+
+    def stat(name):
+        values = table.column(name).combine_chunks().flatten()
+        return values.to_numpy(zero_copy_only=True).reshape(len(table), k, k)
+
+    return CellCorrelations(index, columns, stat('n'), stat('mean'), stat('m2'), stat('comoment'))
+
+
+def dataset_tables(data):
+    return {
+        'rows': data.rows,
+        'cube': _cube_to_frame(data.cube),
+        'correlations': correlations_table(data.correlations),
+    }
+
+
+def tables_dataset(tables):
+    rows = calendar_months(tables['rows'].to_pandas(split_blocks=True))
+    cube = _frame_to_cube(tables['cube'].to_pandas())
+    return Dataset(rows, cube, table_correlations(tables['correlations']))
+
+
+def _shared(cache, key, load, encode):
+    """Mapped tables for ``key``, publishing ``encode(load())`` on a miss.
+
+    Returns ``(tables, None)``, or ``(None, value)`` when the value could not
+    be shared (missing feed, unwritable cache directory).
+    """
+    tables = cache.get(key)
+    if tables is not None:
+        return tables, None
+    value = load()
+    if value is None or not cache.put(key, encode(value)):
+        return None, value
+    # Read back so this replica maps the shared pages instead of keeping its own copy
+    tables = cache.get(key)
+    return (tables, None) if tables is not None else (None, value)
+
+
+def shared_dataset(cache, load, partitions, csv_path=PDIS_CSV, store_dir=STORE_DIR):
+    """``load()``'s dataset for ``partitions``, shared through ``cache``"""
+    key = content_key(pdis_files(partitions, csv_path, store_dir), 'pdis', list(partitions))
+    tables, data = _shared(cache, key, load, dataset_tables)
+    return data if tables is None else tables_dataset(tables)
+
+
+def shared_frame(cache, load, csv_path, store_dir=STORE_DIR):
+    """``load()``'s frame for a feed, shared through ``cache``; None stays None"""
+    key = content_key(feed_files(csv_path, store_dir), 'frame', os.path.basename(csv_path))
+    tables, frame = _shared(cache, key, load, lambda frame: {'frame': frame})
+    return frame if tables is None else calendar_months(tables['frame'].to_pandas(split_blocks=True))
@@ -0,0 +1,170 @@
+"""Monte Carlo RevPAR-at-risk simulation on top of the elasticity model.
+
+Factor paths are drawn month by month: AQI and temperature as seasonal means
+plus correlated shocks, FX as a random walk of monthly log returns. Shock
+means and covariance come from the PDIS history. Draws are generated in
+chunks and folded into a mergeable histogram sketch, so memory stays bounded
+by the chunk size no matter how many paths are simulated. Chunks are spread
+over a process pool and the per-worker sketches are summed at the end.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pdis.forecast import monthly_series
+from pdis.ingest import MONTH_ORDER
+from pdis.scenarios import BASELINES, ELASTICITIES, predict_revpar
+
+# Historical columns for each scenario factor, in scenarios.FACTORS order
+FACTOR_COLUMNS = ['Monthly_Mean_AQI', 'USD_INR_Rate', 'Avg_Temp']
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+# ==================== FACTOR MODEL ====================
+def fit_factor_model(rows):
+    """Estimate seasonal means, shock means and shock covariance from history.
+
+    Rows are first averaged to one value per calendar month, across days and
+    cities, so every shock is a monthly one. Excluded months stay missing on
+    the monthly index, so only consecutive months contribute FX returns and
+    the pandemic gap does not show up as a single huge move.
+    """
+    series = monthly_series(rows, FACTOR_COLUMNS)
+    hist = pd.DataFrame({
+        'month': series.index.month - 1,
+        'AQI': series['Monthly_Mean_AQI'],
+        'FX': series['USD_INR_Rate'],
+        'Temp': series['Avg_Temp'],
+    }, index=series.index)
+
+    seasonal = hist.groupby('month')[['AQI', 'Temp']].mean().reindex(range(12))
+    seasonal = seasonal.fillna(seasonal.mean())
+
+    shocks = pd.DataFrame({
+        'AQI': hist['AQI'] - seasonal['AQI'].to_numpy()[hist['month']],
+        'FX': np.log(hist['FX']).diff(),
+        'Temp': hist['Temp'] - seasonal['Temp'].to_numpy()[hist['month']],
+    }).dropna()
+
+    cov = np.cov(shocks.to_numpy(), rowvar=False)
+    return {
+        'seasonal_aqi': seasonal['AQI'].to_numpy(),
+        'seasonal_temp': seasonal['Temp'].to_numpy(),
+        'shock_mean': shocks.mean().to_numpy(),
+        'shock_chol': np.linalg.cholesky(cov + np.eye(3) * 1e-12),
+        # Calendar month (0 = January) after the latest observed one
+        'next_month': int(hist.dropna(how='all', subset=['AQI', 'FX', 'Temp'])['month'].iloc[-1] + 1) % 12,
+    }
+
+
+def draw_paths(rng, model, start_fx, n_paths, horizon=12, start_month=0):
+    """Draw ``(n_paths, horizon, 3)`` correlated (AQI, FX, Temp) paths"""
+    months = (start_month + np.arange(horizon)) % 12
+    shocks = rng.standard_normal((n_paths, horizon, 3)) @ model['shock_chol'].T + model['shock_mean']
+
+    aqi = np.clip(model['seasonal_aqi'][months] + shocks[..., 0], 1.0, None)
+    fx = start_fx * np.exp(np.cumsum(shocks[..., 1], axis=1))
+    temp = model['seasonal_temp'][months] + shocks[..., 2]
+    return np.stack([aqi, fx, temp], axis=-1)
+
+
+# ==================== STREAMING QUANTILES ====================
+class HistogramSketch:
+    """Fixed-bin streaming quantile sketch for several series at once.
+
+    Values outside ``[lo, hi]`` land in under/overflow bins and are reported
+    at the nearest edge. Sketches with the same edges merge by adding counts.
+    """
+
+    def __init__(self, lo, hi, n_series, bins=4096):
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.counts = np.zeros((n_series, bins + 2), dtype=np.int64)
+
+    def update(self, values):
+        """Fold an ``(n, n_series)`` block of observations into the sketch"""
+        n_series, width = self.counts.shape
+        idx = np.searchsorted(self.edges, values, side='right')
+        flat = idx + np.arange(n_series) * width
+        self.counts += np.bincount(flat.ravel(), minlength=n_series * width).reshape(n_series, width)
+
+    def merge(self, other):
+        self.counts += other.counts
+        return self
+
+    def quantiles(self, qs):
+        """``(n_series, len(qs))`` quantile estimates, interpolated within bins"""
+        qs = np.asarray(qs, dtype=float)
+        cum = np.cumsum(self.counts, axis=1)
+        targets = qs[None, :] * cum[:, -1:]
+        # Interior bin b covers [edges[b - 1], edges[b]]
+        bounds = np.concatenate([[self.edges[0]], self.edges, [self.edges[-1]]])
+
+        result = np.empty((len(cum), len(qs)))
+        for i, row in enumerate(cum):
+            b = np.clip(np.searchsorted(row, targets[i], side='left'), 0, len(row) - 1)
+            before = np.where(b > 0, row[b - 1], 0)
+            in_bin = np.maximum(self.counts[i, b], 1)
+            frac = np.clip((targets[i] - before) / in_bin, 0.0, 1.0)
+            result[i] = bounds[b] + frac * (bounds[b + 1] - bounds[b])
+        return result
+
+
+# ==================== SIMULATION DRIVER ====================
+def _simulate_revpar(rng, model, base_revpar, start_fx, n_paths, horizon, start_month, elasticities):
+    """Monthly RevPAR paths plus their horizon average as the last column"""
+    paths = draw_paths(rng, model, start_fx, n_paths, horizon, start_month)
+    revpar = predict_revpar(base_revpar, paths, elasticities, BASELINES)
+    return np.column_stack([revpar, revpar.mean(axis=1)])
+
+
+def _run_chunks(seed, chunk_sizes, model, base_revpar, start_fx, horizon, start_month, elasticities, lo, hi, bins):
+    rng = np.random.default_rng(seed)
+    sketch = HistogramSketch(lo, hi, horizon + 1, bins)
+    for n in chunk_sizes:
+        sketch.update(_simulate_revpar(rng, model, base_revpar, start_fx, n, horizon, start_month, elasticities))
+    return sketch
+
+
+def simulate_revpar_risk(model, base_revpar, start_fx, n_draws=1_000_000, horizon=12, start_month=0,
+                         elasticities=ELASTICITIES, quantiles=DEFAULT_QUANTILES,
+                         chunk_size=50_000, workers=None, seed=0, bins=4096):
+    """Percentile bands of simulated RevPAR per horizon month.
+
+    Returns a DataFrame with one row per simulated month plus a final
+    ``Horizon Average`` row, and one ``P<q>`` column per requested quantile.
+    """
+    seeds = np.random.SeedSequence(seed)
+    pilot_seed, run_seed = seeds.spawn(2)
+
+    # A small pilot run fixes shared sketch bounds, widened for tail draws
+    pilot = _simulate_revpar(np.random.default_rng(pilot_seed), model, base_revpar, start_fx,
+                             min(n_draws, 20_000), horizon, start_month, elasticities)
+    spread = pilot.max() - pilot.min()
+    lo, hi = pilot.min() - 0.5 * spread, pilot.max() + 0.5 * spread
+
+    chunks = [chunk_size] * (n_draws // chunk_size)
+    if n_draws % chunk_size:
+        chunks.append(n_draws % chunk_size)
+
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    tasks = [chunks[i::workers] for i in range(workers)]
+    task_seeds = run_seed.spawn(workers)
+    args = (model, base_revpar, start_fx, horizon, start_month, elasticities, lo, hi, bins)
+
+    if workers == 1:
+        sketches = [_run_chunks(task_seeds[0], tasks[0], *args)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunks, s, t, *args) for s, t in zip(task_seeds, tasks)]
+            sketches = [f.result() for f in futures]
+
+    sketch = sketches[0]
+    for other in sketches[1:]:
+        sketch.merge(other)
+
+    labels = [MONTH_ORDER[(start_month + h) % 12] for h in range(horizon)] + ['Horizon Average']
+    columns = [f"P{q * 100:g}" for q in quantiles]
+    return pd.DataFrame(sketch.quantiles(quantiles), index=labels, columns=columns)
@@ -0,0 +1,87 @@
+"""Synthetic PDIS datasets at production-like scale.
+
+Rows follow the ``Final Data to use.csv`` schema (plus ``City`` and, for
+daily data, ``Date``). Values are drawn around the seasonal shape of the
+real Delhi series so that every dashboard computation has realistic input.
+"""
+import numpy as np
+import pandas as pd
+
+from pdis.ingest import MONTH_ORDER
+
+# Scale factor -> generator arguments, relative to the ~120 monthly rows of the real feed
+SCALES = {
+    1: dict(cities=1, years=10, freq='monthly'),
+    100: dict(cities=1, years=33, freq='daily'),
+    10000: dict(cities=100, years=33, freq='daily'),
+}
+
+_SEASONAL_TEMP = np.array([13.0, 18.6, 24.1, 30.8, 33.3, 33.5, 30.7, 30.3, 29.6, 26.2, 20.4, 14.5])
+_SEASONAL_AQI = np.array([298.0, 228.0, 185.0, 203.0, 203.0, 165.0, 96.0, 94.0, 106.0, 227.0, 330.0, 311.0])
+_SEASONAL_OCC = np.array([72.0, 76.0, 70.0, 62.0, 58.0, 55.0, 57.0, 60.0, 64.0, 70.0, 77.0, 78.0])
+
+
+def generate_pdis_dataset(cities=1, years=10, freq='monthly', start_year=1992, seed=0):
+    """Synthetic PDIS frame with ``cities`` x ``years`` of monthly or daily rows"""
+    rng = np.random.default_rng(seed)
+    if freq == 'daily':
+        dates = pd.date_range(f'{start_year}-01-01', f'{start_year + years - 1}-12-31', freq='D')
+    elif freq == 'monthly':
+        dates = pd.date_range(f'{start_year}-01-01', periods=years * 12, freq='MS')
+    else:
+        raise ValueError(f"Unsupported frequency: {freq!r}")
+
+    n_dates = len(dates)
+    n = n_dates * cities
+    date_idx = np.tile(np.arange(n_dates), cities)
+    city_idx = np.repeat(np.arange(cities), n_dates)
+    month = dates.month.to_numpy()[date_idx] - 1
+    year = dates.year.to_numpy()[date_idx]
+    t = (year - start_year) + month / 12.0
+
+    city_level = rng.uniform(0.6, 1.4, cities)[city_idx]
+    noise = rng.standard_normal((7, n))
+
+    fx = 45.0 * np.exp(0.02 * t) * (1 + 0.01 * noise[0])
+    temp = _SEASONAL_TEMP[month] + 1.2 * noise[1]
+    aqi = np.clip(_SEASONAL_AQI[month] + 25.0 * noise[2], 20.0, None)
+    occupancy = np.clip(_SEASONAL_OCC[month] - 0.4 * (temp - 25.0) + 3.0 * noise[3], 20.0, 98.0)
+    adr = city_level * 4000.0 * np.exp(0.04 * t) * (1 + 0.05 * noise[4])
+    revpar = adr * occupancy / 100
+    arrivals = np.maximum(city_level * 350_000 * np.exp(0.05 * t) * (1 + 0.08 * noise[5]), 1.0)
+    if freq == 'daily':
+        arrivals = arrivals / 30
+    ftas = arrivals * np.clip(0.32 + 0.03 * noise[6], 0.05, 0.9)
+
+    df = pd.DataFrame({
+        'City': np.array([f'City {i:03d}' for i in range(cities)])[city_idx],
+        'Year': year,
+        'Month': np.array(MONTH_ORDER)[month],
+        'Estimated_Delhi_FTAs': ftas.round().astype(np.int64),
+        'ADR (INR)': adr.round(1),
+        'RevPAR (INR)': revpar.round(1),
+        'Occupancy (%)': occupancy.round(2),
+        'USD_INR_Rate': fx.round(2),
+        'ADR_USD': (adr / fx).round(2),
+        'Avg_Temp': temp.round(2),
+        'Avg_Max_Temp': (temp + 6.0).round(2),
+        'Avg_Min_Temp': (temp - 6.0).round(2),
+        'Avg_Humidity': np.clip(60.0 - 0.8 * (temp - 25.0) + 8.0 * noise[1], 10.0, 100.0).round(2),
+        'Total_Rainfall': np.clip(30.0 * noise[2] + 20.0, 0.0, None).round(2),
+        'Monthly_Mean_AQI': aqi.round(1),
+        'Severe_Day_Count': np.clip(np.round((aqi - 250.0) / 10.0), 0.0, 31.0),
+        'Max_AQI': (aqi * 1.4).round(1),
+        'Quarter': month // 3 + 1,
+        'International_Aviation_Arrivals': arrivals.round().astype(np.int64),
+    })
+    df['Capture_Ratio (%)'] = (df['Estimated_Delhi_FTAs'] / df['International_Aviation_Arrivals'] * 100).round(2)
+    if freq == 'daily':
+        df.insert(1, 'Date', dates[date_idx])
+    return df
+
+
+def generate_scaled_dataset(scale, seed=0):
+    """Synthetic dataset for one of the ``SCALES`` presets"""
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale {scale}; choose from {sorted(SCALES)}")
+    return generate_pdis_dataset(seed=seed, **SCALES[scale])
@@ -0,0 +1,40 @@
+"""Calendar resampling of PDIS rows to week / month / quarter / year.
+
+Rows carry a ``Date`` column: the day for daily feeds, the first of the
+month otherwise. ``build_period_cube`` aggregates them into
+(Period x Year x Month) cells, so the series for any sidebar filter is
+rolled up from the cells instead of the daily rows. A period that straddles
+a month boundary (usually a week) gets one cell per month, which keeps
+month filters exact.
+"""
+from pdis.cube import CUBE_KEYS, build_aggregate_cube, rollup_frame, slice_cube
+
+# Sidebar label -> pandas period frequency
+GRANULARITIES = {
+    'Week': 'W-SUN',
+    'Month': 'M',
+    'Quarter': 'Q',
+    'Year': 'Y',
+}
+DEFAULT_GRANULARITY = 'Month'
+PERIOD_KEYS = ['Period'] + CUBE_KEYS
+
+
+def period_start(dates, granularity):
+    """Start timestamp of the period each date falls in"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}; choose from {list(GRANULARITIES)}")
+    return dates.dt.to_period(GRANULARITIES[granularity]).dt.start_time
+
+
+def build_period_cube(df, granularity):
+    """Aggregate cube keyed by (Period, Year, Month) for one granularity"""
+    return build_aggregate_cube(df.assign(Period=period_start(df['Date'], granularity)), keys=PERIOD_KEYS)
+
+
+def resample(period_cube, year_range=None, months=None, spec=None):
+    """One row per period for a filter; ``spec`` maps measure -> stat (default: every mean)"""
+    cells = slice_cube(period_cube, year_range, months)
+    if spec is None:
+        spec = {measure: 'mean' for measure in cells.columns.get_level_values('measure').unique()}
+    return rollup_frame(cells, 'Period', spec)
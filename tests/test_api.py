@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('starlette')
+
+from pdis.api import TTLCache, create_app, serialize  # noqa: E402
+from pdis.ingest import PDIS_CSV  # noqa: E402
+
+
+def get(app, path, query=''):
+    """``(status, headers, parsed body)`` for one GET, driven straight through ASGI"""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(), 'headers': [],
+        'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http', 'server': ('test', 80),
+        'root_path': '',
+    }
+    asyncio.run(app(scope, receive, send))
+    headers = {k.decode(): v.decode() for k, v in messages[0]['headers']}
+    body = b''.join(m.get('body', b'') for m in messages[1:])
+    # Strict parsing: bare NaN or Infinity in a response is a failure
+    return messages[0]['status'], headers, json.loads(body, parse_constant=pytest.fail)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = os.path.join(tmp_path, PDIS_CSV)
+    shutil.copy(PDIS_CSV, path)
+    return path
+
+
+@pytest.fixture
+def app(csv_path, tmp_path):
+    return create_app(csv_path=csv_path, store_dir=os.path.join(tmp_path, 'store'))
+
+
+def test_kpis_and_cache(app):
+    status, headers, body = get(app, '/kpis', 'start=2017&end=2024&months=May,June')
+    assert status == 200 and headers['x-cache'] == 'MISS'
+    assert body['avg_revpar'] > 0
+    # Month order and duplicates do not change the cache key
+    status, headers, _ = get(app, '/kpis', 'start=2017&end=2024&months=June,May,June')
+    assert headers['x-cache'] == 'HIT'
+
+
+def test_zero_variance_correlations_are_null(app):
+    status, _, body = get(app, '/correlations', 'start=2019&end=2019&months=May')
+    assert status == 200
+    assert all(v is None for row in body['matrix'].values() for v in row.values())
+
+
+def test_trends_yoy_and_scenario(app):
+    assert get(app, '/trends')[0] == 200
+    assert get(app, '/yoy')[0] == 200
+    status, _, body = get(app, '/scenario', 'aqi=320&fx=90.5&temp=37')
+    assert status == 200
+    assert body['scenarios'][-1]['Scenario'] == 'Current'
+
+
+def test_bad_requests(app):
+    assert get(app, '/kpis', 'start=abc')[0] == 400
+    assert get(app, '/kpis', 'start=2024&end=2017')[0] == 400
+    assert get(app, '/kpis', 'months=Smarch')[0] == 400
+    assert get(app, '/scenario', 'aqi=high')[0] == 400
+    assert get(app, '/kpis', 'start=1900&end=1901')[0] == 404
+
+
+def test_reloads_when_the_source_changes(app, csv_path):
+    rows_before = get(app, '/health')[2]['rows']
+    before = get(app, '/kpis')[2]
+    rows = pd.read_csv(csv_path)
+    rows[rows['Year'] < rows['Year'].max()].to_csv(csv_path, index=False)
+    os.utime(csv_path, (os.path.getatime(csv_path), os.path.getmtime(csv_path) + 10))
+
+    status, headers, after = get(app, '/kpis')
+    assert headers['x-cache'] == 'MISS'
+    assert after != before
+    assert get(app, '/health')[2]['rows'] == rows_before - (rows['Year'] == rows['Year'].max()).sum()
+
+
+def test_serialize_maps_non_finite_to_null():
+    assert json.loads(serialize({'a': float('nan'), 'b': [float('inf'), 1.5], 'c': 2})) == \
+        {'a': None, 'b': [None, 1.5], 'c': 2}
+
+
+def test_ttl_cache_expiry_and_lru():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)  # evicts b, the least recently used
+    assert cache.get('b') is None and cache.get('a') == 1
+    now[0] = 11
+    assert cache.get('a') is None
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from pdis.bootstrap import (TERMS, block_counts, bootstrap_elasticities, coefficient_intervals, model_matrix,
+                            solve_replicates)
+from pdis.elasticity import fit_elasticity_model
+from pdis.ingest import derive_columns, validate_schema
+from pdis.synthetic import generate_pdis_dataset
+
+
+@pytest.fixture(scope='module')
+def rows():
+    return derive_columns(validate_schema(generate_pdis_dataset(cities=2, years=8, freq='daily', seed=4)))
+
+
+def test_design_matrix_has_one_row_per_month(rows):
+    X, y = model_matrix(rows)
+    assert len(y) == X.shape[0] == rows['Date'].dt.to_period('M').nunique()
+
+
+def test_point_fit_matches_the_elasticity_model(rows):
+    result = bootstrap_elasticities(rows, n_replicates=10, workers=1)
+    fit = fit_elasticity_model(rows)
+    assert result.nobs == fit['nobs']
+    np.testing.assert_allclose(result.params, fit['params'][TERMS].to_numpy(), rtol=1e-8)
+
+
+def test_one_block_of_every_month_reproduces_the_point_fit(rows):
+    n = len(model_matrix(rows)[1])
+    result = bootstrap_elasticities(rows, n_replicates=20, block_length=n, workers=1)
+    assert result.block_length == n
+    np.testing.assert_allclose(result.replicates, np.tile(result.params, (20, 1)), rtol=1e-8)
+    intervals = coefficient_intervals(result)
+    np.testing.assert_allclose(intervals['Lower'], intervals['Upper'], rtol=1e-8)
+
+
+def test_block_counts_cover_n_consecutive_draws():
+    counts = block_counts(np.random.default_rng(0), 50, 6, 200)
+    assert counts.shape == (200, 50) and (counts.sum(axis=1) == 50).all()
+
+
+def test_batched_solve_matches_weighted_lstsq():
+    rng = np.random.default_rng(1)
+    X, y = np.column_stack([np.ones(40), rng.normal(size=(40, 3))]), rng.normal(size=40)
+    counts = block_counts(rng, 40, 5, 8)
+    for weights, coef in zip(counts, solve_replicates(X, y, counts)):
+        root = np.sqrt(weights)
+        np.testing.assert_allclose(coef, np.linalg.lstsq(X * root[:, None], y * root, rcond=None)[0], rtol=1e-8)
+
+
+def test_replicates_are_reproducible_per_seed(rows):
+    first = bootstrap_elasticities(rows, n_replicates=64, batch_size=16, workers=1, seed=5)
+    again = bootstrap_elasticities(rows, n_replicates=64, batch_size=16, workers=1, seed=5)
+    other = bootstrap_elasticities(rows, n_replicates=64, batch_size=16, workers=1, seed=6)
+    assert first.replicates.shape == (64, len(TERMS))
+    np.testing.assert_array_equal(first.replicates, again.replicates)
+    assert not np.array_equal(first.replicates, other.replicates)
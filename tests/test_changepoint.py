@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdis.changepoint import CHANGEPOINT_COLUMNS, ChangePointMonitor
+
+SHIFT_AT = 72
+
+
+@pytest.fixture
+def series():
+    """Ten years of seasonal monthly metrics whose level drops by a third from month 72"""
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2010-01-01', periods=120, freq='MS')
+    level = 5 + 0.1 * np.sin(2 * np.pi * index.month / 12) - 0.4 * (np.arange(len(index)) >= SHIFT_AT)
+    return pd.DataFrame({col: np.exp(level + rng.normal(0, 0.03, len(index))) for col in CHANGEPOINT_COLUMNS},
+                        index=index)
+
+
+def test_flags_a_planted_mean_shift(series):
+    monitor = ChangePointMonitor()
+    assert monitor.update(series) == len(series)
+    breaks = monitor.breaks()
+    for col in CHANGEPOINT_COLUMNS:
+        assert series.index[SHIFT_AT] in set(breaks.loc[breaks['Metric'] == col, 'Date'])
+
+
+def test_append_resumes_and_rewrite_restarts(series, tmp_path):
+    path = str(tmp_path / 'monitor.json')
+    monitor = ChangePointMonitor(path=path)
+    monitor.update(series.iloc[:100])
+    states = dict(monitor.series)
+
+    # An appended month only feeds the new month, in a monitor resumed from disk
+    resumed = ChangePointMonitor(path=path)
+    assert resumed.update(series.iloc[:101]) == 1
+    assert resumed.update(series) == len(series) - 101
+    monitor.update(series)
+    assert all(monitor.series[col] is states[col] for col in CHANGEPOINT_COLUMNS)
+    pd.testing.assert_frame_equal(resumed.breaks(), monitor.breaks())
+
+    # A correction to a month already seen starts over on the full history
+    rewritten = series.copy()
+    rewritten.iloc[:SHIFT_AT] *= 0.67
+    assert resumed.update(rewritten) == len(series)
+    fresh = ChangePointMonitor()
+    fresh.update(rewritten)
+    pd.testing.assert_frame_equal(resumed.breaks(), fresh.breaks())
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdis import engine
+from pdis.append import append_partitions, build_aggregates, read_aggregates
+from pdis.correlation import CellCorrelations
+from pdis.cube import filter_rows, rollup_totals
+from pdis.ingest import (MONTH_ORDER, PDIS_CSV, derive_columns, partition_dir, read_pdis_csv, validate_schema,
+                         write_partitions)
+from pdis.synthetic import generate_pdis_dataset
+
+
+@pytest.fixture(scope='module')
+def rows():
+    return prepare(generate_pdis_dataset(cities=3, years=8, freq='daily', seed=1))
+
+
+def prepare(raw):
+    """A synthetic feed validated and derived like the CSV"""
+    return derive_columns(validate_schema(raw))
+
+
+def random_selections(rows, count=20, seed=0):
+    rng = np.random.default_rng(seed)
+    years = sorted(rows['Year'].unique())
+    for _ in range(count):
+        lo, hi = sorted(rng.choice(years, size=2))
+        months = tuple(m for m in MONTH_ORDER if rng.random() < 0.4)
+        yield (int(lo), int(hi)), months
+
+
+def test_cell_merge_matches_pandas_corr(rows):
+    cells = CellCorrelations.from_frame(rows)
+    for year_range, months in random_selections(rows):
+        expected = filter_rows(rows, year_range, months)[cells.columns].corr()
+        pooled = cells.slice(year_range, months).combine().corr()
+        np.testing.assert_allclose(pooled.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_column_subset_matches_pandas_corr(rows):
+    cells = CellCorrelations.from_frame(rows)
+    columns = cells.columns[:4]
+    np.testing.assert_allclose(cells.combine(columns).corr().to_numpy(), rows[columns].corr().to_numpy(),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_merge_of_split_cells_matches_whole(rows):
+    # Splitting within cells exercises the pooled-moment update, not just concatenation
+    half = rows.sample(frac=0.5, random_state=0)
+    merged = CellCorrelations.from_frame(half).merge(CellCorrelations.from_frame(rows.drop(half.index)))
+    whole = CellCorrelations.from_frame(rows)
+    order = merged.index.get_indexer(whole.index)
+    assert len(merged) == len(whole) and (order >= 0).all()
+    for name in ['n', 'mean', 'm2', 'comoment']:
+        np.testing.assert_allclose(getattr(merged, name)[order], getattr(whole, name), rtol=1e-9, atol=1e-6)
+
+
+def test_append_matches_rebuild(tmp_path):
+    raw = generate_pdis_dataset(cities=3, years=6, freq='daily', seed=2)
+    last = raw['Year'].max()
+    csv_path = os.path.join(tmp_path, PDIS_CSV)
+    store_dir = os.path.join(tmp_path, 'store')
+    raw[raw['Year'] < last].to_csv(csv_path, index=False)
+    write_partitions(read_pdis_csv(csv_path), csv_path, store_dir)
+    engine.load_dataset(csv_path, store_dir)  # persists the aggregates the append folds into
+
+    append_partitions(raw[raw['Year'] == last], csv_path, store_dir)
+    appended = engine.load_dataset(csv_path, store_dir)
+    full = prepare(raw)
+    cube, cells = build_aggregates(full)
+
+    pd.testing.assert_series_equal(rollup_totals(appended.cube), rollup_totals(cube), check_exact=False)
+    np.testing.assert_allclose(appended.correlations.combine().corr().to_numpy(),
+                               cells.combine().corr().to_numpy(), rtol=1e-9, atol=1e-9)
+    for name in sorted(raw['City'].unique()):
+        assert read_aggregates(csv_path, partition_dir(name, store_dir)) is not None
+
+
+def test_empty_selection_rolls_up_to_nan(rows):
+    data = engine.Dataset(rows, *build_aggregates(rows))
+    view = engine.apply_filters(data, (1900, 1901))
+    assert view.cells.empty
+    totals = rollup_totals(view.cells)
+    assert len(totals) and totals.isna().all()
+    assert all(v is None or np.isnan(v) for v in engine.kpis(view).values())
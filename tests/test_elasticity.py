@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdis.elasticity import (FORMULA, HAC_MAXLAGS, ElasticityFitter, add_log_columns, fit_elasticity_model,
+                             monthly_model_frame, scenario_elasticities)
+from pdis.ingest import derive_columns, validate_schema
+from pdis.scenarios import ELASTICITIES
+from pdis.synthetic import generate_pdis_dataset
+
+
+def prepare(raw):
+    return derive_columns(validate_schema(raw))
+
+
+def test_fits_monthly_means_of_a_daily_multi_city_feed():
+    smf = pytest.importorskip('statsmodels.formula.api')
+    rows = prepare(generate_pdis_dataset(cities=3, years=5, freq='daily', seed=2))
+    fit = fit_elasticity_model(rows)
+    assert fit['nobs'] == rows['Date'].dt.to_period('M').nunique() == 60
+
+    monthly = rows.groupby(rows['Date'].dt.to_period('M')).mean(numeric_only=True)
+    expected = smf.ols(FORMULA, data=add_log_columns(monthly)).fit(cov_type='HAC', cov_kwds={'maxlags': HAC_MAXLAGS})
+    pd.testing.assert_series_equal(fit['params'], expected.params, rtol=1e-8)
+    pd.testing.assert_series_equal(fit['bse'], expected.bse, rtol=1e-6)
+
+
+def test_monthly_rows_fit_unchanged():
+    rows = prepare(generate_pdis_dataset(years=4, seed=1))
+    assert len(monthly_model_frame(rows)) == len(add_log_columns(rows)) == 48
+
+
+def test_too_few_months_fall_back_to_published_elasticities():
+    rows = prepare(generate_pdis_dataset(years=1, seed=1)).head(6)
+    assert fit_elasticity_model(rows) is None
+    np.testing.assert_array_equal(scenario_elasticities(None), ELASTICITIES)
+
+
+def settled(future, fitter):
+    """A fit's result once its done-callback has moved it into the LRU"""
+    result = future.result()
+    while fitter._pending:
+        time.sleep(0.01)
+    return result
+
+
+def test_fitter_shares_and_caches_fits():
+    rows = prepare(generate_pdis_dataset(years=4, seed=1))
+    fitter = ElasticityFitter(maxsize=1)
+    first = settled(fitter.submit('a', rows), fitter)
+    assert fitter.submit('a', rows).result() is first
+    settled(fitter.submit('b', rows), fitter)
+    assert (fitter.hits, fitter.misses, len(fitter)) == (1, 2, 1)
+    settled(fitter.submit('a', rows), fitter)  # evicted by b
+    assert fitter.misses == 3
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdis import forecast
+from pdis.forecast import fit_forecast, forecast_frame, forecast_series, latest_run, monthly_series
+from pdis.ingest import derive_columns, validate_schema
+from pdis.synthetic import generate_pdis_dataset
+
+pytest.importorskip('statsmodels')
+
+
+@pytest.fixture(scope='module')
+def rows():
+    # 2017-2024 daily for two cities; derive_columns drops 2020-2021
+    return derive_columns(validate_schema(generate_pdis_dataset(cities=2, years=8, freq='daily', start_year=2017,
+                                                                seed=6)))
+
+
+def seasonal_series(months=96, seed=0):
+    index = pd.date_range('2012-01-01', periods=months, freq='MS')
+    noise = np.random.default_rng(seed).normal(0, 0.01, months)
+    return pd.Series(np.exp(8 + 0.3 * np.sin(2 * np.pi * index.month / 12) + noise), index=index, name='RevPAR (INR)')
+
+
+def test_monthly_series_is_gap_free_monthly_means(rows):
+    series = monthly_series(rows)
+    assert series.index.freqstr == 'MS' and len(series) == 96
+    gap = (series.index.year >= 2020) & (series.index.year <= 2021)
+    assert series[gap].isna().all().all() and series[~gap].notna().all().all()
+    expected = rows.groupby(rows['Date'].dt.to_period('M'))['RevPAR (INR)'].mean()
+    np.testing.assert_allclose(series.loc[~gap, 'RevPAR (INR)'], expected, rtol=1e-12)
+    assert len(latest_run(series['RevPAR (INR)'])) == 36
+
+
+@pytest.mark.parametrize('method', ['sarima', 'ets'])
+def test_forecast_follows_a_clean_seasonal_pattern(method):
+    y = seasonal_series()
+    frame = forecast_frame(fit_forecast(y, method, horizon=12))
+    expected = seasonal_series(months=108).iloc[96:]
+    assert (frame['Date'].to_numpy() == expected.index.to_numpy()).all()
+    assert ((frame['Lower'] <= frame['Forecast']) & (frame['Forecast'] <= frame['Upper'])).all()
+    np.testing.assert_allclose(frame['Forecast'], expected, rtol=0.05)
+
+
+def test_artifacts_are_reused_and_ets_uses_the_latest_run(rows, tmp_path, monkeypatch):
+    first = forecast_series(rows, ['RevPAR (INR)'], method='ets', store_dir=str(tmp_path), workers=1)
+    assert first['RevPAR (INR)']['observations'] == 36  # 2022-2024, after the gap
+
+    def refit(*args):
+        raise AssertionError("persisted forecast was refitted")
+
+    monkeypatch.setattr(forecast, 'fit_forecast', refit)
+    assert forecast_series(rows, ['RevPAR (INR)'], method='ets', store_dir=str(tmp_path), workers=1) == first
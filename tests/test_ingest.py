@@ -0,0 +1,51 @@
+import os
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from pdis import engine
+from pdis.ingest import (AQI_CSV, PDIS_CSV, STORE_SCHEMA_VERSION, list_partitions, load_optional_frame, partition_dir,
+                         read_pdis_csv, read_store, store_is_fresh, store_path, store_schema_version, write_partitions,
+                         write_store)
+from pdis.synthetic import generate_pdis_dataset
+
+
+def test_store_from_an_older_layout_is_stale(tmp_path):
+    csv_path = os.path.join(tmp_path, PDIS_CSV)
+    store_dir = os.path.join(tmp_path, 'store')
+    generate_pdis_dataset(cities=2, years=4, seed=1).to_csv(csv_path, index=False)
+    write_partitions(read_pdis_csv(csv_path), csv_path, store_dir)
+    part_dirs = [partition_dir(name, store_dir) for name in list_partitions(store_dir)]
+    assert all(store_schema_version(store_path(csv_path, d)) == STORE_SCHEMA_VERSION for d in part_dirs)
+    assert all(store_is_fresh(csv_path, d) for d in part_dirs)
+
+    # A store written before the derived Date column, without a version mark. Like
+    # write_store, replace the file rather than overwrite it: the read maps it.
+    for d in part_dirs:
+        old = read_store(csv_path, d).drop(columns='Date')
+        feather.write_feather(old, store_path(csv_path, d) + '.tmp', compression='uncompressed')
+        os.replace(store_path(csv_path, d) + '.tmp', store_path(csv_path, d))
+    assert not any(store_is_fresh(csv_path, d) for d in part_dirs)
+    assert 'Date' in engine.load_dataset(csv_path, store_dir).rows.columns
+
+
+def test_store_reads_numeric_columns_zero_copy(tmp_path):
+    csv_path = os.path.join(tmp_path, PDIS_CSV)
+    generate_pdis_dataset(cities=1, years=3, seed=1).to_csv(csv_path, index=False)
+    write_partitions(read_pdis_csv(csv_path), csv_path, str(tmp_path))
+    rows = read_store(csv_path, partition_dir(list_partitions(str(tmp_path))[0], str(tmp_path)))
+    # Views of the memory-mapped file are read-only; a pandas-owned copy would be writeable
+    assert not rows['RevPAR (INR)'].to_numpy().flags.writeable
+    pd.testing.assert_frame_equal(rows, read_pdis_csv(csv_path), check_dtype=False)
+
+
+def test_optional_feeds_are_typed(tmp_path):
+    csv_path = os.path.join(tmp_path, AQI_CSV)
+    pd.DataFrame({'Year': [2019, 2019], 'Month': ['March', 'January'], 'Monthly_Mean_AQI': [180, None]}) \
+        .to_csv(csv_path, index=False)
+    from_csv = load_optional_frame(csv_path, str(tmp_path))
+    assert str(from_csv['Year'].dtype) == 'int16' and from_csv['Monthly_Mean_AQI'].dtype == 'float64'
+    assert list(from_csv['Month'].cat.categories) == ['January', 'March']
+
+    write_store(from_csv, csv_path, str(tmp_path))
+    pd.testing.assert_frame_equal(load_optional_frame(csv_path, str(tmp_path)), from_csv)
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pdis.nowcast import STATE_FILE, Nowcaster, RunningMoments
+
+
+def observations(start, days, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Date': pd.date_range(start, periods=days, freq='D').strftime('%Y-%m-%d'),
+        'Occupancy (%)': rng.uniform(50, 90, days).round(2),
+        'ADR (INR)': rng.uniform(6000, 9000, days).round(2),
+    })
+
+
+def write(path, frame, mode='w', header=True):
+    with open(path, mode, encoding='utf-8', newline='') as f:
+        frame.to_csv(f, index=False, header=header)
+
+
+def test_running_moments_match_pandas():
+    values = pd.Series(np.random.default_rng(1).normal(100, 15, 500))
+    moments = RunningMoments()
+    for batch in np.array_split(values.to_numpy(), [1, 7, 120, 121, 400]):
+        moments.update(batch)
+    assert moments.n == len(values)
+    assert np.isclose(moments.mean, values.mean())
+    assert np.isclose(moments.m2 / (moments.n - 1), values.var())
+    assert np.isclose(moments.stderr, values.sem())
+
+
+def test_polls_only_appended_lines_across_restarts(tmp_path):
+    path = tmp_path / 'ops.csv'
+    first, second = observations('2025-06-01', 10), observations('2025-06-11', 5, seed=1)
+    write(path, first)
+    assert Nowcaster(str(tmp_path)).poll() == 10
+
+    write(path, second, mode='a', header=False)
+    resumed = Nowcaster(str(tmp_path))
+    assert resumed.poll() == 5 and resumed.poll() == 0
+    both = pd.concat([first, second])
+    estimates = resumed.estimates('2025-06')
+    assert estimates['Occupancy (%)']['n'] == 15
+    assert np.isclose(estimates['Occupancy (%)']['mean'], both['Occupancy (%)'].mean())
+    assert np.isclose(estimates['RevPAR (INR)']['mean'], (both['ADR (INR)'] * both['Occupancy (%)'] / 100).mean())
+
+
+def test_rewritten_and_replaced_files_are_read_from_the_start(tmp_path):
+    path = tmp_path / 'ops.csv'
+    write(path, observations('2025-06-01', 10))
+    nowcaster = Nowcaster(str(tmp_path))
+    nowcaster.poll()
+
+    # Rewritten in place, longer than before: the bytes before the old offset changed
+    write(path, observations('2025-07-01', 12, seed=2))
+    assert nowcaster.poll() == 12
+    assert nowcaster.estimates('2025-07')['Occupancy (%)']['n'] == 12
+
+    # Replaced by a new file that starts with the same bytes: only the inode changed
+    replacement = tmp_path / 'ops.csv.new'
+    write(replacement, observations('2025-07-01', 12, seed=2))
+    write(replacement, observations('2025-07-13', 1, seed=3), mode='a', header=False)
+    os.replace(replacement, path)
+    assert nowcaster.poll() == 13
+
+
+def test_unparseable_lines_are_reported_and_retried(tmp_path):
+    path = tmp_path / 'ops.csv'
+    write(path, observations('2025-06-01', 10).rename(columns={'Date': 'Day'}))
+    nowcaster = Nowcaster(str(tmp_path))
+    assert nowcaster.poll() == 0
+    assert 'Date' in nowcaster.errors['ops.csv']
+    assert 'ops.csv' not in nowcaster.offsets and not os.path.exists(tmp_path / STATE_FILE)
+
+    write(path, observations('2025-06-01', 10))
+    assert nowcaster.poll() == 10
+    assert nowcaster.errors == {}
@@ -0,0 +1,39 @@
+import json
+import os
+
+import pytest
+
+from pdis import engine
+from pdis.reports import PLOTLY_JS, generate_reports, parse_spec
+
+
+@pytest.fixture(scope='module')
+def data():
+    return engine.load_dataset()
+
+
+def test_parse_spec_defaults_and_rejects_empty_selections(data):
+    spec = parse_spec({'name': 'All'}, data)
+    assert spec['year_range'] == engine.year_bounds(data) and spec['months'] == []
+    with pytest.raises(ValueError, match='no data'):
+        parse_spec({'name': 'Excluded', 'year_range': [2020, 2021]}, data)
+    with pytest.raises(ValueError, match='unknown months'):
+        parse_spec({'name': 'Typo', 'months': ['Smarch']}, data)
+
+
+def test_generate_reports_writes_every_spec(data, tmp_path):
+    specs = [parse_spec(raw, data) for raw in [
+        {'name': 'Full history'},
+        {'name': 'Monsoon 2022-24', 'year_range': [2022, 2024], 'months': ['July', 'August']},
+    ]]
+    manifest = generate_reports(data, specs, str(tmp_path), formats=('html', 'csv'), workers=1)
+    assert [entry['name'] for entry in manifest] == [spec['name'] for spec in specs]
+    assert os.path.exists(tmp_path / PLOTLY_JS)
+    for entry in manifest:
+        assert all(os.path.getsize(path) for path in entry['files'])
+        assert {'drift_latest.csv', 'scenario_risk_bands.csv'} <= {os.path.basename(path) for path in entry['files']}
+        html = next(path for path in entry['files'] if path.endswith('report.html'))
+        with open(html, encoding='utf-8') as f:
+            assert f'src="../{PLOTLY_JS}"' in f.read()
+    with open(tmp_path / 'manifest.json', encoding='utf-8') as f:
+        assert json.load(f) == manifest
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from pdis.elasticity import monthly_model_frame
+from pdis.ingest import derive_columns, validate_schema
+from pdis.rolling import REGRESSORS, IncrementalLeastSquares, rolling_elasticities
+from pdis.synthetic import generate_pdis_dataset
+
+
+@pytest.fixture(scope='module')
+def rows():
+    return derive_columns(validate_schema(generate_pdis_dataset(cities=2, years=6, freq='daily', seed=3)))
+
+
+def ols_slopes(frame):
+    X = np.column_stack([np.ones(len(frame)), frame[REGRESSORS].to_numpy()])
+    return np.linalg.lstsq(X, frame['log_RevPAR'].to_numpy(), rcond=None)[0][1:]
+
+
+@pytest.mark.parametrize('window', [24, 36])
+def test_matches_a_fresh_ols_per_window(rows, window):
+    monthly = monthly_model_frame(rows)
+    paths = rolling_elasticities(rows, window)
+    assert len(paths) == len(monthly) - window + 1
+    assert (paths.index == monthly.index[window - 1:]).all()
+    for end, slopes in zip(range(window, len(monthly) + 1), paths.to_numpy()):
+        np.testing.assert_allclose(slopes, ols_slopes(monthly.iloc[end - window:end]), rtol=1e-6, atol=1e-8)
+
+
+def test_remove_undoes_add():
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(30, 3)), rng.normal(size=30)
+    ls = IncrementalLeastSquares(3)
+    for x_row, y_value in zip(X, y):
+        ls.add(x_row, y_value)
+    for x_row, y_value in zip(X[:10], y[:10]):
+        ls.remove(x_row, y_value)
+    assert ls.n == 20
+    np.testing.assert_allclose(ls.solve(), np.linalg.lstsq(X[10:], y[10:], rcond=None)[0], rtol=1e-9)
@@ -0,0 +1,45 @@
+import itertools
+
+import numpy as np
+
+from pdis import engine
+from pdis.scenarios import predict_revpar, scenario_grid
+
+BASE_REVPAR = 5234.0
+
+
+def scalar_revpar(base_revpar, aqi, fx, temp):
+    """The dashboard's original one-scenario-at-a-time formula"""
+    fx_variance = ((fx - 83.0) / 83.0) * 1.32
+    temp_variance = ((temp - 30.0) / 30.0) * -0.70
+    aqi_variance = ((aqi - 200.0) / 200.0) * -0.08
+    return base_revpar * (1 + fx_variance + temp_variance + aqi_variance)
+
+
+def test_grid_matches_scalar_formula():
+    aqi_values, fx_values, temp_values = [50, 200, 450], np.arange(75.0, 96.0, 2.5), np.arange(5.0, 46.0, 5.0)
+    grid = scenario_grid(aqi_values, fx_values, temp_values)
+    expected = [scalar_revpar(BASE_REVPAR, *s) for s in itertools.product(aqi_values, fx_values, temp_values)]
+    assert grid.shape == (len(expected), 3)
+    np.testing.assert_allclose(predict_revpar(BASE_REVPAR, grid), expected, rtol=1e-12)
+
+
+def test_surface_matches_scalar_formula():
+    surface = engine.scenario_surface(BASE_REVPAR, 320)
+    expected = [[scalar_revpar(BASE_REVPAR, 320, fx, temp) for temp in engine.GRID_TEMP] for fx in engine.GRID_FX]
+    np.testing.assert_allclose(surface, expected, rtol=1e-12)
+
+
+def test_forecast_and_tables_match_scalar_formula():
+    scenario = (320, 90.5, 37.0)
+    forecast = engine.scenario_forecast(BASE_REVPAR, scenario)
+    assert np.isclose(forecast['predicted_revpar'], scalar_revpar(BASE_REVPAR, *scenario))
+    assert np.isclose(forecast['base_revpar'] * (1 + forecast['total_impact']), forecast['predicted_revpar'])
+
+    sensitivity = engine.sensitivity_table(scenario).set_index('Factor')
+    assert np.isclose(sensitivity.loc['FX Exchange Rate', 'Impact on RevPAR (%)'], (90.5 - 83) / 83 * 132)
+
+    table = engine.scenario_table(BASE_REVPAR, scenario)
+    expected = [scalar_revpar(BASE_REVPAR, *s) for s in table[['AQI', 'Exchange Rate', 'Temperature']].to_numpy()]
+    np.testing.assert_allclose(table['Predicted RevPAR'], expected, rtol=1e-12)
+    assert table['Scenario'].iloc[-1] == 'Current'
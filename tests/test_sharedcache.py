@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdis import engine
+from pdis.ingest import PDIS_CSV, available_partitions
+from pdis.sharedcache import SharedCache, content_key, shared_dataset, shared_frame
+from pdis.synthetic import generate_pdis_dataset
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = os.path.join(tmp_path, PDIS_CSV)
+    generate_pdis_dataset(cities=2, years=4, seed=8).to_csv(path, index=False)
+    return path
+
+
+def never():
+    raise AssertionError("a cache hit must not reload")
+
+
+def test_dataset_round_trips_through_the_cache(csv_path, tmp_path):
+    cache = SharedCache(str(tmp_path / 'shared'))
+    store_dir = str(tmp_path / 'store')
+    partitions = available_partitions(csv_path, store_dir)
+    original = engine.load_dataset(csv_path, store_dir)
+
+    first = shared_dataset(cache, lambda: original, partitions, csv_path, store_dir)
+    second = shared_dataset(cache, never, partitions, csv_path, store_dir)
+    assert (cache.misses, cache.hits) == (1, 2)  # the miss is read back from the mapped entry
+    for shared in (first, second):
+        pd.testing.assert_frame_equal(shared.rows, original.rows, check_categorical=False)
+        pd.testing.assert_frame_equal(shared.cube, original.cube, check_index_type=False)
+        for name in ['n', 'mean', 'm2', 'comoment']:
+            np.testing.assert_array_equal(getattr(shared.correlations, name), getattr(original.correlations, name))
+
+
+def test_a_changed_source_misses(csv_path, tmp_path):
+    key = content_key([csv_path], 'frame')
+    assert content_key([csv_path], 'frame') == key and content_key([csv_path], 'other') != key
+    with open(csv_path, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    os.utime(csv_path, ns=(0, os.stat(csv_path).st_mtime_ns + 1))
+    assert content_key([csv_path], 'frame') != key
+
+    cache = SharedCache(str(tmp_path / 'shared'))
+    assert shared_frame(cache, lambda: None, csv_path) is None
+    assert cache.entries() == []
+
+
+def test_evicts_least_recently_used_entries(tmp_path):
+    frame = pd.DataFrame({'x': np.arange(10_000, dtype=float)})
+    cache = SharedCache(str(tmp_path / 'shared'), max_bytes=10 ** 9)
+    for i, key in enumerate(['a', 'b', 'c']):
+        assert cache.put(key, {'frame': frame})
+        os.utime(cache._entry(key), (i, i))
+    size = cache.entries()[0][1]
+    cache.get('a')  # touching an entry makes it the most recent
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert sorted(key for _, _, key in cache.entries()) == ['a', 'c']
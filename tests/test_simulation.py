@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from pdis.ingest import MONTH_ORDER, derive_columns, validate_schema
+from pdis.scenarios import BASELINES, ELASTICITIES, predict_revpar
+from pdis.simulation import (HistogramSketch, _simulate_revpar, draw_paths, fit_factor_model,
+                             simulate_revpar_risk)
+from pdis.synthetic import generate_pdis_dataset
+
+BASE_REVPAR = 5000.0
+
+
+@pytest.fixture(scope='module')
+def model():
+    rows = derive_columns(validate_schema(generate_pdis_dataset(cities=2, years=6, freq='daily', seed=5)))
+    return fit_factor_model(rows[rows['Date'] < '1997-11-20'])  # the data ends part-way through November
+
+
+def test_factor_model_starts_after_the_latest_month(model):
+    assert model['next_month'] == MONTH_ORDER.index('December')
+    assert np.allclose(model['shock_chol'], np.tril(model['shock_chol']))
+
+
+def test_sketch_quantiles_and_merge_match_numpy():
+    values = np.random.default_rng(0).normal(100, 20, size=(20_000, 2))
+    lo, hi, bins = 0.0, 200.0, 4096
+    whole = HistogramSketch(lo, hi, 2, bins)
+    whole.update(values)
+    merged = HistogramSketch(lo, hi, 2, bins)
+    merged.update(values[:7_000])
+    part = HistogramSketch(lo, hi, 2, bins)
+    part.update(values[7_000:])
+    merged.merge(part)
+
+    qs = [0.05, 0.5, 0.95]
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    np.testing.assert_allclose(whole.quantiles(qs), np.quantile(values, qs, axis=0).T, atol=2 * (hi - lo) / bins)
+
+
+def test_zero_shocks_give_the_deterministic_path(model):
+    calm = dict(model, shock_mean=np.zeros(3), shock_chol=np.zeros((3, 3)))
+    bands = simulate_revpar_risk(calm, BASE_REVPAR, 83.0, n_draws=1_000, start_month=calm['next_month'], workers=1)
+    path = draw_paths(np.random.default_rng(0), calm, 83.0, 1, start_month=calm['next_month'])[0]
+    expected = predict_revpar(BASE_REVPAR, path, ELASTICITIES, BASELINES)
+    assert list(bands.index) == [MONTH_ORDER[(11 + h) % 12] for h in range(12)] + ['Horizon Average']
+    for column in bands:
+        np.testing.assert_allclose(bands[column].iloc[:-1], expected, rtol=1e-3)
+        assert np.isclose(bands[column].iloc[-1], expected.mean(), rtol=1e-3)
+
+
+def test_bands_match_direct_percentiles(model):
+    bands = simulate_revpar_risk(model, BASE_REVPAR, 83.0, n_draws=200_000, chunk_size=50_000, workers=1, seed=1)
+    direct = _simulate_revpar(np.random.default_rng(7), model, BASE_REVPAR, 83.0, 200_000, 12, 0, ELASTICITIES)
+    expected = np.percentile(direct, [5, 25, 50, 75, 95], axis=0).T
+    assert (np.diff(bands.to_numpy(), axis=1) >= 0).all()
+    np.testing.assert_allclose(bands.to_numpy(), expected, rtol=0.01)